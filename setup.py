@@ -30,7 +30,7 @@ from copy import copy
 
 cythonize_dir = "build"
 
-include_dirs = [os.path.join(sys.prefix, "include")]
+include_dirs = [os.path.join(sys.prefix, "include"), "src"]
 library_dirs = [os.path.join(sys.exec_prefix, "lib")]
 
 fplll = {"include_dirs": include_dirs,
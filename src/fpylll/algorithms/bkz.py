@@ -9,13 +9,15 @@ implementation in fplll's core.  Additionally, this implementation collects some
 statistics.  Hence, it should provide a good basis for implementing variants of this algorithm.
 """
 from __future__ import absolute_import
-import time
 from fpylll import IntegerMatrix, GSO, LLL
 from fpylll import BKZ
 from fpylll import Enumeration
 from fpylll import EnumerationError
 from fpylll.util import adjust_radius_to_gh_bound
-from fpylll.algorithms.bkz_stats import BKZTreeTracer, dummy_tracer
+from fpylll.algorithms.bkz_stats import BKZTreeTracer, Node, Tracer, dummy_tracer, process_time
+from fpylll.tools.checkpoint import AutoAbort, Checkpoint, checkpoint_for
+from fpylll.tools.checkpoint import load as load_checkpoint
+from fpylll.tools.trace_export import node_from_dict, node_to_dict
 
 
 class BKZReduction:
@@ -62,26 +64,120 @@ class BKZReduction:
         else:
             self.lll_obj = L
 
-    def __call__(self, params, min_row=0, max_row=-1):
-        """Run the BKZ algorithm with parameters `param`.
+        # set by resume()
+        self._state = None
+
+    @classmethod
+    def resume(cls, filename, params=None, tracer=None, checkpoint=None, **kwds):
+        """Continue a run from a checkpoint written by :meth:`__call__`.
+
+        The initial LLL reduction is not repeated and the trace of the tours completed before the
+        checkpoint is part of the new trace.  The limits of ``params`` are checked before the first
+        tour, so no tour is run if the interrupted run ended with a clean tour or reached them.
+
+        :param filename: a checkpoint file
+        :param params: BKZ parameters, ``None`` for those of the interrupted run, e.g. pass
+            parameters with a larger ``max_loops`` to continue a finished run
+        :param tracer: see :meth:`__call__`
+        :param checkpoint: ``None`` to keep writing to ``filename`` as before, ``False`` to stop
+            writing checkpoints or a :class:`fpylll.tools.checkpoint.Checkpoint`
+        :param kwds: passed to the constructor
+        :returns: a pair of the new BKZ object and the return value of :meth:`__call__`
 
+        """
+        state = load_checkpoint(filename)
+        state["M"].update_gso()
+        bkz = cls(state["lll"], **kwds)
+        bkz._state = state
+        clean = bkz(params if params is not None else state["params"],
+                    state["min_row"], state["max_row"],
+                    tracer=tracer, checkpoint=checkpoint_for(filename, state, checkpoint))
+        return bkz, clean
+
+    def save_checkpoint(self, checkpoint, params, min_row, max_row, tour, auto_abort, cputime,
+                        tracer, clean=False):
+        """Write a checkpoint which :meth:`resume` continues from.
+
+        :param checkpoint: a :class:`fpylll.tools.checkpoint.Checkpoint`
         :param params: BKZ parameters
         :param min_row: start processing in this row
         :param max_row: stop processing in this row (exclusive)
+        :param tour: index of the next tour
+        :param auto_abort: a :class:`fpylll.tools.checkpoint.AutoAbort`
+        :param cputime: CPU time spent so far
+        :param tracer: the tracer of the run
+        :param clean: whether the last tour made no change
 
         """
-        tracer = BKZTreeTracer(self, verbosity=params.flags & BKZ.VERBOSE, start_clocks=True)
+        trace = getattr(tracer, "trace", None)
+        if trace is not None:
+            trace = [node_to_dict(child) for child in trace.children]
+        state = {"M": self.M, "lll": self.lll_obj, "params": params,
+                 "min_row": min_row, "max_row": max_row, "tour": tour,
+                 "auto_abort": auto_abort.state, "cputime": cputime, "trace": trace,
+                 "tour_clean": clean}
+        state.update(self.checkpoint_state())
+        checkpoint.save(state)
+
+    def checkpoint_state(self):
+        """
+        Return additional state to checkpoint, which subclasses find in ``self._state`` when
+        :meth:`__call__` is called from :meth:`resume`.
+        """
+        return {}
 
-        if params.flags & BKZ.AUTO_ABORT:
-            auto_abort = BKZ.AutoAbort(self.M, self.A.nrows)
+    def __call__(self, params, min_row=0, max_row=-1, tracer=None, checkpoint=None):
+        """Run the BKZ algorithm with parameters `param`.
 
-        cputime_start = time.clock()
+        :param params: BKZ parameters
+        :param min_row: start processing in this row
+        :param max_row: stop processing in this row (exclusive)
+        :param tracer: ``None`` for a :class:`BKZTreeTracer`, ``False`` to disable tracing, a
+            callable such as :class:`FastTreeTracer` which is called like :class:`BKZTreeTracer`
+            or a tracer instance created with ``start_clocks=True``
+        :param checkpoint: ``None``, a :class:`fpylll.tools.checkpoint.Checkpoint` or a filename to
+            write a checkpoint to after every tour, see :meth:`resume`
 
-        with tracer.context("lll"):
-            self.lll_obj()
+        The trace is available as ``self.trace`` afterwards, which is ``None`` if tracing was
+        disabled.
 
-        i = 0
-        while True:
+        """
+        if tracer is None:
+            tracer = BKZTreeTracer
+        elif tracer is False:
+            tracer = dummy_tracer
+        if not isinstance(tracer, Tracer):
+            tracer = tracer(self, verbosity=params.flags & BKZ.VERBOSE, start_clocks=True)
+
+        if checkpoint is not None and not isinstance(checkpoint, Checkpoint):
+            checkpoint = Checkpoint(checkpoint)
+
+        state, self._state = self._state, None
+        if state is None:
+            auto_abort = AutoAbort(self.M, self.A.nrows)
+            cputime_start = process_time()
+            with tracer.context("lll"):
+                self.lll_obj()
+            i, clean = 0, False
+        else:
+            auto_abort = AutoAbort(self.M, self.A.nrows, state=state["auto_abort"])
+            cputime_start = process_time() - state["cputime"]
+            if state["trace"] is not None:
+                trace = Node(None)
+                for child in state["trace"]:
+                    trace.add_child(node_from_dict(child))
+                tracer.merge(trace)
+            i, clean = state["tour"], state.get("tour_clean", False)
+
+        # like BKZ.Reduction, check the limits before the first tour of a resumed run so that
+        # resuming a finished run does not run another tour
+        done = state is not None and i > 0 and (
+            clean or params.block_size >= self.A.nrows or
+            bool(params.flags & BKZ.AUTO_ABORT) and auto_abort.aborted() or
+            bool(params.flags & BKZ.MAX_LOOPS) and i >= params.max_loops or
+            bool(params.flags & BKZ.MAX_TIME) and process_time() - cputime_start >= params.max_time)
+
+        while not done:
             with tracer.context("tour", i):
                 clean = self.tour(params, min_row, max_row, tracer)
             i += 1
@@ -91,11 +187,19 @@ class BKZReduction:
                 break
             if (params.flags & BKZ.MAX_LOOPS) and i >= params.max_loops:
                 break
-            if (params.flags & BKZ.MAX_TIME) and time.clock() - cputime_start >= params.max_time:
+            if (params.flags & BKZ.MAX_TIME) and process_time() - cputime_start >= params.max_time:
                 break
+            if checkpoint is not None and checkpoint.due(i):
+                self.save_checkpoint(checkpoint, params, min_row, max_row, i, auto_abort,
+                                     process_time() - cputime_start, tracer)
+
+        if checkpoint is not None:
+            # so that a finished run can be continued with different parameters
+            self.save_checkpoint(checkpoint, params, min_row, max_row, i, auto_abort,
+                                 process_time() - cputime_start, tracer, clean)
 
         tracer.exit()
-        self.trace = tracer.trace
+        self.trace = getattr(tracer, "trace", None)
         return clean
 
     def tour(self, params, min_row=0, max_row=-1, tracer=dummy_tracer):
@@ -113,6 +217,7 @@ class BKZReduction:
         clean = True
 
         for kappa in range(min_row, max_row-2):
+            tracer.set_kappa(kappa)
             block_size = min(params.block_size, max_row - kappa)
             clean &= self.svp_reduction(kappa, block_size, params, tracer)
 
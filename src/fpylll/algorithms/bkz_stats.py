@@ -13,6 +13,20 @@ import copy
 from collections import OrderedDict
 from math import log
 
+try:
+    process_time, perf_counter = time.process_time, time.perf_counter
+except AttributeError:
+    process_time, perf_counter = time.clock, time.time
+
+try:
+    process_time_ns, perf_counter_ns = time.process_time_ns, time.perf_counter_ns
+except AttributeError:
+    def process_time_ns():
+        return int(process_time()*10**9)
+
+    def perf_counter_ns():
+        return int(perf_counter()*10**9)
+
 
 def pretty_dict(d, keyword_width=None, round_bound=9999):
     """Return 'pretty' string representation of the dictionary ``d``.
@@ -329,9 +343,50 @@ class Tracer(object):
         """
         pass
 
+    def set_kappa(self, kappa):
+        """
+        Called by BKZ tours before processing index ``kappa``.  Tracers which sample only some
+        indices use this, the default implementation does nothing.
+        """
+        pass
+
+    def merge(self, node):
+        """
+        Merge the children of the trace ``node``, e.g. collected in a worker process, into the
+        current context.  The default implementation does nothing.
+        """
+        pass
+
+
+class _NullContext(object):
+    """
+    A context which does nothing, shared by all contexts of :class:`DummyTracer`.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, exception_type, exception_value, exception_traceback):
+        pass
+
+
+_null_context = _NullContext()
+
+
+class DummyTracer(Tracer):
+    """
+    A tracer which does nothing and does not even create context objects.
+    """
+    def context(self, *args, **kwds):
+        """
+        Return the shared do-nothing context.
+        """
+        return _null_context
+
 
 # use a dummy_trace whenever no tracing is required
-dummy_tracer = Tracer(None)
+dummy_tracer = DummyTracer(None)
 
 
 class Node(object):
@@ -500,7 +555,7 @@ class Node(object):
         .. note :: The label of ``node`` is ignored.
         """
 
-        for k, v in node.data.iteritems():
+        for k, v in node.data.items():
             if k in self.data:
                 self.data[k] += v
             else:
@@ -588,7 +643,7 @@ class TimeTreeTracer(Tracer):
     Collect CPU and wall time for every context visited, creating a tree structure along the way.
     """
 
-    entries = (("cputime", time.clock), ("walltime", time.time))
+    entries = (("cputime", process_time), ("walltime", time.time))
 
     def __init__(self, instance, verbosity=False):
         """
@@ -640,7 +695,7 @@ class BKZTreeTracer(Tracer):
     """
     Default tracer for BKZ-like algorithms.
     """
-    def __init__(self, instance, verbosity=False, root_label="bkz", start_clocks=False):
+    def __init__(self, instance, verbosity=False, root_label="bkz", start_clocks=False, writer=None):
         """
         Create a new tracer instance.
 
@@ -648,10 +703,15 @@ class BKZTreeTracer(Tracer):
         :param verbosity: print information, integers ≥ 0 are also accepted
         :param root_label: label to give to root node
         :param start_clocks: start tracking time for the root node immediately
+        :param writer: if not ``None`` pass every completed tour to this object's ``write``, e.g.
+            a :class:`fpylll.tools.trace_export.TraceWriter`, which starts a new run
 
         """
 
         Tracer.__init__(self, instance, verbosity)
+        self.writer = writer
+        if writer is not None:
+            writer.new_run()
         self.trace = Node(root_label)
         self.current = self.trace
         if start_clocks:
@@ -672,7 +732,7 @@ class BKZTreeTracer(Tracer):
         """
 
         node = self.current
-        node.data["cputime"]  = node.data.get("cputime",  0) + Statistic(-time.clock(), repr="sum", count=False)
+        node.data["cputime"]  = node.data.get("cputime",  0) + Statistic(-process_time(), repr="sum", count=False)
         node.data["walltime"] = node.data.get("walltime", 0) + Statistic(-time.time(),  repr="sum", count=False)
 
     def exit(self, **kwds):
@@ -683,7 +743,7 @@ class BKZTreeTracer(Tracer):
         node = self.current
         label = node.label
 
-        node.data["cputime"] += time.clock()
+        node.data["cputime"] += process_time()
         node.data["walltime"] += time.time()
 
         if label == "enumeration":
@@ -694,37 +754,350 @@ class BKZTreeTracer(Tracer):
                     node.data["%"] = Statistic(kwds["probability"], repr="avg") + node.data.get("%", None)
                 except KeyError:
                     pass
+                stats = getattr(kwds["enum_obj"], "stats", None)
+                if stats is not None:
+                    for k, v in (("#updates", stats.updates),
+                                 ("#reductions", stats.radius_reductions),
+                                 ("enum core", stats.core_time),
+                                 ("enum python", stats.python_time)):
+                        node.data[k] = Statistic(v, repr="sum") + node.data.get(k, None)
 
         if label[0] == "tour":
             node.data["r_0"] = Statistic(self.instance.M.get_r(0, 0), repr="min")
             node.data["/"] = Statistic(self.instance.M.get_current_slope(0, self.instance.A.nrows), repr="min")
+            enum_core = node.sum("enum core")
+            if enum_core:
+                node.data["nodes/s"] = Statistic(float(node.sum("#enum"))/float(enum_core), repr="avg")
 
-        if self.verbosity and label[0] == "tour":
-            report = OrderedDict()
-            report["i"] = label[1]
-            report["cputime"] = node["cputime"]
-            report["walltime"] = node["walltime"]
-            try:
-                report["preproc"] = node.find("preprocessing", True)["cputime"]
-            except KeyError:
-                pass
-            try:
-                report["svp"] = node.find("enumeration", True)["cputime"]
-            except KeyError:
-                pass
-            report["lll"] = node.sum("cputime", label="lll")
-            try:
-                report["postproc"] = node.find("postprocessing", True)["cputime"]
-            except KeyError:
-                pass
-            try:
-                report["pruner"] = node.find("pruner", True)["cputime"]
-            except KeyError:
-                pass
-            report["r_0"] = node["r_0"]
-            report["/"] = node["/"]
-            report["#enum"] = node.sum("#enum")
+        if self.writer is not None and label[0] == "tour":
+            self.writer.write(node)
 
-            print(pretty_dict(report))
+        if self.verbosity and label[0] == "tour":
+            print(pretty_dict(_tour_report(node)))
 
         self.current = self.current.parent
+
+    def merge(self, node):
+        """
+        Merge the children of the trace ``node`` into the current context.
+
+        :param node: a :class:`Node`
+        """
+        for child in node.children:
+            self.current.child(child.label).merge(child)
+
+
+def _tour_report(node):
+    """
+    Return an ordered dictionary summarising the tour ``node`` for verbose output.
+    """
+    report = OrderedDict()
+    report["i"] = node.label[1]
+    report["cputime"] = node["cputime"]
+    report["walltime"] = node["walltime"]
+    try:
+        report["preproc"] = node.find("preprocessing", True)["cputime"]
+    except KeyError:
+        pass
+    try:
+        report["svp"] = node.find("enumeration", True)["cputime"]
+    except KeyError:
+        pass
+    report["lll"] = node.sum("cputime", label="lll")
+    try:
+        report["postproc"] = node.find("postprocessing", True)["cputime"]
+    except KeyError:
+        pass
+    try:
+        report["pruner"] = node.find("pruner", True)["cputime"]
+    except KeyError:
+        pass
+    report["r_0"] = node["r_0"]
+    report["/"] = node["/"]
+    report["#enum"] = node.sum("#enum")
+    if "nodes/s" in node.data:
+        report["nodes/s"] = node["nodes/s"]
+    return report
+
+
+def _statistic(value, repr, count):
+    """
+    Return a statistic with sum ``value`` over ``count`` observations.
+    """
+    stat = Statistic(value, repr=repr, count=False)
+    stat._ctr = count
+    return stat
+
+
+class FastNode(object):
+    """
+    A light-weight tree node with preallocated counters used by :class:`FastTreeTracer`.
+
+    Children are indexed by their label and times are integers in nanoseconds.  Use
+    :meth:`to_node` to convert a tree into the :class:`Node` representation used elsewhere.
+    """
+    __slots__ = ("label", "parent", "children", "tour", "visits", "cputime", "walltime",
+                 "enum", "enum_calls", "probability", "probability_calls", "extra", "data")
+
+    def __init__(self, label, parent=None):
+        """Create a new node.
+
+        :param label: some label such as a string or a tuple
+        :param parent: parent node
+
+        """
+        self.label = label
+        self.parent = parent
+        self.children = OrderedDict()
+        self.tour = isinstance(label, tuple) and label[0] == "tour"
+        self.visits = 0
+        self.cputime = 0
+        self.walltime = 0
+        self.enum = 0
+        self.enum_calls = 0
+        self.probability = 0.0
+        self.probability_calls = 0
+        self.extra = OrderedDict()
+        self.data = OrderedDict()
+
+    def child(self, label):
+        """
+        If node has a child labelled ``label`` return it, otherwise add a new child.
+
+        :param label: a hashable label
+
+        >>> root = FastNode("root")
+        >>> root.child("child") is root.child("child")
+        True
+
+        """
+        try:
+            return self.children[label]
+        except KeyError:
+            child = FastNode(label, self)
+            self.children[label] = child
+            return child
+
+    def add(self, tag, value):
+        """
+        Add ``value`` to the sum tagged ``tag``.
+        """
+        try:
+            entry = self.extra[tag]
+            entry[0] += value
+            entry[1] += 1
+        except KeyError:
+            self.extra[tag] = [value, 1]
+
+    def sum(self, tag):
+        """
+        Return the sum of the counter ``tag`` over this tree.
+
+        :param tag: "enum" or a tag passed to :meth:`add`
+
+        """
+        if tag == "enum":
+            r = self.enum
+        else:
+            r = self.extra.get(tag, (0, 0))[0]
+        for child in self.children.values():
+            r += child.sum(tag)
+        return r
+
+    def merge(self, node):
+        """
+        Merge the :class:`Node` tree ``node`` into self.
+
+        .. note :: The label of ``node`` is ignored.
+        """
+        for k, v in node.data.items():
+            if k == "cputime":
+                self.cputime += int(v.sum*10**9)
+                self.visits += v._ctr
+            elif k == "walltime":
+                self.walltime += int(v.sum*10**9)
+            elif k == "#enum":
+                self.enum += v.sum
+                self.enum_calls += v._ctr
+            elif k == "%":
+                self.probability += v.sum
+                self.probability_calls += v._ctr
+            elif isinstance(v, Statistic) and v._repr == "sum":
+                entry = self.extra.setdefault(k, [0, 0])
+                entry[0] += v.sum
+                entry[1] += v._ctr
+            elif k in self.data:
+                self.data[k] += v
+            else:
+                self.data[k] = v
+
+        for child in node.children:
+            self.child(child.label).merge(child)
+
+    def to_node(self, parent=None):
+        """
+        Return this tree as a :class:`Node` tree.
+
+        >>> root = FastNode("root")
+        >>> c = root.child("child")
+        >>> c.visits, c.cputime = 2, 1500000000
+        >>> print(root.to_node().report())
+        {"root": {}}
+          {"child": {"cputime": 1.500000,  "walltime": 0.000000}}
+
+        """
+        node = Node(self.label, parent)
+        if self.visits:
+            node.data["cputime"] = _statistic(self.cputime/1e9, "sum", self.visits)
+            node.data["walltime"] = _statistic(self.walltime/1e9, "sum", self.visits)
+        if self.enum_calls:
+            node.data["#enum"] = _statistic(self.enum, "sum", self.enum_calls)
+        if self.probability_calls:
+            node.data["%"] = _statistic(self.probability, "avg", self.probability_calls)
+        for k, (v, count) in self.extra.items():
+            node.data[k] = _statistic(v, "sum", count)
+        node.data.update(self.data)
+        for child in self.children.values():
+            node.add_child(child.to_node())
+        return node
+
+
+class FastTreeTracer(Tracer):
+    """
+    A low-overhead drop-in replacement for :class:`BKZTreeTracer`.
+
+    It records the same data, but uses integer nanosecond clocks, dictionary lookups for children
+    and plain counters instead of :class:`Statistic` objects while tracing.  The :class:`Node` tree
+    is only built when :attr:`trace` is accessed.
+
+    With ``sample = N`` only every ``N``-th index ``kappa`` of each tour is traced, i.e. all
+    contexts below a tour entered between ``set_kappa(kappa)`` with ``kappa % N != 0`` and the next
+    call to ``set_kappa`` are skipped without reading any clocks.  Tours themselves are always
+    traced.  Counters of sampled contexts are not rescaled.
+    """
+    def __init__(self, instance, verbosity=False, root_label="bkz", start_clocks=False, sample=1,
+                 writer=None):
+        """
+        Create a new tracer instance.
+
+        :param instance: BKZ-like object instance
+        :param verbosity: print information, integers ≥ 0 are also accepted
+        :param root_label: label to give to root node
+        :param start_clocks: start tracking time for the root node immediately
+        :param sample: trace every ``sample``-th index of a tour
+        :param writer: see :class:`BKZTreeTracer`
+
+        """
+        if sample < 1:
+            raise ValueError("Sampling rate must be ≥ 1 but got %d"%sample)
+        Tracer.__init__(self, instance, verbosity)
+        self.sample = sample
+        self.writer = writer
+        if writer is not None:
+            writer.new_run()
+        self.root = FastNode(root_label)
+        self.current = self.root
+        self._skip = 0
+        self._record = True
+        if start_clocks:
+            self.reenter()
+
+    @property
+    def trace(self):
+        """
+        The :class:`Node` tree recorded so far.  A new tree is built on every access.
+        """
+        return self.root.to_node()
+
+    def set_kappa(self, kappa):
+        """
+        Decide whether contexts for index ``kappa`` are traced.
+
+        :param kappa: current index, only considered directly below a tour
+        """
+        if self.current.tour:
+            self._record = kappa % self.sample == 0
+
+    def enter(self, label, **kwds):
+        """Enter new context with label
+
+        :param label: a hashable label
+
+        """
+        if self._skip:
+            self._skip += 1
+            return
+        current = self.current
+        if current.tour and not self._record:
+            self._skip = 1
+            return
+        node = current.child(label)
+        if node.tour:
+            self._record = True
+        self.current = node
+        node.visits += 1
+        node.cputime -= process_time_ns()
+        node.walltime -= perf_counter_ns()
+
+    def reenter(self, **kwds):
+        """Reenter current context, i.e. restart clocks
+
+        """
+        node = self.current
+        node.visits += 1
+        node.cputime -= process_time_ns()
+        node.walltime -= perf_counter_ns()
+
+    def exit(self, **kwds):
+        """
+        Record CPU and wall time as well as the same data as :class:`BKZTreeTracer` for
+        "enumeration" and "tour" labels.  When the label is a tour then the status is printed if
+        verbosity > 0.
+        """
+        if self._skip:
+            self._skip -= 1
+            return
+        node = self.current
+        node.cputime += process_time_ns()
+        node.walltime += perf_counter_ns()
+
+        if node.tour:
+            M = self.instance.M
+            node.data["r_0"] = Statistic(M.get_r(0, 0), repr="min")
+            node.data["/"] = Statistic(M.get_current_slope(0, self.instance.A.nrows), repr="min")
+            enum_core = node.sum("enum core")
+            if enum_core:
+                node.data["nodes/s"] = Statistic(float(node.sum("enum"))/float(enum_core), repr="avg")
+            if self.writer is not None or self.verbosity:
+                tour = node.to_node()
+                if self.writer is not None:
+                    self.writer.write(tour)
+                if self.verbosity:
+                    print(pretty_dict(_tour_report(tour)))
+        elif node.label == "enumeration" and kwds.get("full", True):
+            enum_obj = kwds["enum_obj"]
+            node.enum += enum_obj.get_nodes()
+            node.enum_calls += 1
+            probability = kwds.get("probability", None)
+            if probability is not None:
+                node.probability += probability
+                node.probability_calls += 1
+            stats = getattr(enum_obj, "stats", None)
+            if stats is not None:
+                node.add("#updates", stats.updates)
+                node.add("#reductions", stats.radius_reductions)
+                node.add("enum core", stats.core_time)
+                node.add("enum python", stats.python_time)
+
+        self.current = node.parent
+
+    def merge(self, node):
+        """
+        Merge the children of the trace ``node`` into the current context.
+
+        :param node: a :class:`Node`
+        """
+        if self._skip:
+            return
+        for child in node.children:
+            self.current.child(child.label).merge(child)
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+Block-parallel BKZ reduction.
+
+Each tour splits the basis into non-overlapping windows of ``window`` rows.  For every window
+``[κ, κ+w)`` an integral approximation of the projected block `π_κ(b_κ), …, π_κ(b_{κ+w-1})` is
+BKZ reduced in a worker process, which returns the unimodular transformation it applied.  These
+transformations are then applied to rows ``κ`` to ``κ+w`` of the basis.  Since the windows are
+disjoint, all transformations computed from the same Gram-Schmidt orthogonalisation can be
+applied together: transforming the rows of one window changes neither the rows of another window
+nor the span of the rows before it.  The basis is LLL reduced afterwards.  Windows are shifted by
+``stagger`` rows in every tour so that vectors cross window boundaries, as in slide reduction or
+pipelined BKZ.
+
+This uses up to ``d/window`` cores in dimension ``d`` even when a single SVP call is too small to
+be worth parallelising, at the price of weaker reduction per tour than a sequential BKZ tour.
+
+..  moduleauthor:: Martin R.  Albrecht <martinralbrecht+fpylll@googlemail.com>
+
+    >>> from fpylll import IntegerMatrix, BKZ, LLL, set_random_seed
+    >>> from fpylll.algorithms.block_parallel import BKZReduction
+    >>> set_random_seed(1337)
+    >>> A = IntegerMatrix.random(80, "qary", k=40, bits=20)
+    >>> bkz = BKZReduction(A, ncores=2)
+    >>> _ = bkz(BKZ.Param(10, strategies=BKZ.DEFAULT_STRATEGY, flags=BKZ.MAX_LOOPS, max_loops=4))
+    >>> LLL.is_reduced(A)
+    True
+
+"""
+
+from __future__ import absolute_import
+from math import ldexp, log, sqrt
+import multiprocessing
+
+from fpylll import BKZ, GSO, IntegerMatrix, LLL
+from fpylll.algorithms.bkz import BKZReduction as BKZBase
+from fpylll.algorithms.bkz_stats import dummy_tracer
+
+
+def projected_block(M, kappa, block_size, bits=40):
+    """Return an integral approximation of the projected block starting at ``kappa``.
+
+    The result is a lower-triangular basis of the lattice spanned by `π_κ(b_κ), …,
+    π_κ(b_{κ+β-1})` in the coordinates of the Gram-Schmidt vectors, scaled such that its
+    smallest diagonal entry has about ``bits`` bits and rounded.  A transformation which reduces
+    it can be applied to rows ``kappa`` to ``kappa + block_size`` of the basis of ``M``.
+
+    :param M: GSO object, the GSO must be up to date
+    :param kappa: first row of the block
+    :param block_size: number of rows of the block
+    :param bits: precision of the approximation
+
+    """
+    try:
+        import numpy
+        from fpylll.numpy import dump_mu, dump_r
+    except ImportError:
+        r = [sqrt(M.get_r(kappa + i, kappa + i)) for i in range(block_size)]
+        scale = bits - int(log(min(r), 2))
+
+        B = IntegerMatrix(block_size, block_size)
+        for i in range(block_size):
+            for j in range(i):
+                B[i, j] = int(round(ldexp(M.get_mu(kappa + i, kappa + j) * r[j], scale)))
+            B[i, i] = int(round(ldexp(r[i], scale)))
+        return B
+
+    r = numpy.sqrt(dump_r(M, kappa, block_size))
+    scale = bits - int(log(r.min(), 2))
+    # μ_{i,j}·‖b*_j‖ below the diagonal, ‖b*_i‖ on it
+    L = numpy.tril(dump_mu(M, kappa, block_size), -1) * r[None, :]
+    L[numpy.diag_indices(block_size)] = r
+    L = numpy.rint(numpy.ldexp(L, scale))
+    if abs(L).max() < 2.0**62:
+        return IntegerMatrix.from_numpy(L.astype(numpy.int64))
+    return IntegerMatrix.from_matrix([[int(x) for x in row] for row in L.tolist()])
+
+
+def _reduce_block(task):
+    """BKZ reduce a block, typically called in a worker process.
+
+    :param task: a pair ``(B, params)`` of an integer matrix and BKZ parameters
+    :returns: the transformation matrix ``U`` such that ``U·B`` is reduced
+
+    """
+    B, params = task
+    U = IntegerMatrix.identity(B.nrows)
+    M = GSO.Mat(B, U=U, flags=GSO.ROW_EXPO)
+    L = LLL.Reduction(M)
+    BKZ.Reduction(M, L, params)()
+    return U
+
+
+class BKZReduction(BKZBase):
+    """
+    BKZ with tours over disjoint windows which are reduced in parallel.
+    """
+    def __init__(self, A, ncores=2, window=None, stagger=None, bits=40):
+        """Create new BKZ object.
+
+        :param A: an integer matrix, a GSO object or an LLL object
+        :param ncores: number of worker processes, with ``1`` blocks are reduced in this process
+        :param window: number of rows per window, ``None`` for twice the block size
+        :param stagger: shift of the windows between tours, ``None`` for half the window size
+        :param bits: precision of the projected blocks, see :func:`projected_block`
+
+        """
+        self.ncores = ncores
+        self.window = window
+        self.stagger = stagger
+        self.bits = bits
+        self.pool = None
+        self.offset = 0
+        self._clean = False
+        BKZBase.__init__(self, A)
+        if self.M.inverse_transform_enabled:
+            raise ValueError("Block-parallel reduction does not support inverse transformation matrices.")
+
+    def __call__(self, params, min_row=0, max_row=-1, tracer=None, checkpoint=None):
+        """Run the BKZ algorithm with parameters `param`.
+
+        ``params.block_size`` is the block size used to reduce each window.  Of the flags only
+        ``BKZ.GH_BND`` is used for windows, which are reduced until ``BKZ.AUTO_ABORT`` triggers;
+        all flags apply to the tours over windows.  The pool of workers is started on the first
+        tour and stopped before returning.
+
+        :param params: BKZ parameters
+        :param min_row: start processing in this row
+        :param max_row: stop processing in this row (exclusive)
+        :param tracer: see :meth:`fpylll.algorithms.bkz.BKZReduction.__call__`
+        :param checkpoint: see :meth:`fpylll.algorithms.bkz.BKZReduction.__call__`
+
+        """
+        if self._state is None:
+            self.offset, self._clean = 0, False
+        else:
+            self.offset, self._clean = self._state.get("offset", 0), self._state.get("clean", False)
+        try:
+            return BKZBase.__call__(self, params, min_row, max_row, tracer, checkpoint)
+        finally:
+            self.close()
+
+    def checkpoint_state(self):
+        """
+        Return the shift of the windows and whether the last tour was clean.
+        """
+        state = BKZBase.checkpoint_state(self)
+        state.update({"offset": self.offset, "clean": self._clean})
+        return state
+
+    def close(self):
+        """
+        Stop the pool of workers, if any.
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    @staticmethod
+    def windows(min_row, max_row, window, offset=0):
+        """Return the windows of a tour as pairs ``(kappa, size)``.
+
+        Window boundaries are at ``min_row + offset + i·window``.  Windows with fewer than two rows
+        are skipped.
+
+        :param min_row: start index ≥ 0
+        :param max_row: last index ≤ n
+        :param window: number of rows per window
+        :param offset: shift of the window boundaries
+
+        >>> BKZReduction.windows(0, 10, 4)
+        [(0, 4), (4, 4), (8, 2)]
+        >>> BKZReduction.windows(0, 10, 4, 2)
+        [(0, 2), (2, 4), (6, 4)]
+
+        """
+        offset %= window
+        bounds = [min_row] + list(range(min_row + (offset or window), max_row, window)) + [max_row]
+        return [(a, b - a) for a, b in zip(bounds, bounds[1:]) if b - a >= 2]
+
+    def reduce_blocks(self, tasks, worker=_reduce_block):
+        """Reduce blocks in the pool of workers.
+
+        :param tasks: a list of arguments for ``worker``, by default pairs ``(B, params)``
+        :param worker: a module-level function called on each task in a worker process
+        :returns: a list of the return values of ``worker``, by default transformation matrices
+
+        """
+        if self.ncores < 2 or len(tasks) < 2:
+            return [worker(task) for task in tasks]
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.ncores)
+        return self.pool.map(worker, tasks)
+
+    def apply_transform(self, U, kappa):
+        """Apply the transformation ``U`` to rows ``kappa`` to ``kappa + U.nrows`` of the basis.
+
+        :param U: a unimodular integer matrix
+        :param kappa: first row
+
+        """
+        with self.M.row_ops(kappa, kappa + U.nrows):
+            self.A.apply_transform(U, kappa)
+            if self.M.transform_enabled:
+                self.M.U.apply_transform(U, kappa)
+
+    def tour(self, params, min_row=0, max_row=-1, tracer=dummy_tracer):
+        """One tour over disjoint windows.
+
+        :param params: BKZ parameters
+        :param min_row: start index ≥ 0
+        :param max_row: last index ≤ n
+
+        :returns: ``True`` if neither this nor the previous tour made a change and ``False``
+            otherwise
+        """
+        if max_row == -1:
+            max_row = self.A.nrows
+
+        window = self.window or 2*params.block_size
+        stagger = self.stagger or max(window//2, 1)
+        windows = self.windows(min_row, max_row, window, self.offset)
+        self.offset += stagger
+
+        block_params = params.new(block_size=min(params.block_size, window),
+                                  flags=params.flags & BKZ.GH_BND, auto_abort=True,
+                                  max_loops=0, max_time=0, dump_gso_filename=None)
+
+        with tracer.context("preprocessing"):
+            self.M.update_gso()
+            tasks = [(projected_block(self.M, kappa, size, self.bits), block_params)
+                     for kappa, size in windows]
+
+        with tracer.context("reduction"):
+            transforms = self.reduce_blocks(tasks)
+
+        clean = True
+        with tracer.context("postprocessing"):
+            for (kappa, size), U in zip(windows, transforms):
+                if U == IntegerMatrix.identity(size):
+                    continue
+                clean = False
+                self.apply_transform(U, kappa)
+
+        with tracer.context("lll"):
+            self.lll_obj(min_row, min_row, max_row)
+
+        # windows move between tours, so one clean tour does not mean the basis is reduced
+        clean, self._clean = clean and self._clean, clean
+        return clean
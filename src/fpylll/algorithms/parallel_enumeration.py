@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Parallel enumeration by splitting the enumeration tree.
+
+The top ``split_level`` coordinates of the search tree are enumerated first.  Each resulting
+prefix defines a subtree, which is enumerated using the ``subtree`` parameter of
+:meth:`fpylll.Enumeration.enumerate` by a pool of threads.  Enumeration releases the GIL and each
+thread works on its own copy of the GSO object, so threads run concurrently.  Whenever a thread
+finishes a subtree the best radius found so far is shared with all threads and used for all
+subtrees started after that point.
+
+..  moduleauthor:: Martin R.  Albrecht <martinralbrecht+fpylll@googlemail.com>
+
+    >>> from fpylll import IntegerMatrix, GSO, LLL, Enumeration, set_random_seed
+    >>> from fpylll.algorithms.parallel_enumeration import ParallelEnumeration
+    >>> set_random_seed(1337)
+    >>> A = LLL.reduction(IntegerMatrix.random(40, "qary", k=20, bits=20))
+    >>> M = GSO.Mat(A)
+    >>> _ = M.update_gso()
+    >>> _, d0 = Enumeration(M).enumerate(0, 40, M.get_r(0, 0), 0)[0]
+    >>> _, d1 = ParallelEnumeration(M, workers=4).enumerate(0, 40, M.get_r(0, 0), 0)[0]
+    >>> d0 == d1
+    True
+
+"""
+
+from __future__ import absolute_import
+import threading
+
+from fpylll import Enumeration, EnumerationError, GSO, IntegerMatrix
+from fpylll.fplll.enumeration import EvaluatorStrategy
+from fpylll.util import get_precision, precision
+
+try:
+    from multiprocessing import cpu_count
+except ImportError:
+    def cpu_count():
+        return 1
+
+
+def _copy_gso(M, prec=0):
+    """
+    Return a GSO object on a copy of the basis of ``M`` with the same flags and float type.
+
+    :param M: GSO object
+    :param prec: MPFR precision, ignored unless the float type of ``M`` is ``'mpfr'``
+
+    """
+    flags = GSO.DEFAULT
+    if M.int_gram_enabled:
+        flags |= GSO.INT_GRAM
+    if M.row_expo_enabled:
+        flags |= GSO.ROW_EXPO
+    if M.float_type == "mpfr":
+        with precision(prec):
+            N = GSO.Mat(IntegerMatrix(M.B), float_type=M.float_type, flags=flags)
+    else:
+        N = GSO.Mat(IntegerMatrix(M.B), float_type=M.float_type, flags=flags)
+    N.update_gso()
+    return N
+
+
+class ParallelEnumeration(object):
+    """
+    Enumeration with the search tree split across several threads.
+    """
+    def __init__(self, M, nr_solutions=1, workers=None, jobs_per_worker=16):
+        """Create new parallel enumeration object.
+
+        :param M: GSO object, the GSO must be up to date
+        :param nr_solutions: number of solutions to return
+        :param workers: number of threads, ``None`` for the number of CPUs
+        :param jobs_per_worker: the split level is chosen such that there are at least this many
+            subtrees per thread to balance the load
+
+        """
+        self.M = M
+        self.nr_solutions = nr_solutions
+        self.workers = workers if workers is not None else cpu_count()
+        self.jobs_per_worker = jobs_per_worker
+        self._nodes = 0
+        self.split_level = 0
+
+    def get_nodes(self):
+        """Return number of visited nodes in last enumeration call, summed over all threads.
+        """
+        return self._nodes
+
+    def subtrees(self, first, last, max_dist, max_dist_expo, pruning=None, split_level=None):
+        """Return prefixes of the search tree for the top ``split_level`` coordinates.
+
+        Prefixes are lists of coordinates for rows ``last-split_level`` to ``last`` (exclusive),
+        sorted by the length of the projection they define.  Only one of ``x`` and ``-x`` is
+        included and the zero prefix comes first.
+
+        :param first: first row
+        :param last: last row (exclusive)
+        :param max_dist: length bound
+        :param max_dist_expo: exponent of length bound
+        :param pruning: pruning coefficients or ``None``
+        :param split_level: number of fixed coordinates or ``None`` to choose one such that there
+            are ``jobs_per_worker`` subtrees per worker; with an explicit split level all prefixes
+            are returned, however many there are
+
+        """
+        d = last - first
+        jobs = self.workers * self.jobs_per_worker
+        limit = 64 * jobs
+
+        def prefixes(level, limit):
+            if pruning:
+                # pruning[0] bounds the top level, which is enumerated first
+                pruning_ = list(pruning)[:level]
+            else:
+                pruning_ = None
+            enum_obj = Enumeration(self.M, nr_solutions=limit,
+                                   strategy=EvaluatorStrategy.BEST_N_SOLUTIONS)
+            try:
+                solutions = enum_obj.enumerate(last-level, last, max_dist, max_dist_expo,
+                                               pruning=pruning_)
+            except EnumerationError:
+                solutions = []
+            self._nodes += enum_obj.get_nodes()
+            subtrees = [[0.0]*level]
+            subtrees += [list(solution) for solution, dist in sorted(solutions, key=lambda x: x[1])]
+            return subtrees
+
+        if split_level is not None:
+            if not 0 <= split_level < d:
+                raise ValueError("Split level must be between 0 and %d but got %d"%(d-1, split_level))
+            if not split_level:
+                return [[]]
+            while True:
+                candidates = prefixes(split_level, limit)
+                if len(candidates) <= limit:
+                    return candidates
+                # the enumeration of prefixes was cut short, dropping subtrees would miss solutions
+                limit *= 2
+
+        subtrees = [[]]
+        for level in range(1, d):
+            candidates = prefixes(level, limit)
+            if len(candidates) > limit:
+                # the enumeration of prefixes was cut short, so this list is incomplete
+                break
+            subtrees = candidates
+            if len(subtrees) >= jobs:
+                break
+        return subtrees
+
+    def enumerate(self, first, last, max_dist, max_dist_expo,
+                  pruning=None, split_level=None):
+        """Run SVP enumeration on ``M`` in parallel.
+
+        :param first: first row
+        :param last: last row (exclusive)
+        :param max_dist: length bound
+        :param max_dist_expo: exponent of length bound
+        :param pruning: pruning coefficients or ``None``
+        :param split_level: number of coordinates fixed per subtree or ``None`` to choose
+            automatically, see :meth:`subtrees`
+        :returns: list of pairs containing the solutions and their lengths, shortest first
+
+        """
+        self._nodes = 0
+
+        subtrees = self.subtrees(first, last, max_dist, max_dist_expo, pruning, split_level)
+        self.split_level = len(subtrees[0])
+
+        state = {"next": 0, "radius": max_dist, "nodes": 0, "error": None}
+        solutions = {}
+        lock = threading.Lock()
+        prec = get_precision()
+
+        def worker():
+            try:
+                M = _copy_gso(self.M, prec)
+                enum_obj = Enumeration(M, nr_solutions=self.nr_solutions)
+                while True:
+                    with lock:
+                        if state["next"] == len(subtrees) or state["error"] is not None:
+                            return
+                        subtree = subtrees[state["next"]]
+                        state["next"] += 1
+                        radius = state["radius"]
+                    try:
+                        found = enum_obj.enumerate(first, last, radius, max_dist_expo,
+                                                   subtree=subtree or None, pruning=pruning)
+                    except EnumerationError:
+                        found = []
+                    with lock:
+                        state["nodes"] += enum_obj.get_nodes()
+                        for solution, dist in found:
+                            solutions[solution] = dist
+                        if len(solutions) >= self.nr_solutions:
+                            dist = sorted(solutions.values())[self.nr_solutions-1]
+                            state["radius"] = min(state["radius"], dist)
+            except Exception as e:
+                with lock:
+                    state["error"] = e
+
+        threads = [threading.Thread(target=worker) for _ in range(min(self.workers, len(subtrees)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self._nodes += state["nodes"]
+        if state["error"] is not None:
+            raise state["error"]
+        if not solutions:
+            raise EnumerationError("No vector found.")
+
+        solutions = sorted(solutions.items(), key=lambda x: x[1])[:self.nr_solutions]
+        return [[solution, dist] for solution, dist in solutions]
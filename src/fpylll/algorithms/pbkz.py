@@ -2,35 +2,263 @@
 """
 Parallel BKZ reduction.
 
-..  note :: This code only offers a noticeable performance improvement in block size 70 or so.
-   Hence, it will simply call the sequential code for smaller block sizes.
+SVP calls are distributed over a pool of worker processes which is started once per BKZ call and
+reused across all indices and tours.  Each worker keeps its own copy of the basis and its GSO.
+Before each SVP call only the rows which changed since the last call are sent to the workers.
+
+..  note :: Below ``min_block_size`` the sequential code is used, since enumeration in small
+   blocks is too fast to amortise the communication.
 """
 
-import os
+from __future__ import absolute_import
 import random
 import multiprocessing
 
-from fpylll import BKZ, Enumeration, EnumerationError
+from fpylll import BKZ, GSO, Enumeration, EnumerationError, IntegerMatrix
 from fpylll.algorithms.bkz import BKZReduction as BKZ1
 from fpylll.algorithms.bkz2 import BKZReduction as BKZ2
 from fpylll.algorithms.bkz_stats import BKZTreeTracer, dummy_tracer
-from fpylll.util import adjust_radius_to_gh_bound
+from fpylll.util import adjust_radius_to_gh_bound, get_precision, set_precision
+
+
+def _limbs(A):
+    """
+    Number of 64-bit limbs sufficient for all entries of ``A``.
+    """
+    return (max(A.get_max_exp(), 0) + 63) // 64
+
+
+def _export_rows(A, start, stop, limbs):
+    buf = bytearray(8 * (limbs + 1) * (stop - start) * A.ncols)
+    A.export_rows(buf, limbs, start, stop)
+    return buf
+
+
+def _changed_rows(a, b, n, width):
+    """Return ``(lo, hi)`` such that the buffers ``a`` and ``b`` of ``n`` rows of ``width`` bytes
+    each agree outside of rows ``lo`` to ``hi``.
+
+    :param a: a buffer written by ``IntegerMatrix.export_rows``
+    :param b: a buffer of the same size written with the same number of limbs
+
+    """
+    a, b = memoryview(a), memoryview(b)
+    if a == b:
+        return n, n
+
+    def equal(i):
+        return a[i*width:(i+1)*width] == b[i*width:(i+1)*width]
+
+    lo = 0
+    while lo < n and equal(lo):
+        lo += 1
+    hi = n
+    while hi > lo and equal(hi-1):
+        hi -= 1
+    return lo, hi
+
+
+def _svp_worker(connection, s, float_type="double", precision=0):
+    """Serve SVP calls until ``None`` is received.
+
+    Each request is a tuple ``(delta, params, task)`` where ``delta`` is ``None`` or a tuple ``(lo,
+    hi, limbs, rows)`` of rows to overwrite before running ``task``, ``params`` is a list of BKZ
+    parameters to append to those received so far and ``task`` is ``None`` or a tuple ``(kappa,
+    block_size, index, rerandomize, seed)`` where ``index`` refers to the BKZ parameters received
+    so far.  Parameters are thus sent only once per pool.  Preprocessing may LLL reduce all
+    rows up to the end of the block, so after each SVP call rows ``0`` to ``kappa + block_size``
+    are restored and the basis of the worker always matches the basis last sent by the parent.
+
+    :param connection: end of a ``multiprocessing.Pipe``
+    :param s: basis serialised with ``IntegerMatrix.to_bytes``
+    :param float_type: floating point type of the GSO object
+    :param precision: MPFR precision, ignored unless ``float_type`` is ``'mpfr'``
+
+    """
+    if float_type == "mpfr" and precision:
+        set_precision(precision)
+    A = IntegerMatrix.from_bytes(s)
+    M = GSO.Mat(A, float_type=float_type, flags=GSO.ROW_EXPO)
+    M.update_gso()
+    bkz = BKZReduction(M, ncores=1)
+    params = []
+
+    while True:
+        request = connection.recv()
+        if request is None:
+            break
+        delta, new_params, task = request
+        params.extend(new_params)
+
+        if delta is not None:
+            lo, hi, limbs, rows = delta
+            with M.row_ops(lo, hi):
+                A.import_rows(rows, limbs, lo, hi)
+        if task is None:
+            continue
+
+        kappa, block_size, index, rerandomize, seed = task
+
+        random.seed(seed)
+        limbs = _limbs(A)
+        rows = _export_rows(A, 0, kappa + block_size, limbs)
+        ret = bkz.parallel_svp_reduction_worker(kappa, block_size, params[index], rerandomize)
+        with M.row_ops(0, kappa + block_size):
+            A.import_rows(rows, limbs, 0, kappa + block_size)
+
+        connection.send(ret)
+    connection.close()
+
+
+class SVPPool(object):
+    """
+    A pool of processes running SVP calls on their own copies of a basis.
+    """
+    def __init__(self, A, ncores, float_type="double", precision=0):
+        """Start ``ncores`` workers, each holding a copy of ``A``.
+
+        :param A: an integer matrix
+        :param ncores: number of worker processes
+        :param float_type: floating point type of the GSO objects of the workers
+        :param precision: MPFR precision, ignored unless ``float_type`` is ``'mpfr'``
+
+        """
+        self.ncores = ncores
+        # the basis held by the workers, exported with export_rows so that rows of the current
+        # basis can be compared as byte strings without converting entries to Python integers
+        self._shape = (A.nrows, A.ncols)
+        self._limbs = _limbs(A)
+        self._synced = _export_rows(A, 0, A.nrows, self._limbs)
+        self._params = []
+        self._sent = 0
+        self._connections = []
+        self._processes = []
+
+        s = A.to_bytes()
+        for i in range(ncores):
+            parent_connection, child_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_svp_worker, args=(child_connection, s, float_type, precision))
+            process.daemon = True
+            process.start()
+            child_connection.close()
+            self._connections.append(parent_connection)
+            self._processes.append(process)
+
+    def sync(self, A):
+        """Return the rows of ``A`` which differ from the basis held by the workers.
+
+        :param A: an integer matrix of the same dimensions as the one passed to the constructor
+        :returns: ``None`` or a tuple ``(lo, hi, limbs, rows)``
+
+        """
+        if (A.nrows, A.ncols) != self._shape:
+            raise ValueError("Dimension mismatch.")
+        n = A.nrows
+        limbs = _limbs(A)
+        if limbs > self._limbs:
+            # rare, entries only grow beyond the limbs of the initial basis in LLL
+            B = IntegerMatrix(*self._shape)
+            B.import_rows(self._synced, self._limbs)
+            self._limbs = limbs
+            self._synced = _export_rows(B, 0, n, limbs)
+
+        width = 8 * (self._limbs + 1) * A.ncols
+        a = _export_rows(A, 0, n, self._limbs)
+        lo, hi = _changed_rows(a, self._synced, n, width)
+        if lo == hi:
+            return None
+        self._synced[lo*width:hi*width] = a[lo*width:hi*width]
+        return lo, hi, self._limbs, bytes(a[lo*width:hi*width])
+
+    def _index(self, params):
+        """
+        Return the index of ``params`` in the list of parameters shared with the workers.
+        """
+        for i, params_ in enumerate(self._params):
+            if params_ is params:
+                return i
+        self._params.append(params)
+        return len(self._params) - 1
+
+    def map(self, A, tasks):
+        """Run one SVP call per task, task ``i`` on worker ``i``.
+
+        :param A: current basis, workers are updated to match it first
+        :param tasks: at most ``ncores`` tuples ``(kappa, block_size, params, rerandomize, seed)``
+        :returns: a list of tuples ``(solution, max_dist, trace, probability)``
+
+        """
+        if len(tasks) > self.ncores:
+            raise ValueError("Got %d tasks but only have %d workers."%(len(tasks), self.ncores))
+        delta = self.sync(A)
+        tasks = [(kappa, block_size, self._index(params), rerandomize, seed)
+                 for kappa, block_size, params, rerandomize, seed in tasks]
+        new_params, self._sent = self._params[self._sent:], len(self._params)
+        for connection, task in zip(self._connections, tasks):
+            connection.send((delta, new_params, task))
+        # workers which did not receive a task must still see the delta and the parameters
+        for connection in self._connections[len(tasks):]:
+            if delta is not None or new_params:
+                connection.send((delta, new_params, None))
+        return [connection.recv() for connection in self._connections[:len(tasks)]]
+
+    def close(self):
+        """
+        Stop all workers.
+        """
+        for connection in self._connections:
+            try:
+                connection.send(None)
+            except (IOError, OSError):
+                pass
+            connection.close()
+        for process in self._processes:
+            process.join()
+        self._connections, self._processes = [], []
 
 
 class BKZReduction(BKZ2):
     """
     BKZ 2.0 with parallel SVP reduction.
     """
-    def __init__(self, A, ncores=2):
+    def __init__(self, A, ncores=2, min_block_size=40):
         """Create new BKZ object.
 
         :param A: an integer matrix, a GSO object or an LLL object
         :param ncores: number of cores to use
+        :param min_block_size: use sequential SVP reduction below this block size
 
         """
         self.ncores = ncores
+        self.min_block_size = min_block_size
+        self.pool = None
         BKZ2.__init__(self, A)
 
+    def __call__(self, params, min_row=0, max_row=-1, tracer=None, checkpoint=None):
+        """Run the BKZ algorithm with parameters `param`.
+
+        The pool of workers is started on the first parallel SVP call and stopped before returning.
+
+        :param params: BKZ parameters
+        :param min_row: start processing in this row
+        :param max_row: stop processing in this row (exclusive)
+        :param tracer: see :meth:`fpylll.algorithms.bkz.BKZReduction.__call__`
+        :param checkpoint: see :meth:`fpylll.algorithms.bkz.BKZReduction.__call__`
+
+        """
+        try:
+            return BKZ2.__call__(self, params, min_row, max_row, tracer, checkpoint)
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Stop the pool of workers, if any.
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
     def svp_preprocessing(self, kappa, block_size, param, tracer=dummy_tracer):
         """
         Run sequential BKZ 2.0 preprocessing.
@@ -66,6 +294,7 @@ class BKZReduction(BKZ2):
         clean = True
 
         for kappa in range(min_row, max_row-2):
+            tracer.set_kappa(kappa)
             block_size = min(params.block_size, max_row - kappa)
             clean &= self.parallel_svp_reduction(kappa, block_size, params, tracer)
 
@@ -73,7 +302,7 @@ class BKZReduction(BKZ2):
 
     def parallel_svp_reduction_worker(self, kappa, block_size, params, rerandomize):
         """
-        One SVP reduction, typically called in a worker process after forking.
+        One SVP reduction, typically called in a worker process of :class:`SVPPool`.
 
         :param kappa: current index
         :param block_size: block size
@@ -128,13 +357,18 @@ class BKZReduction(BKZ2):
         :param params: BKZ parameters
         :param tracer: object for maintaining statistics
 
-        .. note: This function uses for to parallelise.
+        .. note: This function uses a pool of worker processes to parallelise.
 
         """
-        # calling fork is expensive so we simply revert to the sequential code for small block sizes
-        if block_size < 70:
+        # communication has a cost so we simply revert to the sequential code for small block sizes
+        if block_size < self.min_block_size or self.ncores < 2:
             return self.svp_reduction(kappa, block_size, params, tracer=tracer)
 
+        if self.pool is None:
+            float_type = self.M.float_type
+            self.pool = SVPPool(self.A, self.ncores, float_type,
+                                get_precision() if float_type == "mpfr" else 0)
+
         self.lll_obj.size_reduction(0, kappa+1)
         old_first, old_first_expo = self.M.get_r_exp(kappa, kappa)
 
@@ -145,24 +379,15 @@ class BKZReduction(BKZ2):
             with tracer.context("lll"):
                 self.lll_obj(0, 0, kappa + block_size)
 
-            pipes = []
+            tasks = []
             for i in range(self.ncores):
-                parent_connection, child_connection = multiprocessing.Pipe()
-                pipes.append(parent_connection)
-
-                pid = os.fork()
-                if pid == 0:
-                    random.seed(os.getpid()+random.randint(0, 1<<20))
-                    ret = self.parallel_svp_reduction_worker(kappa, block_size, params, True if i>0 else rerandomize)
-                    child_connection.send(ret)
-                    os._exit(0)
+                tasks.append((kappa, block_size, params, True if i > 0 else rerandomize,
+                              random.randint(0, 1<<30)))
 
             solutions, rerandomize = set(), True
-            for i in range(self.ncores):
-                solution, length, trace, probability = pipes[i].recv()
+            for solution, length, trace, probability in self.pool.map(self.A, tasks):
                 remaining_probability *= (1 - probability)
-                for child in trace.children:
-                    tracer.current.child(child.label).merge(child)
+                tracer.merge(trace)
                 if solution:
                     rerandomize = False
                     solutions.add((solution, length))
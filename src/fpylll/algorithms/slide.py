@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+Parallel slide reduction.
+
+Slide reduction [GN08]_ splits the basis into blocks of ``block_size`` rows.  A tour first
+SVP-reduces all primal blocks ``[iβ, (i+1)β)`` until none of them changes, and then dual SVP-reduces
+all shifted blocks ``[iβ+1, (i+1)β+1)``.  The blocks of each phase are disjoint, so each phase
+reduces all of its blocks at once in a pool of worker processes, on integral approximations of the
+projected blocks as in :mod:`fpylll.algorithms.block_parallel`.  The parent process applies the
+returned transformations and LLL reduces the basis between phases.  Tours stop when the slide
+potential no longer decreases, as in fplll's ``BKZ.SLD_RED``.
+
+SVP calls in workers use BKZ 2.0 preprocessing and pruning as in :mod:`fpylll.algorithms.bkz2` and
+are traced with :class:`fpylll.algorithms.bkz_stats.BKZTreeTracer`.  Their traces are merged into
+the trace of the tour, so traces have the same shape as those of :mod:`fpylll.algorithms.bkz2`.
+
+.. [GN08] Gama, N. and Nguyen, P. Q.  Finding short lattice vectors within Mordell's inequality.
+   STOC 2008.
+
+..  moduleauthor:: Martin R.  Albrecht <martinralbrecht+fpylll@googlemail.com>
+
+    >>> from fpylll import IntegerMatrix, BKZ, LLL, set_random_seed
+    >>> from fpylll.algorithms.slide import SlideReduction
+    >>> set_random_seed(1337)
+    >>> A = IntegerMatrix.random(60, "qary", k=30, bits=20)
+    >>> slide = SlideReduction(A, ncores=2)
+    >>> _ = slide(BKZ.Param(10, strategies=BKZ.DEFAULT_STRATEGY, flags=BKZ.MAX_LOOPS, max_loops=4))
+    >>> LLL.is_reduced(A)
+    True
+    >>> slide.trace.sum("#enum") > 0
+    True
+
+"""
+
+from __future__ import absolute_import
+from math import ldexp
+import random
+
+from fpylll import BKZ, GSO, Enumeration, EnumerationError, IntegerMatrix
+from fpylll.algorithms.block_parallel import BKZReduction as BlockParallel, projected_block
+from fpylll.algorithms.bkz2 import BKZReduction as BKZ2
+from fpylll.algorithms.bkz_stats import BKZTreeTracer, dummy_tracer
+from fpylll.util import set_random_seed
+
+
+def dsvp_reduction(bkz, kappa, block_size, params, tracer=dummy_tracer):
+    """Make the last Gram-Schmidt vector of a block as long as possible.
+
+    Runs the preprocessing of ``bkz``, then searches for a shortest vector in the dual of the
+    projected block and inserts it with ``BKZ.Reduction.dsvp_postprocessing``.
+
+    :param bkz: a :class:`fpylll.algorithms.bkz2.BKZReduction` object
+    :param kappa: current index
+    :param block_size: block size
+    :param params: BKZ parameters
+    :param tracer: object for maintaining statistics
+    :returns: ``True`` if no change was made and ``False`` otherwise
+
+    """
+    M = bkz.M
+    with tracer.context("preprocessing"):
+        with tracer.context("reduction"):
+            clean = bkz.svp_preprocessing(kappa, block_size, params, tracer)
+
+    radius, expo = M.get_r_exp(kappa + block_size - 1, kappa + block_size - 1)
+    radius, expo = 1.0/radius, -expo
+
+    try:
+        enum_obj = Enumeration(M)
+        with tracer.context("enumeration", enum_obj=enum_obj, probability=1.0):
+            solution, dist = enum_obj.enumerate(kappa, kappa + block_size, radius, expo, dual=True)[0]
+    except EnumerationError:
+        return clean
+
+    if dist >= ldexp(bkz.lll_obj.delta * radius, expo):
+        return clean
+
+    with tracer.context("postprocessing"):
+        BKZ.Reduction(M, bkz.lll_obj, params).dsvp_postprocessing(kappa, block_size, tuple(solution))
+    return False
+
+
+def _slide_block(task):
+    """Primal or dual SVP reduce a block, typically called in a worker process.
+
+    :param task: a tuple ``(B, params, dual, seed)``
+    :returns: a tuple ``(U, clean, trace)`` where ``U`` is the transformation matrix applied to
+        ``B``, ``clean`` is ``True`` if no change was made and ``trace`` is the trace of the call
+
+    """
+    B, params, dual, seed = task
+    random.seed(seed)
+    set_random_seed(seed)
+
+    U = IntegerMatrix.identity(B.nrows)
+    bkz = BKZ2(GSO.Mat(B, U=U, flags=GSO.ROW_EXPO))
+    bkz.lll_obj()
+    tracer = BKZTreeTracer(bkz, root_label="svp")
+    if dual:
+        clean = dsvp_reduction(bkz, 0, B.nrows, params, tracer)
+    else:
+        clean = bkz.svp_reduction(0, B.nrows, params, tracer)
+    return U, clean, tracer.trace
+
+
+class SlideReduction(BlockParallel):
+    """
+    Slide reduction with the blocks of each phase reduced in parallel.
+    """
+    def __init__(self, A, ncores=2, bits=40):
+        """Create new slide reduction object.
+
+        :param A: an integer matrix, a GSO object or an LLL object
+        :param ncores: number of worker processes, with ``1`` blocks are reduced in this process
+        :param bits: precision of the projected blocks, see
+            :func:`fpylll.algorithms.block_parallel.projected_block`
+
+        """
+        BlockParallel.__init__(self, A, ncores=ncores, bits=bits)
+        self.potential = None
+
+    def __call__(self, params, min_row=0, max_row=-1, tracer=None, checkpoint=None):
+        """Run slide reduction with parameters `param`.
+
+        :param params: BKZ parameters
+        :param min_row: start processing in this row
+        :param max_row: stop processing in this row (exclusive)
+        :param tracer: see :meth:`fpylll.algorithms.bkz.BKZReduction.__call__`
+        :param checkpoint: see :meth:`fpylll.algorithms.bkz.BKZReduction.__call__`
+
+        """
+        self.potential = self._state.get("potential") if self._state is not None else None
+        return BlockParallel.__call__(self, params, min_row, max_row, tracer, checkpoint)
+
+    def checkpoint_state(self):
+        """
+        Return the state of :meth:`fpylll.algorithms.block_parallel.BKZReduction.checkpoint_state`
+        and the slide potential after the last tour.
+        """
+        state = BlockParallel.checkpoint_state(self)
+        state["potential"] = self.potential
+        return state
+
+    def parallel_svp_reduction(self, windows, params, dual=False, tracer=dummy_tracer):
+        """(Dual-)SVP reduce disjoint blocks in parallel.
+
+        :param windows: a list of pairs ``(kappa, block_size)`` of disjoint blocks
+        :param params: BKZ parameters
+        :param dual: dual or primal reduction
+        :param tracer: object for maintaining statistics
+        :returns: ``True`` if no change was made and ``False`` otherwise
+
+        """
+        self.M.update_gso()
+        tasks = [(projected_block(self.M, kappa, block_size, self.bits), params, dual,
+                  random.randint(0, 1<<30)) for kappa, block_size in windows]
+
+        clean = True
+        for (kappa, block_size), (U, clean_, trace) in zip(windows, self.reduce_blocks(tasks, _slide_block)):
+            tracer.merge(trace)
+            clean &= clean_
+            if U == IntegerMatrix.identity(block_size):
+                continue
+            with tracer.context("postprocessing"):
+                self.apply_transform(U, kappa)
+        return clean
+
+    def tour(self, params, min_row=0, max_row=-1, tracer=dummy_tracer):
+        """One slide reduction tour.
+
+        :param params: BKZ parameters
+        :param min_row: start index ≥ 0
+        :param max_row: last index ≤ n
+
+        :returns: ``True`` if the slide potential did not decrease and ``False`` otherwise
+        """
+        if max_row == -1:
+            max_row = self.A.nrows
+
+        block_size = params.block_size
+        primal = self.windows(min_row, max_row, block_size)
+        dual = [(kappa + 1, block_size) for kappa, _ in primal if kappa + 1 + block_size <= max_row]
+        if not primal:
+            return True
+
+        # like fplll, primal blocks are reduced until none of them changes
+        clean = False
+        while not clean:
+            clean = self.parallel_svp_reduction(primal, params, False, tracer)
+            with tracer.context("lll"):
+                self.lll_obj(min_row, min_row, max_row)
+
+        if dual:
+            self.parallel_svp_reduction(dual, params, True, tracer)
+            with tracer.context("lll"):
+                self.lll_obj(min_row, min_row, max_row)
+
+        potential = self.M.get_slide_potential(min_row, max_row, block_size)
+        if self.potential is not None and potential >= self.potential:
+            return True
+        self.potential = potential
+        return False
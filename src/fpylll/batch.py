@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Reduce many independent lattice bases on a pool of worker processes.
+
+..  moduleauthor:: Martin R.  Albrecht <martinralbrecht+fpylll@googlemail.com>
+
+    >>> from fpylll import IntegerMatrix, BKZ
+    >>> from fpylll.batch import reduce_many
+    >>> A = [IntegerMatrix.random(30, "qary", k=15, bits=20) for _ in range(4)]
+    >>> R = sorted(reduce_many(A, BKZ.Param(10), workers=2))
+    >>> [r.index for r in R]
+    [0, 1, 2, 3]
+
+"""
+
+from __future__ import absolute_import
+from collections import namedtuple
+from multiprocessing import Pool
+import time
+
+from fpylll.fplll.integer_matrix import IntegerMatrix
+from fpylll.fplll.bkz_param import BKZParam
+from fpylll.fplll.lll import lll_reduction
+from fpylll.fplll.bkz import bkz_reduction
+from fpylll.util import set_random_seed
+
+try:
+    process_time = time.process_time
+except AttributeError:
+    process_time = time.clock
+
+
+BatchResult = namedtuple("BatchResult", ("index", "A", "seed", "cputime", "walltime"))
+BatchResult.__doc__ = """
+Result of reducing one basis in :func:`reduce_many`.
+
+:param index: position of the input matrix
+:param A: reduced basis
+:param seed: random seed used for this reduction
+:param cputime: CPU time spent in the worker on this basis
+:param walltime: wall time spent in the worker on this basis
+"""
+
+
+def dumps(A):
+    """Serialize ``A`` into a compact byte string, see ``IntegerMatrix.to_bytes``.
+
+    :param A: an ``IntegerMatrix``
+    :returns: a bytes object
+
+    >>> from fpylll import IntegerMatrix
+    >>> from fpylll.batch import dumps, loads
+    >>> A = IntegerMatrix.random(10, "uniform", bits=20)
+    >>> loads(dumps(A)) == A
+    True
+
+    """
+    return A.to_bytes()
+
+
+def loads(s):
+    """Deserialize output of :func:`dumps`.
+
+    :param s: a bytes object
+    :returns: an ``IntegerMatrix``
+
+    """
+    return IntegerMatrix.from_bytes(s)
+
+
+def _reduce_one(job):
+    """Worker: reduce one serialized basis.
+
+    :param job: a tuple ``(index, serialized basis, param, seed)``
+
+    """
+    index, s, param, seed = job
+    A = loads(s)
+    set_random_seed(seed)
+
+    cputime, walltime = process_time(), time.time()
+    if param is None:
+        lll_reduction(A)
+    else:
+        bkz_reduction(A, param)
+    cputime, walltime = process_time() - cputime, time.time() - walltime
+
+    return index, dumps(A), seed, cputime, walltime
+
+
+def _jobs(matrices, param, seed):
+    for i, A in enumerate(matrices):
+        if isinstance(param, (list, tuple)):
+            param_ = param[i]
+        else:
+            param_ = param
+        if param_ is not None and not isinstance(param_, BKZParam):
+            raise TypeError("Parameters must be None or of type BKZ.Param but got type '%s'"%type(param_))
+        yield i, dumps(A), param_, seed + i
+
+
+def reduce_many(matrices, param=None, workers=None, seed=0, ordered=False, chunksize=1):
+    """Reduce many independent bases on ``workers`` processes.
+
+    Bases are shipped to and from the workers as binary strings (see :func:`dumps`).
+    Results are yielded as soon as they are available.  Matrix ``i`` is reduced after calling
+    ``set_random_seed(seed + i)``, so the output does not depend on the number of workers or the
+    order in which jobs complete.
+
+    :param matrices: an iterable of ``IntegerMatrix`` objects, these are not modified
+    :param param: ``None`` for LLL, a ``BKZ.Param`` object for BKZ or a list of those, one per
+        matrix
+    :param workers: number of worker processes, ``None`` for the number of CPUs, ``1`` to run in
+        this process
+    :param seed: base random seed
+    :param ordered: if ``True`` yield results in input order, otherwise in order of completion
+    :param chunksize: number of bases sent to a worker at once
+    :returns: an iterator over :class:`BatchResult` objects
+
+    >>> from fpylll import IntegerMatrix, LLL
+    >>> from fpylll.batch import reduce_many
+    >>> A = [IntegerMatrix.random(20, "qary", k=10, bits=20) for _ in range(4)]
+    >>> R = list(reduce_many(A, workers=2, ordered=True))
+    >>> all(r.A == LLL.reduction(a) for r, a in zip(R, A))
+    True
+
+    """
+    jobs = _jobs(matrices, param, seed)
+
+    if workers == 1:
+        for job in jobs:
+            index, s, seed_, cputime, walltime = _reduce_one(job)
+            yield BatchResult(index, loads(s), seed_, cputime, walltime)
+        return
+
+    pool = Pool(workers)
+    try:
+        if ordered:
+            it = pool.imap(_reduce_one, jobs, chunksize)
+        else:
+            it = pool.imap_unordered(_reduce_one, jobs, chunksize)
+        for index, s, seed_, cputime, walltime in it:
+            yield BatchResult(index, loads(s), seed_, cputime, walltime)
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
@@ -33,7 +33,7 @@ from fplll cimport get_red_status_str
 from fpylll.gmp.mpz cimport mpz_t
 from fpylll.mpfr.mpfr cimport mpfr_t
 from fpylll.util cimport check_delta, check_precision, check_float_type
-from fpylll.util import ReductionError
+from fpylll.util import ReductionError, auto_float_types
 from integer_matrix cimport IntegerMatrix
 from fpylll.config import default_strategy, default_strategy_path
 
@@ -197,49 +197,214 @@ cdef class BKZReduction:
         """
         raise NotImplementedError
 
-    def __call__(self):
+    def __call__(self, checkpoint=None, callback=None):
         """
         Call BKZ, SD-BKZ or slide reduction.
 
+        :param checkpoint: ``None``, a :class:`fpylll.tools.checkpoint.Checkpoint` or a filename to
+            write a checkpoint to after every tour, see :meth:`resume`
+        :param callback: ``None`` or a callable which is called as ``callback(self, info)`` after
+            every tour, see below
+
+        The dictionary ``info`` passed to ``callback`` holds
+
+        - ``tour``: the index of the tour,
+        - ``block_size``: the block size used in the tour,
+        - ``r``: the squared Gram-Schmidt norms, as a NumPy array if NumPy is available,
+        - ``slope``: the slope of the basis,
+        - ``cputime`` and ``walltime``: time spent in the tour,
+        - ``nodes``: the number of enumeration nodes visited in the tour,
+        - ``clean``: ``True`` if the tour made no change.
+
+        If the callback returns ``"stop"`` no further tours are run.  If it returns a
+        :class:`BKZ.Param` object, those parameters are used for all following tours, even if the
+        tour was clean, so that e.g. the block size can be increased once it stops making progress.
+        Any other return value is ignored.
+
+        >>> from fpylll import IntegerMatrix, GSO, LLL, BKZ, set_random_seed
+        >>> set_random_seed(1337)
+        >>> A = IntegerMatrix.random(40, "qary", k=20, bits=20)
+        >>> M = GSO.Mat(A)
+        >>> bkz = BKZ.Reduction(M, LLL.Reduction(M), BKZ.Param(10))
+        >>> tours = []
+        >>> def stop_early(bkz, info):
+        ...     tours.append(info["tour"])
+        ...     return "stop"
+        >>> bkz(callback=stop_early)
+        True
+        >>> tours
+        [0]
+
         ..  note ::
 
             To enable the latter, set flags ``BKZ.SLD_RED`` or ``BKZ.SD_VARIANT`` when calling
             the constructor of this class.
 
+        ..  note ::
+
+            With ``checkpoint`` or ``callback`` tours are called one by one from Python, which is
+            only supported for BKZ but not for SD-BKZ or slide reduction.
+
         """
-        if self._type == gso_mpz_d:
-            sig_on()
-            r = self._core.mpz_d.bkz()
-            sig_off()
-        elif self._type == gso_mpz_ld:
-            IF HAVE_LONG_DOUBLE:
-                sig_on()
-                r = self._core.mpz_ld.bkz()
-                sig_off()
-            ELSE:
-                raise RuntimeError("BKZAutoAbort object '%s' has no core."%self)
-        elif self._type == gso_mpz_dpe:
-            sig_on()
-            r = self._core.mpz_dpe.bkz()
-            sig_off()
-        elif self._type == gso_mpz_mpfr:
-            sig_on()
-            r= self._core.mpz_mpfr.bkz()
-            sig_off()
-        else:
-            IF HAVE_QD:
-                if self._type == gso_mpz_dd:
+        if checkpoint is not None or callback is not None:
+            return self._tours(checkpoint, callback)
+
+        cdef int r
+        with self.M._lock:
+            if self._type == gso_mpz_d:
+                with nogil:
                     sig_on()
-                    r = self._core.mpz_dd.bkz()
+                    r = self._core.mpz_d.bkz()
                     sig_off()
-                elif self._type == gso_mpz_qd:
+            elif self._type == gso_mpz_ld:
+                IF HAVE_LONG_DOUBLE:
+                    with nogil:
+                        sig_on()
+                        r = self._core.mpz_ld.bkz()
+                        sig_off()
+                ELSE:
+                    raise RuntimeError("BKZAutoAbort object '%s' has no core."%self)
+            elif self._type == gso_mpz_dpe:
+                with nogil:
                     sig_on()
-                    r = self._core.mpz_qd.bkz()
+                    r = self._core.mpz_dpe.bkz()
                     sig_off()
-                else:
-                    raise RuntimeError("BKZReduction object '%s' has no core."%self)
+            elif self._type == gso_mpz_mpfr:
+                with nogil:
+                    sig_on()
+                    r= self._core.mpz_mpfr.bkz()
+                    sig_off()
+            else:
+                IF HAVE_QD:
+                    if self._type == gso_mpz_dd:
+                        with nogil:
+                            sig_on()
+                            r = self._core.mpz_dd.bkz()
+                            sig_off()
+                    elif self._type == gso_mpz_qd:
+                        with nogil:
+                            sig_on()
+                            r = self._core.mpz_qd.bkz()
+                            sig_off()
+                    else:
+                        raise RuntimeError("BKZReduction object '%s' has no core."%self)
         return bool(r)
 
+    @classmethod
+    def resume(cls, filename, BKZParam param=None, checkpoint=None, callback=None):
+        """Continue a run from a checkpoint written by :meth:`__call__`.
+
+        The initial LLL reduction is not repeated.
+
+        :param filename: a checkpoint file
+        :param param: reduction parameters, ``None`` for those of the interrupted run
+        :param checkpoint: ``None`` to keep writing to ``filename`` as before, ``False`` to stop
+            writing checkpoints or a :class:`fpylll.tools.checkpoint.Checkpoint`
+        :param callback: see :meth:`__call__`
+        :returns: a pair of the new BKZ object and the return value of :meth:`__call__`
+
+        >>> import tempfile, os
+        >>> from fpylll import IntegerMatrix, GSO, LLL, BKZ
+        >>> fn = os.path.join(tempfile.mkdtemp(), "bkz.ckpt")
+        >>> A = IntegerMatrix.random(40, "qary", k=20, bits=20)
+        >>> M = GSO.Mat(A)
+        >>> bkz = BKZ.Reduction(M, LLL.Reduction(M), BKZ.Param(10, flags=BKZ.MAX_LOOPS, max_loops=1))
+        >>> _ = bkz(checkpoint=fn)
+        >>> bkz, _ = BKZ.Reduction.resume(fn, BKZ.Param(10, flags=BKZ.MAX_LOOPS, max_loops=4))
+        >>> bkz.M.d
+        40
+
+        """
+        from fpylll.tools.checkpoint import checkpoint_for, load
+
+        state = load(filename)
+        M, L = state["M"], state["lll"]
+        M.update_gso()
+        if param is not None:
+            state["params"] = param
+        bkz = cls(M, L, state["params"])
+        r = bkz._tours(checkpoint_for(filename, state, checkpoint), callback, state)
+        return bkz, r
+
+    def _tours(self, checkpoint, callback=None, state=None):
+        """
+        Run BKZ tours from Python, see :meth:`__call__`.
+        """
+        from fpylll.algorithms.bkz_stats import perf_counter, process_time
+        from fpylll.tools.checkpoint import AutoAbort, Checkpoint
+
+        param = state["params"] if state is not None else self.param
+        if param.flags & (BKZ_SD_VARIANT | BKZ_SLD_RED):
+            raise NotImplementedError("Tours from Python are not supported for SD-BKZ or slide reduction.")
+        if checkpoint is not None and not isinstance(checkpoint, Checkpoint):
+            checkpoint = Checkpoint(checkpoint)
+
+        d = self.M.d
+        if state is None:
+            auto_abort = AutoAbort(self.M, d)
+            cputime_start = process_time()
+            if not param.flags & BKZ_NO_LLL:
+                self.lll_obj()
+            i = 0
+        else:
+            auto_abort = AutoAbort(self.M, d, state=state["auto_abort"])
+            cputime_start = process_time() - state["cputime"]
+            i = state["tour"]
+
+        # like fplll, limits are checked before each tour and reaching one is a failure
+        r = True
+        while True:
+            if (param.flags & BKZ_MAX_LOOPS) and i >= param.max_loops:
+                r = False
+                break
+            if (param.flags & BKZ_MAX_TIME) and process_time() - cputime_start >= param.max_time:
+                r = False
+                break
+            if (param.flags & BKZ_AUTO_ABORT) and auto_abort.test_abort(*param.auto_abort):
+                break
+
+            cputime, walltime, nodes = process_time(), perf_counter(), self.nodes
+            clean, _ = self.tour(i, param, 0, d)
+            cputime, walltime = process_time() - cputime, perf_counter() - walltime
+            i += 1
+
+            updated = False
+            if callback is not None:
+                ret = callback(self, self._tour_info(i-1, param, clean, cputime, walltime,
+                                                     self.nodes - nodes))
+                if isinstance(ret, BKZParam):
+                    param, updated = ret, True
+                elif ret == "stop":
+                    break
+
+            # a clean tour or one with the full block size ends the run, unless the callback asked
+            # for different parameters, whose limits are checked before the next tour
+            if not updated and (clean or param.block_size >= d):
+                break
+            if checkpoint is not None and checkpoint.due(i):
+                self._save_checkpoint(checkpoint, param, i, auto_abort, process_time() - cputime_start)
+
+        if checkpoint is not None:
+            self._save_checkpoint(checkpoint, param, i, auto_abort, process_time() - cputime_start)
+        return r
+
+    def _tour_info(self, tour, param, clean, cputime, walltime, nodes):
+        """
+        Return the dictionary passed to callbacks, see :meth:`__call__`.
+        """
+        try:
+            from fpylll.numpy import dump_r
+            r = dump_r(self.M, 0, self.M.d)
+        except ImportError:
+            r = self.M.r()
+        return {"tour": tour, "block_size": param.block_size, "r": r, "slope": self.M.get_current_slope(0, self.M.d),
+                "cputime": cputime, "walltime": walltime, "nodes": nodes, "clean": clean}
+
+    def _save_checkpoint(self, checkpoint, param, tour, auto_abort, cputime):
+        checkpoint.save({"M": self.M, "lll": self.lll_obj, "params": param,
+                         "min_row": 0, "max_row": self.M.d, "tour": tour,
+                         "auto_abort": auto_abort.state, "cputime": cputime, "trace": None})
+
     def svp_preprocessing(self, int kappa, int block_size, BKZParam param):
         """Preprocess before calling (Dual-)SVP oracle.
 
@@ -786,13 +951,33 @@ def bkz_reduction(IntegerMatrix B, BKZParam o, float_type=None, int precision=0)
 
     :param IntegerMatrix B: Integer matrix, modified in place.
     :param BKZParam o: BKZ parameters
-    :param float_type: either ``None``: for automatic choice or an entry of `fpylll.float_types`
+    :param float_type: either ``None``: for automatic choice, ``'auto'`` or an entry of
+        `fpylll.float_types`
     :param precision: bit precision to use if ``float_tpe`` is ``'mpfr'``
 
     :returns: modified matrix ``B``
+
+    With ``float_type='auto'`` the cheapest floating-point type expected to be sufficient is tried
+    first.  If reduction fails, the next more precise type given by
+    :func:`fpylll.util.auto_float_types` continues from the partially reduced basis.
+
+        >>> from fpylll import IntegerMatrix, BKZ
+        >>> A = IntegerMatrix.random(60, "qary", k=30, bits=30)
+        >>> BKZ.reduction(A, BKZ.Param(10), float_type="auto") # doctest: +ELLIPSIS
+        <IntegerMatrix(60, 60) at 0x...>
+
     """
     check_precision(precision)
 
+    if float_type == "auto":
+        float_types = auto_float_types(B.nrows, B.get_max_exp(), precision)
+        for i, (float_type, precision) in enumerate(float_types):
+            try:
+                return bkz_reduction(B, o, float_type, precision)
+            except ReductionError:
+                if i == len(float_types) - 1:
+                    raise
+
     cdef FloatType float_type_ = check_float_type(float_type)
     cdef int r = 0
 
@@ -0,0 +1,112 @@
+/*
+  Evaluators used by fpylll's Enumeration class.
+*/
+
+#ifndef FPYLLL_CALLBACK_EVALUATOR_H
+#define FPYLLL_CALLBACK_EVALUATOR_H
+
+#include <cmath>
+#include <vector>
+#include <fplll/enum/evaluator.h>
+
+namespace fpylll
+{
+
+/*
+  Called with the coordinates of a new solution and its squared norm.  On entry `bound` holds the
+  current squared enumeration radius, the callee may decrease it.  A non-zero return value aborts
+  the enumeration.
+*/
+typedef int (*enumeration_callback_t)(void *ctx, const double *coord, size_t n, double dist,
+                                      double *bound);
+
+/*
+  Evaluator reporting each solution found during enumeration to a callback.
+
+  Unlike fplll's FastEvaluator no solutions are stored, so memory usage does not depend on the
+  number of solutions found.
+*/
+
+template <class FT> class CallbackEvaluator : public fplll::FastEvaluator<FT>
+{
+public:
+  CallbackEvaluator(enumeration_callback_t callback, void *ctx)
+      : fplll::FastEvaluator<FT>(1, fplll::EVALSTRATEGY_FIRST_N_SOLUTIONS, false),
+        nr_found(0), aborted(false), callback(callback), ctx(ctx)
+  {
+  }
+  virtual ~CallbackEvaluator() {}
+
+  virtual void eval_sol(const std::vector<FT> &new_sol_coord, const fplll::enumf &new_partial_dist,
+                        fplll::enumf &max_dist)
+  {
+    if (aborted)
+    {
+      max_dist = 0;
+      return;
+    }
+    coord.resize(new_sol_coord.size());
+    for (size_t i = 0; i < new_sol_coord.size(); i++)
+      coord[i] = new_sol_coord[i].get_d();
+
+    double dist  = std::ldexp((double)new_partial_dist, this->normExp);
+    double bound = std::ldexp((double)max_dist, this->normExp);
+    nr_found++;
+    if (callback(ctx, coord.data(), coord.size(), dist, &bound))
+    {
+      aborted  = true;
+      max_dist = 0;
+      return;
+    }
+    max_dist = std::ldexp(bound, -this->normExp);
+  }
+
+  size_t nr_found;
+  bool aborted;
+
+private:
+  enumeration_callback_t callback;
+  void *ctx;
+  std::vector<double> coord;
+};
+
+/*
+  Evaluator counting solution updates and radius reductions on top of `Base`, which is one of
+  fplll's evaluators over the float type `FT`.
+*/
+
+template <class Base, class FT> class CountingEvaluator : public Base
+{
+public:
+  using Base::Base;
+  virtual ~CountingEvaluator() {}
+
+  virtual void eval_sol(const std::vector<FT> &new_sol_coord, const fplll::enumf &new_partial_dist,
+                        fplll::enumf &max_dist)
+  {
+    fplll::enumf old_max_dist = max_dist;
+    Base::eval_sol(new_sol_coord, new_partial_dist, max_dist);
+    nr_updates++;
+    if (max_dist < old_max_dist)
+      nr_radius_reductions++;
+  }
+
+  void reset_counters()
+  {
+    nr_updates           = 0;
+    nr_radius_reductions = 0;
+  }
+
+  unsigned long nr_updates           = 0;
+  unsigned long nr_radius_reductions = 0;
+};
+
+template <class FT>
+using CountingFastEvaluator = CountingEvaluator<fplll::FastEvaluator<FT>, FT>;
+
+typedef CountingEvaluator<fplll::FastErrorBoundedEvaluator, fplll::FP_NR<mpfr_t>>
+    CountingFastErrorBoundedEvaluator;
+
+}  // namespace fpylll
+
+#endif
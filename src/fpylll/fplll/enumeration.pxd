@@ -7,3 +7,8 @@ cdef class Enumeration:
     cdef readonly MatGSO M
     cdef enumeration_core_t _core
     cdef fast_evaluator_core_t _fe_core
+    cdef public bint collect_stats
+    cdef readonly object stats
+
+    cdef int _reset_counters(self) except -1
+    cdef int _record_stats(self, double total_time, double core_time, long solutions) except -1
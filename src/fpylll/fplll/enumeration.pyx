@@ -18,7 +18,7 @@ from fplll cimport FastEvaluator as FastEvaluator_c
 from fplll cimport FastErrorBoundedEvaluator as FastErrorBoundedEvaluator_c
 from fplll cimport MatGSO as MatGSO_c
 from fplll cimport Z_NR, FP_NR, mpz_t
-from fplll cimport EVALMODE_SV
+from fplll cimport EVALMODE_SV, EvaluatorMode, Matrix
 
 from fplll cimport dpe_t
 from fpylll.mpfr.mpfr cimport mpfr_t
@@ -32,9 +32,150 @@ IF HAVE_QD:
     from decl cimport gso_mpz_dd, gso_mpz_qd, dd_t, qd_t
     from fplll cimport FT_DD, FT_QD
 
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+import threading
+import time
+
+try:
+    _timer = time.perf_counter
+except AttributeError:
+    _timer = time.time
+
+cdef extern from "fpylll/fplll/callback_evaluator.h" namespace "fpylll":
+    ctypedef int (*enumeration_callback_t)(void *ctx, const double *coord, size_t n, double dist,
+                                           double *bound)
+
+    cdef cppclass CallbackEvaluator[FT](FastEvaluator_c[FT]):
+        CallbackEvaluator(enumeration_callback_t callback, void *ctx)
+        size_t nr_found
+        bool aborted
+
+    cdef cppclass CountingFastEvaluator[FT](FastEvaluator_c[FT]):
+        CountingFastEvaluator(size_t nr_solutions, EvaluatorStrategy_c strategy, bool find_subsolutions)
+        void reset_counters()
+        unsigned long nr_updates
+        unsigned long nr_radius_reductions
+
+    cdef cppclass CountingFastErrorBoundedEvaluator(FastErrorBoundedEvaluator_c):
+        CountingFastErrorBoundedEvaluator(int d, Matrix[FP_NR[mpfr_t]] mu, Matrix[FP_NR[mpfr_t]] r,
+                                          EvaluatorMode eval_mode, size_t nr_solutions,
+                                          EvaluatorStrategy_c strategy, bool find_subsolutions)
+        void reset_counters()
+        unsigned long nr_updates
+        unsigned long nr_radius_reductions
+
 class EnumerationError(Exception):
     pass
 
+
+cdef class _EnumerationCallback:
+    """
+    State shared between ``Enumeration.enumerate_callback`` and the enumeration core.
+    """
+    cdef object callback
+    cdef object update_radius
+    cdef object error
+    cdef long nr_solutions
+    cdef long count
+
+    def __init__(self, callback, nr_solutions, update_radius):
+        self.callback = callback
+        self.nr_solutions = nr_solutions if nr_solutions is not None else 0
+        self.update_radius = update_radius
+        self.error = None
+        self.count = 0
+
+
+cdef int _enumeration_callback(void *ctx, const double *coord, size_t n, double dist,
+                               double *bound) noexcept with gil:
+    cdef _EnumerationCallback state = <_EnumerationCallback>ctx
+    cdef size_t i
+    try:
+        state.count += 1
+        if state.callback(tuple([coord[i] for i in range(n)]), dist):
+            return 1
+        if state.nr_solutions and state.count >= state.nr_solutions:
+            return 1
+        if state.update_radius is not None:
+            radius = state.update_radius(dist, bound[0])
+            if radius is not None and radius < bound[0]:
+                bound[0] = radius
+        return 0
+    except BaseException as e:
+        state.error = e
+        return 1
+
+class EnumerationStats(object):
+    """
+    Performance counters of an enumeration call.
+
+    - ``nodes``: number of visited nodes
+    - ``solutions``: number of solutions returned
+    - ``updates``: number of solutions passed to the evaluator, i.e. solution updates
+    - ``radius_reductions``: number of times the enumeration radius was decreased
+    - ``core_time``: wall time spent in fplll's enumeration core
+    - ``total_time``: wall time spent in ``Enumeration.enumerate``
+
+    Statistics of several calls can be added.
+
+    >>> from fpylll.fplll.enumeration import EnumerationStats
+    >>> s = EnumerationStats(nodes=1000, core_time=0.5, total_time=0.75)
+    >>> s.nodes_per_second, s.python_time
+    (2000.0, 0.25)
+    >>> (s + s).nodes
+    2000
+
+    """
+    __slots__ = ("nodes", "solutions", "updates", "radius_reductions", "core_time", "total_time")
+
+    def __init__(self, nodes=0, solutions=0, updates=0, radius_reductions=0,
+                 core_time=0.0, total_time=0.0):
+        self.nodes = nodes
+        self.solutions = solutions
+        self.updates = updates
+        self.radius_reductions = radius_reductions
+        self.core_time = core_time
+        self.total_time = total_time
+
+    @property
+    def python_time(self):
+        """
+        Wall time spent outside of fplll's enumeration core, e.g. converting inputs and outputs.
+        """
+        return self.total_time - self.core_time
+
+    @property
+    def nodes_per_second(self):
+        """
+        Visited nodes per second spent in fplll's enumeration core.
+        """
+        if self.core_time <= 0:
+            return 0.0
+        return self.nodes/self.core_time
+
+    def __add__(self, other):
+        if other is None:
+            other = EnumerationStats()
+        return EnumerationStats(*[getattr(self, k) + getattr(other, k) for k in self.__slots__])
+
+    __radd__ = __add__
+
+    def dict(self):
+        """
+        Return all counters as a dictionary.
+        """
+        return dict([(k, getattr(self, k)) for k in self.__slots__])
+
+    def __reduce__(self):
+        return EnumerationStats, tuple([getattr(self, k) for k in self.__slots__])
+
+    def __repr__(self):
+        return "EnumerationStats(%s)"%", ".join(["%s=%s"%(k, getattr(self, k)) for k in self.__slots__])
+
+
 class EvaluatorStrategy:
     BEST_N_SOLUTIONS = EVALSTRATEGY_BEST_N_SOLUTIONS
     OPPORTUNISTIC_N_SOLUTIONS = EVALSTRATEGY_OPPORTUNISTIC_N_SOLUTIONS
@@ -42,10 +183,15 @@ class EvaluatorStrategy:
 
 
 cdef class Enumeration:
-    def __init__(self, MatGSO M, nr_solutions=1, strategy=EvaluatorStrategy.BEST_N_SOLUTIONS):
+    def __init__(self, MatGSO M, nr_solutions=1, strategy=EvaluatorStrategy.BEST_N_SOLUTIONS,
+                 collect_stats=True):
         """Create new enumeration object
 
         :param MatGSO M: GSO matrix
+        :param nr_solutions: number of solutions to return
+        :param strategy: an ``EvaluatorStrategy``
+        :param collect_stats: if ``True``, make performance counters of the last call to
+            :meth:`enumerate` available as ``stats``, see :class:`EnumerationStats`
         """
 
         cdef MatGSO_c[Z_NR[mpz_t], FP_NR[double]]  *m_double
@@ -58,51 +204,53 @@ cdef class Enumeration:
         cdef MatGSO_c[Z_NR[mpz_t], FP_NR[mpfr_t]]  *m_mpfr
 
         self.M = M
+        self.collect_stats = collect_stats
+        self.stats = None
 
         if M._type == gso_mpz_d:
             m_double = M._core.mpz_d
-            self._fe_core.d = new FastEvaluator_c[FP_NR[double]](nr_solutions,
-                                                                      strategy,
-                                                                      False)
+            self._fe_core.d = new CountingFastEvaluator[FP_NR[double]](nr_solutions,
+                                                                       strategy,
+                                                                       False)
             self._core.d = new Enumeration_c[FP_NR[double]](m_double[0], self._fe_core.d[0])
         elif M._type == gso_mpz_ld:
             IF HAVE_LONG_DOUBLE:
                 m_ld = M._core.mpz_ld
-                self._fe_core.ld = new FastEvaluator_c[FP_NR[longdouble]](nr_solutions,
-                                                                      strategy,
-                                                                      False)
+                self._fe_core.ld = new CountingFastEvaluator[FP_NR[longdouble]](nr_solutions,
+                                                                                strategy,
+                                                                                False)
                 self._core.ld = new Enumeration_c[FP_NR[longdouble]](m_ld[0], self._fe_core.ld[0])
             ELSE:
                 raise RuntimeError("MatGSO object '%s' has no core."%self)
         elif M._type == gso_mpz_dpe:
             m_dpe = M._core.mpz_dpe
-            self._fe_core.dpe = new FastEvaluator_c[FP_NR[dpe_t]](nr_solutions,
-                                                                  strategy,
-                                                                  False)
+            self._fe_core.dpe = new CountingFastEvaluator[FP_NR[dpe_t]](nr_solutions,
+                                                                        strategy,
+                                                                        False)
             self._core.dpe = new Enumeration_c[FP_NR[dpe_t]](m_dpe[0], self._fe_core.dpe[0])
         elif M._type == gso_mpz_mpfr:
             m_mpfr = M._core.mpz_mpfr
-            self._fe_core.mpfr = new FastErrorBoundedEvaluator_c(M.d,
-                                                                 M._core.mpz_mpfr.get_mu_matrix(),
-                                                                 M._core.mpz_mpfr.get_r_matrix(),
-                                                                 EVALMODE_SV,
-                                                                 nr_solutions,
-                                                                 strategy,
-                                                                 False)
+            self._fe_core.mpfr = new CountingFastErrorBoundedEvaluator(M.d,
+                                                                       M._core.mpz_mpfr.get_mu_matrix(),
+                                                                       M._core.mpz_mpfr.get_r_matrix(),
+                                                                       EVALMODE_SV,
+                                                                       nr_solutions,
+                                                                       strategy,
+                                                                       False)
             self._core.mpfr = new Enumeration_c[FP_NR[mpfr_t]](m_mpfr[0], self._fe_core.mpfr[0])
         else:
             IF HAVE_QD:
                 if M._type == gso_mpz_dd:
                     m_dd = M._core.mpz_dd
-                    self._fe_core.dd = new FastEvaluator_c[FP_NR[dd_t]](nr_solutions,
-                                                                           strategy,
-                                                                           False)
+                    self._fe_core.dd = new CountingFastEvaluator[FP_NR[dd_t]](nr_solutions,
+                                                                              strategy,
+                                                                              False)
                     self._core.dd = new Enumeration_c[FP_NR[dd_t]](m_dd[0], self._fe_core.dd[0])
                 elif M._type == gso_mpz_qd:
                     m_qd = M._core.mpz_qd
-                    self._fe_core.qd = new FastEvaluator_c[FP_NR[qd_t]](nr_solutions,
-                                                                           strategy,
-                                                                           False)
+                    self._fe_core.qd = new CountingFastEvaluator[FP_NR[qd_t]](nr_solutions,
+                                                                              strategy,
+                                                                              False)
                     self._core.qd = new Enumeration_c[FP_NR[qd_t]](m_qd[0], self._fe_core.qd[0])
                 else:
                     raise RuntimeError("MatGSO object '%s' has no core."%self)
@@ -140,7 +288,8 @@ cdef class Enumeration:
         :param max_dist:       length bound
         :param max_dist_expo:  exponent of length bound
         :param target:         target coordinates for CVP/BDD or ``None`` for SVP
-        :param subtree:
+        :param subtree:        fix the coordinates of rows ``last-len(subtree)`` to ``last``
+                               (exclusive) to these values and only enumerate the remaining ones
         :param pruning:        pruning parameters
         :param dual:           run enumeration in the primal or dual lattice.
         :param subtree_reset:
@@ -162,7 +311,7 @@ cdef class Enumeration:
         cdef vector[double] sub_tree_
 
         if subtree is not None:
-            for it in target:
+            for it in subtree:
                 sub_tree_.push_back(float(it))
 
         cdef vector[double] pruning_
@@ -175,6 +324,8 @@ cdef class Enumeration:
                 pruning_.push_back(pruning[i])
 
         cdef double max_dist__ = max_dist
+        cdef long max_dist_expo_ = max_dist_expo
+        cdef int dual_ = dual
         cdef FP_NR[d_t] max_dist_d = max_dist__
         IF HAVE_LONG_DOUBLE:
             cdef FP_NR[ld_t] max_dist_ld = max_dist__
@@ -184,6 +335,12 @@ cdef class Enumeration:
             cdef FP_NR[qd_t] max_dist_qd = max_dist__
         cdef FP_NR[mpfr_t] max_dist_mpfr = max_dist__
 
+        cdef double total_time = 0.0
+        cdef double core_time = 0.0
+        if self.collect_stats:
+            total_time = _timer()
+            self._reset_counters()
+
         solutions = []
         cdef multimap[FP_NR[double], vector[FP_NR[double]]].reverse_iterator solutions_d
         IF HAVE_LONG_DOUBLE:
@@ -194,135 +351,442 @@ cdef class Enumeration:
             cdef multimap[FP_NR[qd_t], vector[FP_NR[qd_t]]].reverse_iterator solutions_qd
         cdef multimap[FP_NR[mpfr_t], vector[FP_NR[mpfr_t]]].reverse_iterator solutions_mpfr
 
-        if self.M._type == gso_mpz_d:
-            if target is not None:
-                for it in target:
-                    tmp.d = float(it)
-                    target_coord_d.push_back(tmp.d)
-            sig_on()
-            self._core.d.enumerate(first, last, max_dist_d, max_dist_expo,
-                                   target_coord_d, sub_tree_, pruning_, dual)
-            sig_off()
-            if not self._fe_core.d.size():
-                raise EnumerationError("No vector found.")
-
-            solutions_d = self._fe_core.d.begin()
-            while solutions_d != self._fe_core.d.end():
-                cur_dist = deref(solutions_d).first.get_d()
-                cur_sol = []
-                for j in range(deref(solutions_d).second.size()):
-                    cur_sol.append(deref(solutions_d).second[j].get_d())
-                solutions.append([tuple(cur_sol), cur_dist])
-                inc(solutions_d)
+        try:
+            with self.M._lock:
+                if self.M._type == gso_mpz_d:
+                    if target is not None:
+                        for it in target:
+                            tmp.d = float(it)
+                            target_coord_d.push_back(tmp.d)
+                    core_time = _timer()
+                    with nogil:
+                        sig_on()
+                        self._core.d.enumerate(first, last, max_dist_d, max_dist_expo_,
+                                               target_coord_d, sub_tree_, pruning_, dual_)
+                        sig_off()
+                    core_time = _timer() - core_time
+                    if not self._fe_core.d.size():
+                        raise EnumerationError("No vector found.")
+
+                    solutions_d = self._fe_core.d.begin()
+                    while solutions_d != self._fe_core.d.end():
+                        cur_dist = deref(solutions_d).first.get_d()
+                        cur_sol = []
+                        for j in range(deref(solutions_d).second.size()):
+                            cur_sol.append(deref(solutions_d).second[j].get_d())
+                        solutions.append([tuple(cur_sol), cur_dist])
+                        inc(solutions_d)
+
+                IF HAVE_LONG_DOUBLE:
+                    if self.M._type == gso_mpz_ld:
+                        if target is not None:
+                            for it in target:
+                                tmp.ld = float(it)
+                                target_coord_ld.push_back(tmp.ld)
+                        core_time = _timer()
+                        with nogil:
+                            sig_on()
+                            self._core.ld.enumerate(first, last, max_dist_ld, max_dist_expo_,
+                                                    target_coord_ld, sub_tree_, pruning_, dual_)
+                            sig_off()
+                        core_time = _timer() - core_time
+                        if not self._fe_core.ld.size():
+                            raise EnumerationError("No vector found.")
+
+                        solutions_ld = self._fe_core.ld.begin()
+                        while solutions_ld != self._fe_core.ld.end():
+                            cur_dist = deref(solutions_ld).first.get_d()
+                            cur_sol = []
+                            for j in range(deref(solutions_ld).second.size()):
+                                cur_sol.append(deref(solutions_ld).second[j].get_d())
+                            solutions.append([tuple(cur_sol), cur_dist])
+                            inc(solutions_ld)
+
+                if self.M._type == gso_mpz_dpe:
+                    if target is not None:
+                        for it in target:
+                            tmp.dpe = float(it)
+                            target_coord_dpe.push_back(tmp.dpe)
+                    core_time = _timer()
+                    with nogil:
+                        sig_on()
+                        self._core.dpe.enumerate(first, last, max_dist_dpe, max_dist_expo_,
+                                                 target_coord_dpe, sub_tree_, pruning_, dual_)
+                        sig_off()
+                    core_time = _timer() - core_time
+                    if not self._fe_core.dpe.size():
+                        raise EnumerationError("No vector found.")
+
+                    solutions_dpe = self._fe_core.dpe.begin()
+                    while solutions_dpe != self._fe_core.dpe.end():
+                        cur_dist = deref(solutions_dpe).first.get_d()
+                        cur_sol = []
+                        for j in range(deref(solutions_dpe).second.size()):
+                            cur_sol.append(deref(solutions_dpe).second[j].get_d())
+                        solutions.append([tuple(cur_sol), cur_dist])
+                        inc(solutions_dpe)
+
+                IF HAVE_QD:
+                    if self.M._type == gso_mpz_dd:
+                        if target is not None:
+                            for it in target:
+                                tmp.dd = float(it)
+                                target_coord_dd.push_back(tmp.dd)
+                        core_time = _timer()
+                        with nogil:
+                            sig_on()
+                            self._core.dd.enumerate(first, last, max_dist_dd, max_dist_expo_,
+                                                    target_coord_dd, sub_tree_, pruning_, dual_)
+                            sig_off()
+                        core_time = _timer() - core_time
+                        if not self._fe_core.dd.size():
+                            raise EnumerationError("No vector found.")
+
+                        solutions_dd = self._fe_core.dd.begin()
+                        while solutions_dd != self._fe_core.dd.end():
+                            cur_dist = deref(solutions_dd).first.get_d()
+                            cur_sol = []
+                            for j in range(deref(solutions_dd).second.size()):
+                                cur_sol.append(deref(solutions_dd).second[j].get_d())
+                            solutions.append([tuple(cur_sol), cur_dist])
+                            inc(solutions_dd)
+
+                    if self.M._type == gso_mpz_qd:
+                        if target is not None:
+                            for it in target:
+                                tmp.qd = float(it)
+                                target_coord_qd.push_back(tmp.qd)
+                        core_time = _timer()
+                        with nogil:
+                            sig_on()
+                            self._core.qd.enumerate(first, last, max_dist_qd, max_dist_expo_,
+                                                    target_coord_qd, sub_tree_, pruning_, dual_)
+                            sig_off()
+                        core_time = _timer() - core_time
+                        if not self._fe_core.qd.size():
+                            raise EnumerationError("No vector found.")
+
+                        solutions_qd = self._fe_core.qd.begin()
+                        while solutions_qd != self._fe_core.qd.end():
+                            cur_dist = deref(solutions_qd).first.get_d()
+                            cur_sol = []
+                            for j in range(deref(solutions_qd).second.size()):
+                                cur_sol.append(deref(solutions_qd).second[j].get_d())
+                            solutions.append([tuple(cur_sol), cur_dist])
+                            inc(solutions_qd)
+
+                if self.M._type == gso_mpz_mpfr:
+                    if target is not None:
+                        for it in target:
+                            tmp.mpfr = float(it)
+                            target_coord_mpfr.push_back(tmp.mpfr)
+                    core_time = _timer()
+                    with nogil:
+                        sig_on()
+                        self._core.mpfr.enumerate(first, last, max_dist_mpfr, max_dist_expo_,
+                                                  target_coord_mpfr, sub_tree_, pruning_, dual_)
+                        sig_off()
+                    core_time = _timer() - core_time
+                    if not self._fe_core.mpfr.size():
+                        raise EnumerationError("No vector found.")
+
+                    solutions_mpfr = self._fe_core.mpfr.begin()
+                    while solutions_mpfr != self._fe_core.mpfr.end():
+                        cur_dist = deref(solutions_mpfr).first.get_d()
+                        cur_sol = []
+                        for j in range(deref(solutions_mpfr).second.size()):
+                            cur_sol.append(deref(solutions_mpfr).second[j].get_d())
+                        solutions.append([tuple(cur_sol), cur_dist])
+                        inc(solutions_mpfr)
+
+        finally:
+            if self.collect_stats:
+                self._record_stats(_timer() - total_time, core_time, len(solutions))
+
+        return solutions
+
+    def enumerate_callback(self, int first, int last, max_dist, max_dist_expo, callback,
+                           target=None, subtree=None, pruning=None, dual=False,
+                           nr_solutions=None, update_radius=None):
+        """Run enumeration on `M` and report each solution as soon as it is found.
+
+        Solutions are not stored, so memory usage does not depend on the number of solutions.
 
+        :param int first:      first row
+        :param int last:       last row (exclusive)
+        :param max_dist:       length bound
+        :param max_dist_expo:  exponent of length bound
+        :param callback:       called as ``callback(solution, dist)`` for each solution, where
+                               ``dist`` is the squared norm of the solution; if it returns a true
+                               value, the enumeration is aborted
+        :param target:         target coordinates for CVP/BDD or ``None`` for SVP
+        :param subtree:        see :meth:`enumerate`
+        :param pruning:        pruning parameters
+        :param dual:           run enumeration in the primal or dual lattice.
+        :param nr_solutions:   abort after this many solutions, ``None`` for no limit
+        :param update_radius:  ``None`` to keep the length bound fixed or a function
+                               ``update_radius(dist, bound)`` returning a new squared length bound
+                               (or ``None`` to keep it) after each solution, the bound is never
+                               increased
+        :returns: number of solutions reported
+
+        The callback runs while the enumeration holds `M`, so using `M` (e.g. calling
+        ``M.update_gso()``, LLL or another enumeration on it) from the callback raises a
+        ``RuntimeError``, while other threads using `M` wait for the enumeration to finish.  Since
+        the enumeration only returns to Python when it reports a
+        solution, ``KeyboardInterrupt`` is only raised when the next solution is found.
+
+        >>> from fpylll import IntegerMatrix, GSO, LLL, Enumeration
+        >>> A = LLL.reduction(IntegerMatrix.random(20, "qary", k=10, bits=20))
+        >>> M = GSO.Mat(A)
+        >>> _ = M.update_gso()
+        >>> found = []
+        >>> Enumeration(M).enumerate_callback(0, 20, 2*M.get_r(0, 0), 0,
+        ...                                   lambda v, d: found.append(d), nr_solutions=5)
+        5
+        >>> len(found)
+        5
+
+        """
+        if self.M._type == gso_mpz_mpfr:
+            raise NotImplementedError("Callbacks are not supported for float type 'mpfr'.")
+
+        cdef _EnumerationCallback state = _EnumerationCallback(callback, nr_solutions, update_radius)
+        cdef fp_nr_t tmp
+
+        cdef vector[FP_NR[d_t]] target_coord_d
         IF HAVE_LONG_DOUBLE:
-            if self.M._type == gso_mpz_ld:
-                if target is not None:
-                    for it in target:
-                        tmp.ld = float(it)
-                        target_coord_ld.push_back(tmp.ld)
-                sig_on()
-                self._core.ld.enumerate(first, last, max_dist_ld, max_dist_expo,
-                                        target_coord_ld, sub_tree_, pruning_, dual)
-                sig_off()
-                if not self._fe_core.ld.size():
-                    raise EnumerationError("No vector found.")
-
-                solutions_ld = self._fe_core.ld.begin()
-                while solutions_ld != self._fe_core.ld.end():
-                    cur_dist = deref(solutions_ld).first.get_d()
-                    cur_sol = []
-                    for j in range(deref(solutions_ld).second.size()):
-                        cur_sol.append(deref(solutions_ld).second[j].get_d())
-                    solutions.append([tuple(cur_sol), cur_dist])
-                    inc(solutions_ld)
+            cdef vector[FP_NR[ld_t]] target_coord_ld
+        cdef vector[FP_NR[dpe_t]] target_coord_dpe
+        IF HAVE_QD:
+            cdef vector[FP_NR[dd_t]] target_coord_dd
+            cdef vector[FP_NR[qd_t]] target_coord_qd
 
-        if self.M._type == gso_mpz_dpe:
-            if target is not None:
-                for it in target:
-                    tmp.dpe = float(it)
-                    target_coord_dpe.push_back(tmp.dpe)
-            sig_on()
-            self._core.dpe.enumerate(first, last, max_dist_dpe, max_dist_expo,
-                                     target_coord_dpe, sub_tree_, pruning_, dual)
-            sig_off()
-            if not self._fe_core.dpe.size():
-                raise EnumerationError("No vector found.")
-
-            solutions_dpe = self._fe_core.dpe.begin()
-            while solutions_dpe != self._fe_core.dpe.end():
-                cur_dist = deref(solutions_dpe).first.get_d()
-                cur_sol = []
-                for j in range(deref(solutions_dpe).second.size()):
-                    cur_sol.append(deref(solutions_dpe).second[j].get_d())
-                solutions.append([tuple(cur_sol), cur_dist])
-                inc(solutions_dpe)
+        cdef vector[double] sub_tree_
+        if subtree is not None:
+            for it in subtree:
+                sub_tree_.push_back(float(it))
+
+        cdef vector[double] pruning_
+        if not pruning:
+            for i in range(last-first):
+                pruning_.push_back(1)
+        else:
+            for i in range(last-first):
+                pruning_.push_back(pruning[i])
+
+        cdef double max_dist__ = max_dist
+        cdef long max_dist_expo_ = max_dist_expo
+        cdef int dual_ = dual
+        cdef FP_NR[d_t] max_dist_d = max_dist__
+        IF HAVE_LONG_DOUBLE:
+            cdef FP_NR[ld_t] max_dist_ld = max_dist__
+        cdef FP_NR[dpe_t] max_dist_dpe = max_dist__
+        IF HAVE_QD:
+            cdef FP_NR[dd_t] max_dist_dd = max_dist__
+            cdef FP_NR[qd_t] max_dist_qd = max_dist__
 
+        cdef CallbackEvaluator[FP_NR[d_t]] *ev_d
+        cdef Enumeration_c[FP_NR[d_t]] *enum_d
+        IF HAVE_LONG_DOUBLE:
+            cdef CallbackEvaluator[FP_NR[ld_t]] *ev_ld
+            cdef Enumeration_c[FP_NR[ld_t]] *enum_ld
+        cdef CallbackEvaluator[FP_NR[dpe_t]] *ev_dpe
+        cdef Enumeration_c[FP_NR[dpe_t]] *enum_dpe
         IF HAVE_QD:
-            if self.M._type == gso_mpz_dd:
+            cdef CallbackEvaluator[FP_NR[dd_t]] *ev_dd
+            cdef Enumeration_c[FP_NR[dd_t]] *enum_dd
+            cdef CallbackEvaluator[FP_NR[qd_t]] *ev_qd
+            cdef Enumeration_c[FP_NR[qd_t]] *enum_qd
+
+        # no signal handling around the enumeration since the callback runs Python code, see
+        # _MatGSOLock for why M must not be used meanwhile
+        with self.M._lock.callbacks():
+            if self.M._type == gso_mpz_d:
                 if target is not None:
                     for it in target:
-                        tmp.dd = float(it)
-                        target_coord_dd.push_back(tmp.dd)
-                sig_on()
-                self._core.dd.enumerate(first, last, max_dist_dd, max_dist_expo,
-                                        target_coord_dd, sub_tree_, pruning_, dual)
-                sig_off()
-                if not self._fe_core.dd.size():
-                    raise EnumerationError("No vector found.")
-
-                solutions_dd = self._fe_core.dd.begin()
-                while solutions_dd != self._fe_core.dd.end():
-                    cur_dist = deref(solutions_dd).first.get_d()
-                    cur_sol = []
-                    for j in range(deref(solutions_dd).second.size()):
-                        cur_sol.append(deref(solutions_dd).second[j].get_d())
-                    solutions.append([tuple(cur_sol), cur_dist])
-                    inc(solutions_dd)
+                        tmp.d = float(it)
+                        target_coord_d.push_back(tmp.d)
+                ev_d = new CallbackEvaluator[FP_NR[d_t]](_enumeration_callback, <void*>state)
+                enum_d = new Enumeration_c[FP_NR[d_t]](self.M._core.mpz_d[0], ev_d[0])
+                try:
+                    with nogil:
+                        enum_d.enumerate(first, last, max_dist_d, max_dist_expo_,
+                                         target_coord_d, sub_tree_, pruning_, dual_)
+                finally:
+                    del enum_d
+                    del ev_d
 
-            if self.M._type == gso_mpz_qd:
+            IF HAVE_LONG_DOUBLE:
+                if self.M._type == gso_mpz_ld:
+                    if target is not None:
+                        for it in target:
+                            tmp.ld = float(it)
+                            target_coord_ld.push_back(tmp.ld)
+                    ev_ld = new CallbackEvaluator[FP_NR[ld_t]](_enumeration_callback, <void*>state)
+                    enum_ld = new Enumeration_c[FP_NR[ld_t]](self.M._core.mpz_ld[0], ev_ld[0])
+                    try:
+                        with nogil:
+                            enum_ld.enumerate(first, last, max_dist_ld, max_dist_expo_,
+                                              target_coord_ld, sub_tree_, pruning_, dual_)
+                    finally:
+                        del enum_ld
+                        del ev_ld
+
+            if self.M._type == gso_mpz_dpe:
                 if target is not None:
                     for it in target:
-                        tmp.qd = float(it)
-                        target_coord_qd.push_back(tmp.qd)
-                sig_on()
-                self._core.qd.enumerate(first, last, max_dist_qd, max_dist_expo,
-                                        target_coord_qd, sub_tree_, pruning_, dual)
-                sig_off()
-                if not self._fe_core.qd.size():
-                    raise EnumerationError("No vector found.")
-
-                solutions_qd = self._fe_core.qd.begin()
-                while solutions_qd != self._fe_core.qd.end():
-                    cur_dist = deref(solutions_qd).first.get_d()
-                    cur_sol = []
-                    for j in range(deref(solutions_qd).second.size()):
-                        cur_sol.append(deref(solutions_qd).second[j].get_d())
-                    solutions.append([tuple(cur_sol), cur_dist])
-                    inc(solutions_qd)
+                        tmp.dpe = float(it)
+                        target_coord_dpe.push_back(tmp.dpe)
+                ev_dpe = new CallbackEvaluator[FP_NR[dpe_t]](_enumeration_callback, <void*>state)
+                enum_dpe = new Enumeration_c[FP_NR[dpe_t]](self.M._core.mpz_dpe[0], ev_dpe[0])
+                try:
+                    with nogil:
+                        enum_dpe.enumerate(first, last, max_dist_dpe, max_dist_expo_,
+                                           target_coord_dpe, sub_tree_, pruning_, dual_)
+                finally:
+                    del enum_dpe
+                    del ev_dpe
+
+            IF HAVE_QD:
+                if self.M._type == gso_mpz_dd:
+                    if target is not None:
+                        for it in target:
+                            tmp.dd = float(it)
+                            target_coord_dd.push_back(tmp.dd)
+                    ev_dd = new CallbackEvaluator[FP_NR[dd_t]](_enumeration_callback, <void*>state)
+                    enum_dd = new Enumeration_c[FP_NR[dd_t]](self.M._core.mpz_dd[0], ev_dd[0])
+                    try:
+                        with nogil:
+                            enum_dd.enumerate(first, last, max_dist_dd, max_dist_expo_,
+                                              target_coord_dd, sub_tree_, pruning_, dual_)
+                    finally:
+                        del enum_dd
+                        del ev_dd
+
+                if self.M._type == gso_mpz_qd:
+                    if target is not None:
+                        for it in target:
+                            tmp.qd = float(it)
+                            target_coord_qd.push_back(tmp.qd)
+                    ev_qd = new CallbackEvaluator[FP_NR[qd_t]](_enumeration_callback, <void*>state)
+                    enum_qd = new Enumeration_c[FP_NR[qd_t]](self.M._core.mpz_qd[0], ev_qd[0])
+                    try:
+                        with nogil:
+                            enum_qd.enumerate(first, last, max_dist_qd, max_dist_expo_,
+                                              target_coord_qd, sub_tree_, pruning_, dual_)
+                    finally:
+                        del enum_qd
+                        del ev_qd
+
+        if state.error is not None:
+            raise state.error
+        return state.count
+
+    def enumerate_iter(self, int first, int last, max_dist, max_dist_expo,
+                       target=None, subtree=None, pruning=None, dual=False,
+                       nr_solutions=None, update_radius=None, int buffer_size=1024):
+        """Run enumeration on `M` in a background thread and yield pairs ``(solution, dist)`` as
+        they are found.
+
+        At most ``buffer_size`` solutions are buffered, the enumeration waits for the consumer
+        otherwise.  Closing the generator aborts the enumeration.  Until then the enumeration
+        holds `M` and using it from the thread iterating over the solutions, e.g. calling
+        ``M.update_gso()``, raises a ``RuntimeError`` instead of waiting for the enumeration
+        forever.  Other threads using `M` wait for the enumeration to finish.  See
+        :meth:`enumerate_callback` for the remaining parameters.
+
+        >>> from fpylll import IntegerMatrix, GSO, LLL, Enumeration
+        >>> A = LLL.reduction(IntegerMatrix.random(20, "qary", k=10, bits=20))
+        >>> M = GSO.Mat(A)
+        >>> _ = M.update_gso()
+        >>> it = Enumeration(M).enumerate_iter(0, 20, 2*M.get_r(0, 0), 0)
+        >>> [dist <= 2*M.get_r(0, 0) for _, dist in it][:3]
+        [True, True, True]
 
+        """
+        queue = Queue(buffer_size)
+        done = object()
+        state = {"stop": False, "error": None}
+
+        def callback(solution, dist):
+            if state["stop"]:
+                return True
+            queue.put((solution, dist))
+            return state["stop"]
+
+        def run():
+            try:
+                self.enumerate_callback(first, last, max_dist, max_dist_expo, callback,
+                                        target=target, subtree=subtree, pruning=pruning, dual=dual,
+                                        nr_solutions=nr_solutions, update_radius=update_radius)
+            except BaseException as e:
+                state["error"] = e
+            queue.put(done)
+
+        thread = threading.Thread(target=run)
+        thread.daemon = True
+        with self.M._lock.forbid():
+            thread.start()
+            try:
+                while True:
+                    item = queue.get()
+                    if item is done:
+                        break
+                    yield item
+            finally:
+                state["stop"] = True
+                # unblock the producer
+                while thread.is_alive():
+                    while not queue.empty():
+                        queue.get()
+                    thread.join(0.01)
+        if state["error"] is not None:
+            raise state["error"]
+
+    cdef int _reset_counters(self) except -1:
+        if self.M._type == gso_mpz_d:
+            (<CountingFastEvaluator[FP_NR[double]]*>self._fe_core.d).reset_counters()
+        IF HAVE_LONG_DOUBLE:
+            if self.M._type == gso_mpz_ld:
+                (<CountingFastEvaluator[FP_NR[longdouble]]*>self._fe_core.ld).reset_counters()
+        if self.M._type == gso_mpz_dpe:
+            (<CountingFastEvaluator[FP_NR[dpe_t]]*>self._fe_core.dpe).reset_counters()
+        IF HAVE_QD:
+            if self.M._type == gso_mpz_dd:
+                (<CountingFastEvaluator[FP_NR[dd_t]]*>self._fe_core.dd).reset_counters()
+            if self.M._type == gso_mpz_qd:
+                (<CountingFastEvaluator[FP_NR[qd_t]]*>self._fe_core.qd).reset_counters()
         if self.M._type == gso_mpz_mpfr:
-            if target is not None:
-                for it in target:
-                    tmp.mpfr = float(it)
-                    target_coord_mpfr.push_back(tmp.mpfr)
-            sig_on()
-            self._core.mpfr.enumerate(first, last, max_dist_mpfr, max_dist_expo,
-                                      target_coord_mpfr, sub_tree_, pruning_, dual)
-            sig_off()
-            if not self._fe_core.mpfr.size():
-                raise EnumerationError("No vector found.")
-
-            solutions_mpfr = self._fe_core.mpfr.begin()
-            while solutions_mpfr != self._fe_core.mpfr.end():
-                cur_dist = deref(solutions_mpfr).first.get_d()
-                cur_sol = []
-                for j in range(deref(solutions_mpfr).second.size()):
-                    cur_sol.append(deref(solutions_mpfr).second[j].get_d())
-                solutions.append([tuple(cur_sol), cur_dist])
-                inc(solutions_mpfr)
+            (<CountingFastErrorBoundedEvaluator*>self._fe_core.mpfr).reset_counters()
+        return 0
 
-        return solutions
+    cdef int _record_stats(self, double total_time, double core_time, long solutions) except -1:
+        cdef unsigned long updates = 0, radius_reductions = 0
+        if self.M._type == gso_mpz_d:
+            updates = (<CountingFastEvaluator[FP_NR[double]]*>self._fe_core.d).nr_updates
+            radius_reductions = (<CountingFastEvaluator[FP_NR[double]]*>self._fe_core.d).nr_radius_reductions
+        IF HAVE_LONG_DOUBLE:
+            if self.M._type == gso_mpz_ld:
+                updates = (<CountingFastEvaluator[FP_NR[longdouble]]*>self._fe_core.ld).nr_updates
+                radius_reductions = (<CountingFastEvaluator[FP_NR[longdouble]]*>self._fe_core.ld).nr_radius_reductions
+        if self.M._type == gso_mpz_dpe:
+            updates = (<CountingFastEvaluator[FP_NR[dpe_t]]*>self._fe_core.dpe).nr_updates
+            radius_reductions = (<CountingFastEvaluator[FP_NR[dpe_t]]*>self._fe_core.dpe).nr_radius_reductions
+        IF HAVE_QD:
+            if self.M._type == gso_mpz_dd:
+                updates = (<CountingFastEvaluator[FP_NR[dd_t]]*>self._fe_core.dd).nr_updates
+                radius_reductions = (<CountingFastEvaluator[FP_NR[dd_t]]*>self._fe_core.dd).nr_radius_reductions
+            if self.M._type == gso_mpz_qd:
+                updates = (<CountingFastEvaluator[FP_NR[qd_t]]*>self._fe_core.qd).nr_updates
+                radius_reductions = (<CountingFastEvaluator[FP_NR[qd_t]]*>self._fe_core.qd).nr_radius_reductions
+        if self.M._type == gso_mpz_mpfr:
+            updates = (<CountingFastErrorBoundedEvaluator*>self._fe_core.mpfr).nr_updates
+            radius_reductions = (<CountingFastErrorBoundedEvaluator*>self._fe_core.mpfr).nr_radius_reductions
+
+        self.stats = EnumerationStats(self.get_nodes(), solutions, updates, radius_reductions,
+                                      core_time, total_time)
+        return 0
 
     def get_nodes(self):
         """Return number of visited nodes in last enumeration call.
@@ -557,22 +557,22 @@ cdef extern from "fplll/enum/enumerate.h" namespace "fplll":
         void enumerate(int first, int last, FT& fMaxDist, long maxDistExpo,
                        const vector[FT]& targetCoord,
                        const vector[double]& subTree,
-                       const vector[double]& pruning)
+                       const vector[double]& pruning) nogil
 
         void enumerate(int first, int last, FT& fMaxDist, long maxDistExpo,
                        const vector[FT]& targetCoord,
                        const vector[double]& subTree,
                        const vector[double]& pruning,
-                       int dual)
+                       int dual) nogil
 
         void enumerate(int first, int last, FT& fMaxDist, long maxDistExpo,
                        const vector[FT]& targetCoord,
                        const vector[double]& subTree,
                        const vector[double]& pruning,
                        int dual,
-                       int subtree_reset)
+                       int subtree_reset) nogil
 
-        long get_nodes()
+        long get_nodes() nogil
 
 
 
@@ -674,7 +674,7 @@ cdef extern from "fplll/bkz.h" namespace "fplll":
 
         int hkz(int &kappaMax, const BKZParam &param, int min_row, int max_row) nogil except +
 
-        int bkz()
+        int bkz() nogil
 
         void rerandomize_block(int min_row, int max_row, int density) nogil except +
 
@@ -743,21 +743,21 @@ cdef extern from "fplll/pruner.h" namespace "fplll":
         Pruner(FT enumeration_radius, FT preproc_cost, FT target, PrunerMethod method,
                PrunerMetric metric, size_t n, size_t d)
 
-        void load_basis_shape(const vector[double] &gso_sq_norms, bool reset_renorm)
-        void load_basis_shapes(const vector[vector[double]] &gso_sq_norms_vec)
+        void load_basis_shape(const vector[double] &gso_sq_norms, bool reset_renorm) nogil
+        void load_basis_shapes(const vector[vector[double]] &gso_sq_norms_vec) nogil
 
-        void optimize_coefficients(vector[double] &pr, bool reset)
+        void optimize_coefficients(vector[double] &pr, bool reset) nogil
 
-        double single_enum_cost(const vector[double] &pr)
-        double single_enum_cost(const vector[double] &pr, vector[double] *detailed_cost)
-        double repeated_enum_cost(const vector[double] &pr)
-        double measure_metric(const vector[double] &pr)
+        double single_enum_cost(const vector[double] &pr) nogil
+        double single_enum_cost(const vector[double] &pr, vector[double] *detailed_cost) nogil
+        double repeated_enum_cost(const vector[double] &pr) nogil
+        double measure_metric(const vector[double] &pr) nogil
 
     void prune[FT](Pruning &pruning, double &enumeration_radius, const double preproc_cost, const double target,
-                   vector[double] &r, const PrunerMethod method, const PrunerMetric metric, bool reset)
+                   vector[double] &r, const PrunerMethod method, const PrunerMetric metric, bool reset) nogil
 
     void prune[FT](Pruning &pruning, double &enumeration_radius, const double preproc_cost, const double target,
-                   vector[vector[double]] &rs, const PrunerMethod method, const PrunerMetric metric, bool reset);
+                   vector[vector[double]] &rs, const PrunerMethod method, const PrunerMetric metric, bool reset) nogil
 
     FT svp_probability[FT](const Pruning &pruning)
     FT svp_probability[FT](const vector[double] &pr)
@@ -770,7 +770,7 @@ cdef extern from "fplll/sieve/sieve_gauss.h" namespace "fplll":
     cdef cppclass GaussSieve[ZT, FT]:
         GaussSieve(ZZ_mat[ZT] &B, int algorithm, bool verbose, int seed);
 
-        bool sieve(Z_NR[ZT] target_norm)
+        bool sieve(Z_NR[ZT] target_norm) nogil
 
         void set_verbose(bool verbose)
         bool verbose
@@ -796,6 +796,9 @@ cdef extern from "fplll/fplll.h" namespace "fplll":
                       double delta, double eta,
                       LLLMethod method, FloatType float_type,
                       int precision, int flags) nogil
+    int lll_reduction(ZZ_mat[long] b, double delta, double eta,
+                      LLLMethod method, FloatType float_type,
+                      int precision, int flags) nogil
 
     int bkz_reduction(ZZ_mat[mpz_t] *b, ZZ_mat[mpz_t] *u,
                       BKZParam &param, FloatType float_type, int precision) nogil
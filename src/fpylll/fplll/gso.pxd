@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+from libcpp.vector cimport vector
 from integer_matrix cimport IntegerMatrix
 from decl cimport mat_gso_core_t, fplll_gso_type_t
 
@@ -10,3 +11,8 @@ cdef class MatGSO:
     cdef readonly IntegerMatrix B
     cdef readonly IntegerMatrix U
     cdef readonly IntegerMatrix UinvT
+    cdef int _flags
+    cdef object _lock
+
+    cdef int _dump_mu_r(self, vector[double]& mu, vector[double]& r, int offset, int block_size) except -1
+    cdef int _dump_B(self, vector[double]& B, int first, int last) except -1
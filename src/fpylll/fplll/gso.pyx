@@ -18,7 +18,12 @@ triangular.
 
 include "fpylll/config.pxi"
 
+import threading
+from contextlib import contextmanager
 from cysignals.signals cimport sig_on, sig_off
+from cpython cimport PyIndex_Check
+from libc.math cimport rint
+from libcpp.vector cimport vector
 
 from decl cimport gso_mpz_d, gso_mpz_ld, gso_mpz_dpe, gso_mpz_mpfr, fp_nr_t
 from fplll cimport FT_DOUBLE, FT_LONG_DOUBLE, FT_DPE, FT_MPFR, FloatType
@@ -29,9 +34,11 @@ from fplll cimport GSO_ROW_EXPO
 from fplll cimport MatGSO as MatGSO_c, Z_NR, FP_NR, Matrix
 from fplll cimport dpe_t
 from fplll cimport get_current_slope
-from fpylll.gmp.mpz cimport mpz_t
+from fpylll.gmp.mpz cimport mpz_t, mpz_init, mpz_clear, mpz_set_ui, mpz_addmul, mpz_get_d
+from fpylll.io cimport assign_Z_NR_mpz
 from fpylll.mpfr.mpfr cimport mpfr_t
 from fpylll.util cimport preprocess_indices, check_float_type
+from fpylll.util import get_precision, precision, auto_float_types
 from integer_matrix cimport IntegerMatrix
 
 IF HAVE_QD:
@@ -39,6 +46,61 @@ IF HAVE_QD:
     from decl cimport gso_mpz_dd, gso_mpz_qd
     from fplll cimport FT_DD, FT_QD
 
+class _MatGSOLock(object):
+    """
+    A reentrant lock serialising access to the C++ object of a ``MatGSO`` object.
+
+    While an enumeration which reports solutions to Python holds the lock, acquiring it from the
+    thread running the callback or from a consumer the enumeration is waiting for raises a
+    ``RuntimeError`` instead of blocking: the former would modify ``M`` under the enumeration, the
+    latter would hang.  All other threads wait for the enumeration to finish as usual.
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._guard = threading.Lock()
+        self._forbidden = {}
+
+    def __enter__(self):
+        with self._guard:
+            if threading.current_thread().ident in self._forbidden:
+                raise RuntimeError("MatGSO object is used by an enumeration reporting solutions, "
+                                   "it must not be used from the callback or while iterating over "
+                                   "solutions.")
+        self._lock.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._lock.release()
+
+    @contextmanager
+    def forbid(self, ident=None):
+        """
+        Raise a ``RuntimeError`` when the thread ``ident`` tries to acquire the lock.
+
+        :param ident: thread identifier or ``None`` for the current thread
+        """
+        if ident is None:
+            ident = threading.current_thread().ident
+        with self._guard:
+            self._forbidden[ident] = self._forbidden.get(ident, 0) + 1
+        try:
+            yield self
+        finally:
+            with self._guard:
+                self._forbidden[ident] -= 1
+                if not self._forbidden[ident]:
+                    del self._forbidden[ident]
+
+    @contextmanager
+    def callbacks(self):
+        """
+        Hold the lock while running code which calls back into Python from the current thread.
+        """
+        with self:
+            with self.forbid():
+                yield self
+
+
 class MatGSORowOpContext(object):
     """
     A context in which performing row operations is safe.  When the context is left, the appropriate
@@ -61,7 +123,13 @@ class MatGSORowOpContext(object):
         Enter context for working on rows.
 
         """
-        self.M.row_op_begin(self.i, self.j)
+        # other threads must not see or modify the rows until row_op_end() was called
+        self.M._lock.__enter__()
+        try:
+            self.M.row_op_begin(self.i, self.j)
+        except BaseException:
+            self.M._lock.__exit__(None, None, None)
+            raise
         return self
 
     def __exit__(self, exception_type, exception_value, exception_traceback):
@@ -73,7 +141,10 @@ class MatGSORowOpContext(object):
         :param exception_traceback:
 
         """
-        self.M.row_op_end(self.i, self.j)
+        try:
+            self.M.row_op_end(self.i, self.j)
+        finally:
+            self.M._lock.__exit__(None, None, None)
         return False
 
 
@@ -82,6 +153,12 @@ cdef class MatGSO:
     MatGSO provides an interface for performing elementary operations on a basis and computing its
     Gram matrix and its Gram-Schmidt orthogonalization.  The Gram-Schmidt coefficients are computed
     on demand.  The object keeps track of which coefficients are valid after each row operation.
+
+    Calls which modify the object, i.e. ``update_gso``, ``update_gso_row``, row operations including
+    the context returned by ``row_ops``, ``create_row`` and ``remove_last_row``, as well as LLL, BKZ
+    and enumeration on it, hold a lock on the object, so they are serialised when several threads
+    share it.  Accessors such as ``get_r``, ``get_mu``, ``r`` or the batch methods do not take the
+    lock to keep them cheap: they must not be called while another thread modifies the object.
     """
 
     def __init__(self, IntegerMatrix B, U=None, UinvT=None,
@@ -112,11 +189,20 @@ cdef class MatGSO:
                 - ``GSO.OP_FORCE_LONG`` - Affects the behaviour of ``row_addmul``.  See its
                   documentation.
 
-        :param float_type: A floating point type, i.e. an element of ``fpylll.fpylll.float_types``.
+        :param float_type: A floating point type, i.e. an element of ``fpylll.fpylll.float_types``,
+            or ``"auto"`` to pick the cheapest type expected to be sufficient for ``B``, see
+            :func:`fpylll.util.auto_float_types`.
 
         ..  note:: If ``float_type="mpfr"`` set precision with ``set_precision()`` before
             constructing this object and do not change the precision during the lifetime of this
-            object.
+            object.  If ``float_type="auto"`` picks MPFR, a ``ValueError`` is raised if the current
+            precision is lower than the required precision.
+
+        >>> from fpylll import IntegerMatrix, GSO
+        >>> A = IntegerMatrix.random(40, "uniform", bits=30)
+        >>> GSO.Mat(A, float_type="auto").float_type
+        'double'
+
         """
 
         if U is None:
@@ -139,6 +225,12 @@ cdef class MatGSO:
         cdef Matrix[Z_NR[mpz_t]] *u = <Matrix[Z_NR[mpz_t]]*>self.U._core
         cdef Matrix[Z_NR[mpz_t]] *u_inv_t = <Matrix[Z_NR[mpz_t]]*>self.UinvT._core
 
+        if float_type == "auto":
+            float_type, prec = auto_float_types(B.nrows, B.get_max_exp())[0]
+            if float_type == "mpfr" and get_precision() < prec:
+                raise ValueError("Float type 'auto' requires MPFR with precision %d but precision is %d."%(
+                    prec, get_precision()))
+
         cdef FloatType float_type_ = check_float_type(float_type)
 
         if float_type_ == FT_DOUBLE:
@@ -170,6 +262,9 @@ cdef class MatGSO:
                 raise ValueError("Float type '%s' not understood."%float_type)
 
         self.B = B
+        self._flags = flags
+        # serialises access to the C++ object from threads, since long running calls release the GIL
+        self._lock = _MatGSOLock()
 
     def __dealloc__(self):
         if self._type == gso_mpz_d:
@@ -189,9 +284,29 @@ cdef class MatGSO:
 
     def __reduce__(self):
         """
-        Make sure attempts at pickling raise an error until proper pickling is implemented.
+        Serialize this GSO object.
+
+        The basis and transformation matrices are serialized, the Gram-Schmidt coefficients are
+        recomputed on demand after unpickling.
+
+        >>> import pickle
+        >>> from fpylll import IntegerMatrix, GSO
+        >>> A = IntegerMatrix.random(10, "qary", k=5, bits=10)
+        >>> M = GSO.Mat(A, flags=GSO.ROW_EXPO)
+        >>> _ = M.update_gso()
+        >>> N = pickle.loads(pickle.dumps(M))
+        >>> _ = N.update_gso()
+        >>> N.B == M.B, N.row_expo_enabled, N.get_r(0, 0) == M.get_r(0, 0)
+        (True, True, True)
+
         """
-        raise NotImplementedError
+        U = self.U if self.transform_enabled else None
+        UinvT = self.UinvT if self.inverse_transform_enabled else None
+        if self._type == gso_mpz_mpfr:
+            prec = get_precision()
+        else:
+            prec = 0
+        return unpickle_MatGSO, (self.B, U, UinvT, self._flags, self.float_type, prec)
 
     @property
     def float_type(self):
@@ -430,20 +545,21 @@ cdef class MatGSO:
 
         .. note:: It is preferable to use ``MatGSORowOpContext`` via ``row_ops``.
         """
-        if self._type == gso_mpz_d:
-            return self._core.mpz_d.row_op_begin(first, last)
-        IF HAVE_LONG_DOUBLE:
-            if self._type == gso_mpz_ld:
-                return self._core.mpz_ld.row_op_begin(first, last)
-        if self._type == gso_mpz_dpe:
-            return self._core.mpz_dpe.row_op_begin(first, last)
-        IF HAVE_QD:
-            if self._type == gso_mpz_dd:
-                return self._core.mpz_dd.row_op_begin(first, last)
-            if self._type == gso_mpz_qd:
-                return self._core.mpz_qd.row_op_begin(first, last)
-        if self._type == gso_mpz_mpfr:
-            return self._core.mpz_mpfr.row_op_begin(first, last)
+        with self._lock:
+            if self._type == gso_mpz_d:
+                return self._core.mpz_d.row_op_begin(first, last)
+            IF HAVE_LONG_DOUBLE:
+                if self._type == gso_mpz_ld:
+                    return self._core.mpz_ld.row_op_begin(first, last)
+            if self._type == gso_mpz_dpe:
+                return self._core.mpz_dpe.row_op_begin(first, last)
+            IF HAVE_QD:
+                if self._type == gso_mpz_dd:
+                    return self._core.mpz_dd.row_op_begin(first, last)
+                if self._type == gso_mpz_qd:
+                    return self._core.mpz_qd.row_op_begin(first, last)
+            if self._type == gso_mpz_mpfr:
+                return self._core.mpz_mpfr.row_op_begin(first, last)
 
         raise RuntimeError("MatGSO object '%s' has no core."%self)
 
@@ -457,20 +573,21 @@ cdef class MatGSO:
 
         .. note:: It is preferable to use ``MatGSORowOpContext`` via ``row_ops``.
         """
-        if self._type == gso_mpz_d:
-            return self._core.mpz_d.row_op_end(first, last)
-        IF HAVE_LONG_DOUBLE:
-            if self._type == gso_mpz_ld:
-                return self._core.mpz_ld.row_op_end(first, last)
-        if self._type == gso_mpz_dpe:
-            return self._core.mpz_dpe.row_op_end(first, last)
-        IF HAVE_QD:
-            if self._type == gso_mpz_dd:
-                return self._core.mpz_dd.row_op_end(first, last)
-            if self._type == gso_mpz_qd:
-                return self._core.mpz_qd.row_op_end(first, last)
-        if self._type == gso_mpz_mpfr:
-            return self._core.mpz_mpfr.row_op_end(first, last)
+        with self._lock:
+            if self._type == gso_mpz_d:
+                return self._core.mpz_d.row_op_end(first, last)
+            IF HAVE_LONG_DOUBLE:
+                if self._type == gso_mpz_ld:
+                    return self._core.mpz_ld.row_op_end(first, last)
+            if self._type == gso_mpz_dpe:
+                return self._core.mpz_dpe.row_op_end(first, last)
+            IF HAVE_QD:
+                if self._type == gso_mpz_dd:
+                    return self._core.mpz_dd.row_op_end(first, last)
+                if self._type == gso_mpz_qd:
+                    return self._core.mpz_qd.row_op_end(first, last)
+            if self._type == gso_mpz_mpfr:
+                return self._core.mpz_mpfr.row_op_end(first, last)
 
         raise RuntimeError("MatGSO object '%s' has no core."%self)
 
@@ -669,32 +786,33 @@ cdef class MatGSO:
         Updates all GSO coefficients (`μ` and `r`).
         """
         cdef int r
-        if self._type == gso_mpz_d:
-            with nogil:
-                r = self._core.mpz_d.update_gso()
-            return bool(r)
-        IF HAVE_LONG_DOUBLE:
-            if self._type == gso_mpz_ld:
+        with self._lock:
+            if self._type == gso_mpz_d:
                 with nogil:
-                    r = self._core.mpz_ld.update_gso()
+                    r = self._core.mpz_d.update_gso()
                 return bool(r)
-        if self._type == gso_mpz_dpe:
-            with nogil:
-                r = self._core.mpz_dpe.update_gso()
-            return bool(r)
-        IF HAVE_QD:
-            if self._type == gso_mpz_dd:
+            IF HAVE_LONG_DOUBLE:
+                if self._type == gso_mpz_ld:
+                    with nogil:
+                        r = self._core.mpz_ld.update_gso()
+                    return bool(r)
+            if self._type == gso_mpz_dpe:
                 with nogil:
-                    r = self._core.mpz_dd.update_gso()
+                    r = self._core.mpz_dpe.update_gso()
                 return bool(r)
-            if self._type == gso_mpz_qd:
+            IF HAVE_QD:
+                if self._type == gso_mpz_dd:
+                    with nogil:
+                        r = self._core.mpz_dd.update_gso()
+                    return bool(r)
+                if self._type == gso_mpz_qd:
+                    with nogil:
+                        r = self._core.mpz_qd.update_gso()
+                    return bool(r)
+            if self._type == gso_mpz_mpfr:
                 with nogil:
-                    r = self._core.mpz_qd.update_gso()
+                    r = self._core.mpz_mpfr.update_gso()
                 return bool(r)
-        if self._type == gso_mpz_mpfr:
-            with nogil:
-                r = self._core.mpz_mpfr.update_gso()
-            return bool(r)
 
         raise RuntimeError("MatGSO object '%s' has no core."%self)
 
@@ -707,20 +825,21 @@ cdef class MatGSO:
         :param int last_j:
 
         """
-        if self._type == gso_mpz_d:
-            return bool(self._core.mpz_d.update_gso_row(i, last_j))
-        IF HAVE_LONG_DOUBLE:
-            if self._type == gso_mpz_ld:
-                return bool(self._core.mpz_ld.update_gso_row(i, last_j))
-        if self._type == gso_mpz_dpe:
-            return bool(self._core.mpz_dpe.update_gso_row(i, last_j))
-        IF HAVE_QD:
-            if self._type == gso_mpz_dd:
-                return bool(self._core.mpz_dd.update_gso_row(i, last_j))
-            if self._type == gso_mpz_qd:
-                return bool(self._core.mpz_qd.update_gso_row(i, last_j))
-        if self._type == gso_mpz_mpfr:
-            return bool(self._core.mpz_mpfr.update_gso_row(i, last_j))
+        with self._lock:
+            if self._type == gso_mpz_d:
+                return bool(self._core.mpz_d.update_gso_row(i, last_j))
+            IF HAVE_LONG_DOUBLE:
+                if self._type == gso_mpz_ld:
+                    return bool(self._core.mpz_ld.update_gso_row(i, last_j))
+            if self._type == gso_mpz_dpe:
+                return bool(self._core.mpz_dpe.update_gso_row(i, last_j))
+            IF HAVE_QD:
+                if self._type == gso_mpz_dd:
+                    return bool(self._core.mpz_dd.update_gso_row(i, last_j))
+                if self._type == gso_mpz_qd:
+                    return bool(self._core.mpz_qd.update_gso_row(i, last_j))
+            if self._type == gso_mpz_mpfr:
+                return bool(self._core.mpz_mpfr.update_gso_row(i, last_j))
 
         raise RuntimeError("MatGSO object '%s' has no core."%self)
 
@@ -729,20 +848,21 @@ cdef class MatGSO:
         """
         Allows ``row_addmul`` for all rows even if the GSO has never been computed.
         """
-        if self._type == gso_mpz_d:
-            return self._core.mpz_d.discover_all_rows()
-        IF HAVE_LONG_DOUBLE:
-            if self._type == gso_mpz_ld:
-                return self._core.mpz_ld.discover_all_rows()
-        if self._type == gso_mpz_dpe:
-            return self._core.mpz_dpe.discover_all_rows()
-        IF HAVE_QD:
-            if self._type == gso_mpz_dd:
-                return self._core.mpz_dd.discover_all_rows()
-            if self._type == gso_mpz_qd:
-                return self._core.mpz_qd.discover_all_rows()
-        if self._type == gso_mpz_mpfr:
-            return self._core.mpz_mpfr.discover_all_rows()
+        with self._lock:
+            if self._type == gso_mpz_d:
+                return self._core.mpz_d.discover_all_rows()
+            IF HAVE_LONG_DOUBLE:
+                if self._type == gso_mpz_ld:
+                    return self._core.mpz_ld.discover_all_rows()
+            if self._type == gso_mpz_dpe:
+                return self._core.mpz_dpe.discover_all_rows()
+            IF HAVE_QD:
+                if self._type == gso_mpz_dd:
+                    return self._core.mpz_dd.discover_all_rows()
+                if self._type == gso_mpz_qd:
+                    return self._core.mpz_qd.discover_all_rows()
+            if self._type == gso_mpz_mpfr:
+                return self._core.mpz_mpfr.discover_all_rows()
 
         raise RuntimeError("MatGSO object '%s' has no core."%self)
 
@@ -756,20 +876,21 @@ cdef class MatGSO:
 
         """
         preprocess_indices(old_r, new_r, self.d, self.d)
-        if self._type == gso_mpz_d:
-            return self._core.mpz_d.move_row(old_r, new_r)
-        IF HAVE_LONG_DOUBLE:
-            if self._type == gso_mpz_ld:
-                return self._core.mpz_ld.move_row(old_r, new_r)
-        if self._type == gso_mpz_dpe:
-            return self._core.mpz_dpe.move_row(old_r, new_r)
-        IF HAVE_QD:
-            if self._type == gso_mpz_dd:
-                return self._core.mpz_dd.move_row(old_r, new_r)
-            if self._type == gso_mpz_qd:
-                return self._core.mpz_qd.move_row(old_r, new_r)
-        if self._type == gso_mpz_mpfr:
-            return self._core.mpz_mpfr.move_row(old_r, new_r)
+        with self._lock:
+            if self._type == gso_mpz_d:
+                return self._core.mpz_d.move_row(old_r, new_r)
+            IF HAVE_LONG_DOUBLE:
+                if self._type == gso_mpz_ld:
+                    return self._core.mpz_ld.move_row(old_r, new_r)
+            if self._type == gso_mpz_dpe:
+                return self._core.mpz_dpe.move_row(old_r, new_r)
+            IF HAVE_QD:
+                if self._type == gso_mpz_dd:
+                    return self._core.mpz_dd.move_row(old_r, new_r)
+                if self._type == gso_mpz_qd:
+                    return self._core.mpz_qd.move_row(old_r, new_r)
+            if self._type == gso_mpz_mpfr:
+                return self._core.mpz_mpfr.move_row(old_r, new_r)
 
         raise RuntimeError("MatGSO object '%s' has no core."%self)
 
@@ -827,26 +948,27 @@ cdef class MatGSO:
         preprocess_indices(i, j, self.d, self.d)
         cdef fp_nr_t x_
 
-        if self._type == gso_mpz_d:
-            x_.d = float(x)
-            return self._core.mpz_d.row_addmul(i, j, x_.d)
-        IF HAVE_LONG_DOUBLE:
-            if self._type == gso_mpz_ld:
-                x_.ld = float(x)
-                return self._core.mpz_ld.row_addmul(i, j, x_.ld)
-        if self._type == gso_mpz_dpe:
-            x_.dpe = float(x)
-            return self._core.mpz_dpe.row_addmul(i, j, x_.dpe)
-        IF HAVE_QD:
-            if self._type == gso_mpz_dd:
-                x_.dd = float(x)
-                return self._core.mpz_dd.row_addmul(i, j, x_.dd)
-            if self._type == gso_mpz_qd:
-                x_.qd = float(x)
-                return self._core.mpz_qd.row_addmul(i, j, x_.qd)
-        if self._type == gso_mpz_mpfr:
-            x_.mpfr = float(x)
-            return self._core.mpz_mpfr.row_addmul(i, j, x_.mpfr)
+        with self._lock:
+            if self._type == gso_mpz_d:
+                x_.d = float(x)
+                return self._core.mpz_d.row_addmul(i, j, x_.d)
+            IF HAVE_LONG_DOUBLE:
+                if self._type == gso_mpz_ld:
+                    x_.ld = float(x)
+                    return self._core.mpz_ld.row_addmul(i, j, x_.ld)
+            if self._type == gso_mpz_dpe:
+                x_.dpe = float(x)
+                return self._core.mpz_dpe.row_addmul(i, j, x_.dpe)
+            IF HAVE_QD:
+                if self._type == gso_mpz_dd:
+                    x_.dd = float(x)
+                    return self._core.mpz_dd.row_addmul(i, j, x_.dd)
+                if self._type == gso_mpz_qd:
+                    x_.qd = float(x)
+                    return self._core.mpz_qd.row_addmul(i, j, x_.qd)
+            if self._type == gso_mpz_mpfr:
+                x_.mpfr = float(x)
+                return self._core.mpz_mpfr.row_addmul(i, j, x_.mpfr)
 
         raise RuntimeError("MatGSO object '%s' has no core."%self)
 
@@ -859,20 +981,21 @@ cdef class MatGSO:
         if self.inverse_transform_enabled:
             raise ValueError("create_row is incompatible with ``inverse_transform_enabled``")
 
-        if self._type == gso_mpz_d:
-            return self._core.mpz_d.create_row()
-        IF HAVE_LONG_DOUBLE:
-            if self._type == gso_mpz_ld:
-                return self._core.mpz_ld.create_row()
-        if self._type == gso_mpz_dpe:
-            return self._core.mpz_dpe.create_row()
-        IF HAVE_QD:
-            if self._type == gso_mpz_dd:
-                return self._core.mpz_dd.create_row()
-            if self._type == gso_mpz_qd:
-                return self._core.mpz_qd.create_row()
-        if self._type == gso_mpz_mpfr:
-            return self._core.mpz_mpfr.create_row()
+        with self._lock:
+            if self._type == gso_mpz_d:
+                return self._core.mpz_d.create_row()
+            IF HAVE_LONG_DOUBLE:
+                if self._type == gso_mpz_ld:
+                    return self._core.mpz_ld.create_row()
+            if self._type == gso_mpz_dpe:
+                return self._core.mpz_dpe.create_row()
+            IF HAVE_QD:
+                if self._type == gso_mpz_dd:
+                    return self._core.mpz_dd.create_row()
+                if self._type == gso_mpz_qd:
+                    return self._core.mpz_qd.create_row()
+            if self._type == gso_mpz_mpfr:
+                return self._core.mpz_mpfr.create_row()
 
         raise RuntimeError("MatGSO object '%s' has no core."%self)
 
@@ -884,20 +1007,21 @@ cdef class MatGSO:
         if self.inverse_transform_enabled:
             raise ValueError("remove_last_row is incompatible with ``inverse_transform_enabled``")
 
-        if self._type == gso_mpz_d:
-            return self._core.mpz_d.remove_last_row()
-        IF HAVE_LONG_DOUBLE:
-            if self._type == gso_mpz_ld:
-                return self._core.mpz_ld.remove_last_row()
-        if self._type == gso_mpz_dpe:
-            return self._core.mpz_dpe.remove_last_row()
-        IF HAVE_QD:
-            if self._type == gso_mpz_dd:
-                return self._core.mpz_dd.remove_last_row()
-            if self._type == gso_mpz_qd:
-                return self._core.mpz_qd.remove_last_row()
-        if self._type == gso_mpz_mpfr:
-            return self._core.mpz_mpfr.remove_last_row()
+        with self._lock:
+            if self._type == gso_mpz_d:
+                return self._core.mpz_d.remove_last_row()
+            IF HAVE_LONG_DOUBLE:
+                if self._type == gso_mpz_ld:
+                    return self._core.mpz_ld.remove_last_row()
+            if self._type == gso_mpz_dpe:
+                return self._core.mpz_dpe.remove_last_row()
+            IF HAVE_QD:
+                if self._type == gso_mpz_dd:
+                    return self._core.mpz_dd.remove_last_row()
+                if self._type == gso_mpz_qd:
+                    return self._core.mpz_qd.remove_last_row()
+            if self._type == gso_mpz_mpfr:
+                return self._core.mpz_mpfr.remove_last_row()
 
         raise RuntimeError("MatGSO object '%s' has no core."%self)
 
@@ -1083,6 +1207,57 @@ cdef class MatGSO:
         raise RuntimeError("MatGSO object '%s' has no core."%self)
 
 
+    cdef int _dump_mu_r(self, vector[double]& mu, vector[double]& r, int offset, int block_size) except -1:
+        """
+        Write `μ_{offset+i, offset+j}` to ``mu[i*block_size + j]`` and `r_{offset+i, offset+i}` to
+        ``r[i]`` for `0 ≤ i,j < block_size`.
+        """
+        mu.resize(block_size*block_size)
+        r.resize(block_size)
+        if block_size == 0:
+            return 0
+
+        if self._type == gso_mpz_d:
+            self._core.mpz_d.dump_mu_d(&mu[0], offset, block_size)
+            self._core.mpz_d.dump_r_d(&r[0], offset, block_size)
+            return 0
+        IF HAVE_LONG_DOUBLE:
+            if self._type == gso_mpz_ld:
+                self._core.mpz_ld.dump_mu_d(&mu[0], offset, block_size)
+                self._core.mpz_ld.dump_r_d(&r[0], offset, block_size)
+                return 0
+        if self._type == gso_mpz_dpe:
+            self._core.mpz_dpe.dump_mu_d(&mu[0], offset, block_size)
+            self._core.mpz_dpe.dump_r_d(&r[0], offset, block_size)
+            return 0
+        IF HAVE_QD:
+            if self._type == gso_mpz_dd:
+                self._core.mpz_dd.dump_mu_d(&mu[0], offset, block_size)
+                self._core.mpz_dd.dump_r_d(&r[0], offset, block_size)
+                return 0
+            if self._type == gso_mpz_qd:
+                self._core.mpz_qd.dump_mu_d(&mu[0], offset, block_size)
+                self._core.mpz_qd.dump_r_d(&r[0], offset, block_size)
+                return 0
+        if self._type == gso_mpz_mpfr:
+            self._core.mpz_mpfr.dump_mu_d(&mu[0], offset, block_size)
+            self._core.mpz_mpfr.dump_r_d(&r[0], offset, block_size)
+            return 0
+
+        raise RuntimeError("MatGSO object '%s' has no core."%self)
+
+    cdef int _dump_B(self, vector[double]& B, int first, int last) except -1:
+        """
+        Write rows ``first`` to ``last`` of the basis as doubles to ``B`` in row major order.
+        """
+        cdef int i, j
+        cdef int n = self.B._core.get_cols()
+        B.resize((last-first)*n)
+        for i in range(first, last):
+            for j in range(n):
+                B[(i-first)*n + j] = self.B._core[0][i][j].get_d()
+        return 0
+
     def from_canonical(self, v, int start=0, int dimension=-1):
         """Given a vector `v` wrt the canonical basis `\mathbb{Z}^n` return a vector wrt the
         Gram-Schmidt basis `B^*`
@@ -1109,27 +1284,73 @@ cdef class MatGSO:
             True
 
         """
-        cdef Py_ssize_t i, j, d
+        return self.from_canonical_batch((v,), start, dimension)[0]
 
-        if dimension == -1:
-            d = self.d - start
-        else:
-            d = dimension
+    def from_canonical_batch(self, V, int start=0, int dimension=-1):
+        """Apply ``from_canonical`` to each vector in ``V``.
 
-        cdef list ret = [0]*(start+d)
-        for i in range(start+d):
-            for j in range(self.B.ncols):
-                ret[i] += self.B[i, j] * v[j]
+        The Gram-Schmidt coefficients are read once for all vectors.  For vectors with integer
+        entries the products with the rows of the basis are computed exactly, otherwise the basis is
+        read once as doubles.
 
-            for j in range(i):
-                ret[i] -= self.get_mu(i, j) * ret[j]
+        :param V: a list of tuple-like objects of dimension ``M.B.ncols`` or a 2-D array
+        :param start: only consider subbasis starting at ``start```
+        :param dimension: only consider ``dimension`` vectors or all if ``-1``
 
-        # we drop the first ``start`` entries anyway, so no need to update
-        for i in range(d):
-            ret[start+i] /= self.get_r(start+i, start+i)
+        :returns: a tuple of tuples of dimension ``dimension``` or ``M.d``` when ``dimension`` is
+            ``None``
 
-        return tuple(ret)[start:]
+        """
+        cdef int i, j, k, d, n = self.B.ncols
 
+        if dimension == -1:
+            d = self.d - start
+        else:
+            d = dimension
+        if start < 0 or d < 0 or start + d > self.d:
+            raise ValueError("Rows %d to %d out of bounds for dimension %d."%(start, start + d, self.d))
+
+        cdef int D = start + d
+        cdef vector[double] mu, r, B, v_, ret
+        cdef IntegerMatrix v_z = IntegerMatrix(1, n)
+        cdef bint have_B = False
+        cdef mpz_t acc
+        self._dump_mu_r(mu, r, 0, D)
+        v_.resize(n)
+        ret.resize(D)
+
+        cdef list W = []
+        mpz_init(acc)
+        try:
+            for v in V:
+                if len(v) != n:
+                    raise ValueError("Expected vector of length %d but got %d."%(n, len(v)))
+                if all([PyIndex_Check(x) for x in v]):
+                    for j in range(n):
+                        assign_Z_NR_mpz(v_z._core[0][0][j], int(v[j]))
+                    for i in range(D):
+                        mpz_set_ui(acc, 0)
+                        for j in range(n):
+                            mpz_addmul(acc, self.B._core[0][i][j].get_data(), v_z._core[0][0][j].get_data())
+                        ret[i] = mpz_get_d(acc)
+                else:
+                    if not have_B:
+                        self._dump_B(B, 0, D)
+                        have_B = True
+                    for j in range(n):
+                        v_[j] = v[j]
+                    for i in range(D):
+                        ret[i] = 0.0
+                        for j in range(n):
+                            ret[i] += B[i*n + j] * v_[j]
+                for i in range(D):
+                    for j in range(i):
+                        ret[i] -= mu[i*D + j] * ret[j]
+                # we drop the first ``start`` entries anyway, so no need to update
+                W.append(tuple([ret[start+k]/r[start+k] for k in range(d)]))
+        finally:
+            mpz_clear(acc)
+        return tuple(W)
 
     def to_canonical(self, v, int start=0):
         """
@@ -1142,21 +1363,43 @@ cdef class MatGSO:
         :returns: a tuple of dimension ``M.B.ncols``
 
         """
+        return self.to_canonical_batch((v,), start)[0]
 
-        cdef list vv = list(v)
-        cdef Py_ssize_t i, j
-        cdef Py_ssize_t d = min(len(vv), self.d-start)
-        for i in range(d)[::-1]:
-            for j in range(i+1, d):
-                vv[i] -= self.get_mu(start+j, start+i) * vv[j]
+    def to_canonical_batch(self, V, int start=0):
+        """Apply ``to_canonical`` to each vector in ``V``.
 
-        ret = [0]*self.B.ncols
-        for i in range(d):
-            for j in range(self.B.ncols):
-                ret[j] += vv[i] * self.B[start+i,j]
+        The Gram-Schmidt coefficients and the basis are read once for all vectors.
 
-        return tuple(ret)
+        :param V: a list of tuple-like objects of dimension ``M.d`` or a 2-D array
+        :param start: only consider subbasis starting at ``start```
 
+        :returns: a tuple of tuples of dimension ``M.B.ncols``
+
+        """
+        cdef int i, j, d, d_max = self.d - start, n = self.B.ncols
+        if start < 0 or d_max < 0:
+            raise ValueError("Start row %d out of bounds for dimension %d."%(start, self.d))
+        cdef vector[double] mu, r, B, vv, ret
+        self._dump_mu_r(mu, r, start, d_max)
+        self._dump_B(B, start, self.d)
+        vv.resize(d_max)
+        ret.resize(n)
+
+        cdef list W = []
+        for v in V:
+            d = min(len(v), d_max)
+            for i in range(d):
+                vv[i] = v[i]
+            for i in range(d-1, -1, -1):
+                for j in range(i+1, d):
+                    vv[i] -= mu[j*d_max + i] * vv[j]
+            for j in range(n):
+                ret[j] = 0.0
+            for i in range(d):
+                for j in range(n):
+                    ret[j] += vv[i] * B[i*n + j]
+            W.append(tuple([ret[j] for j in range(n)]))
+        return tuple(W)
 
     def babai(self, v, int start=0, int dimension=-1, gso=False):
         """
@@ -1168,20 +1411,52 @@ cdef class MatGSO:
         :param gso: if ``True`` vector is represented wrt to the Gram-Schmidt basis, otherwise
             canonical basis is assumed.
 
-        :returns: a tuple of dimension `M.B.nrows`
+        :returns: a tuple of dimension ``dimension``, or of the length of ``v`` if ``gso`` is
+            ``True``; entries beyond ``dimension`` are returned unchanged
+
+        Coordinates are rounded to the nearest integer with ties to even, as Python 3's ``round``.
+
+        """
+        return self.babai_batch((v,), start, dimension, gso)[0]
+
+    def babai_batch(self, V, int start=0, int dimension=-1, gso=False):
+        """
+        Apply ``babai`` to each vector in ``V``.
+
+        The Gram-Schmidt coefficients are read once for all vectors.
+
+        :param V: a list of tuple-like objects or a 2-D array
+        :param start: only consider subbasis starting at ``start```
+        :param dimension: only consider ``dimension`` vectors or all if ``-1```
+        :param gso: if ``True`` vectors are represented wrt to the Gram-Schmidt basis, otherwise
+            canonical basis is assumed.
+
+        :returns: a tuple of tuples, see :meth:`babai`
         """
         if dimension == -1:
             dimension = self.d - start
+        cdef int i, j, d = dimension
+        if start < 0 or d < 0 or start + d > self.d:
+            raise ValueError("Rows %d to %d out of bounds for dimension %d."%(start, start + d, self.d))
         if not gso:
-            v = self.from_canonical(v, start, dimension)
-
-        cdef Py_ssize_t i, j
-        cdef list vv = list(v)
-        for i in range(dimension)[::-1]:
-            vv[i] = int(round(vv[i]))
-            for j in range(i):
-                vv[j] -= self.get_mu(start+i, start+j) * vv[i]
-        return tuple(vv)
+            V = self.from_canonical_batch(V, start, dimension)
+
+        cdef vector[double] mu, r, vv
+        self._dump_mu_r(mu, r, start, d)
+        vv.resize(d)
+
+        cdef list W = []
+        for v in V:
+            if len(v) < d:
+                raise ValueError("Expected vector of length at least %d but got %d."%(d, len(v)))
+            for i in range(d):
+                vv[i] = v[i]
+            for i in range(d-1, -1, -1):
+                vv[i] = rint(vv[i])
+                for j in range(i):
+                    vv[j] -= mu[i*d + j] * vv[i]
+            W.append(tuple([int(vv[i]) for i in range(d)]) + tuple(v[d:]))
+        return tuple(W)
 
     def r(self, start=0, end=-1):
         """
@@ -1191,6 +1466,15 @@ cdef class MatGSO:
             end = self.d
         return tuple([self.get_r(i, i) for i in range(start, end)])
 
+def unpickle_MatGSO(B, U, UinvT, flags, float_type, prec):
+    """
+    Deserialize a GSO object.
+    """
+    if prec:
+        with precision(prec):
+            return MatGSO(B, U=U, UinvT=UinvT, flags=flags, float_type=float_type)
+    return MatGSO(B, U=U, UinvT=UinvT, flags=flags, float_type=float_type)
+
 class GSO:
     DEFAULT=GSO_DEFAULT
     INT_GRAM=GSO_INT_GRAM
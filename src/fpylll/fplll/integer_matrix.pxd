@@ -1,11 +1,16 @@
 # -*- coding: utf-8 -*-
 
+from libc.stdint cimport int64_t
 from fpylll.gmp.types cimport mpz_t
 from fplll cimport ZZ_mat
 
 cdef class IntegerMatrix:
     cdef ZZ_mat[mpz_t]  *_core
 
+    cdef int _set_int64(self, int64_t[:, ::1] A) except -1
+    cdef int _fits_int64(self)
+    cdef int _get_int64(self, int64_t[:, :] out) except -1
+
 cdef class IntegerMatrixRow:
     cdef int row
     cdef IntegerMatrix m
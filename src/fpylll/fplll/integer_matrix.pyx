@@ -9,17 +9,44 @@ Integer matrices.
 include "fpylll/config.pxi"
 
 from cpython cimport PyIndex_Check
+from libc.stdint cimport int64_t, uint64_t
+from libc.string cimport memcpy, memcmp, memset
+from libcpp.vector cimport vector
+from libcpp.string cimport string
+from cpython.bytes cimport PyBytes_FromStringAndSize, PyBytes_AS_STRING, PyBytes_GET_SIZE
 from cysignals.signals cimport sig_on, sig_off
 
 from fplll cimport Matrix, MatrixRow, sqr_norm, Z_NR
 from fpylll.util cimport preprocess_indices
 from fpylll.io cimport assign_Z_NR_mpz, assign_mpz, mpz_get_python
 
-import re
 from math import log10, ceil, sqrt, floor
 
-from fpylll.gmp.pylong cimport mpz_get_pyintlong
 from fpylll.gmp.mpz cimport mpz_init, mpz_mod, mpz_fdiv_q_ui, mpz_clear, mpz_cmp, mpz_sub, mpz_set
+from fpylll.gmp.mpz cimport mpz_fits_slong_p, mpz_get_si
+from fpylll.gmp.mpz cimport mpz_sizeinbase, mpz_sgn, mpz_export, mpz_import, mpz_neg, mpz_set_ui
+from fpylll.gmp.mpz cimport mpz_set_str
+
+# Binary format: magic, number of rows and columns as little endian 64-bit integers and then for each
+# entry, row by row, the signed number of 64-bit limbs followed by the limbs, least significant first.
+cdef char *_BYTES_MAGIC = b"FPYLLZM1"
+cdef int _BYTES_MAGIC_LEN = 8
+cdef int _LIMB = 8
+# rows without columns take no space in serialized data, bound them to bound the allocation
+cdef int64_t _BYTES_MAX_EMPTY_ROWS = 2**20
+
+cdef inline void _write_int64(char *p, int64_t x) nogil:
+    cdef uint64_t y = <uint64_t>x
+    cdef int k
+    for k in range(8):
+        p[k] = <char>((y >> (8*k)) & 0xff)
+
+cdef inline int64_t _read_int64(const char *p) nogil:
+    cdef uint64_t y = 0
+    cdef int k
+    for k in range(8):
+        y |= (<uint64_t>(<unsigned char>p[k])) << (8*k)
+    return <int64_t>y
 
 cdef class IntegerMatrixRow:
     """
@@ -428,6 +455,140 @@ cdef class IntegerMatrix:
                     A[i][j] = self[i, j]
         return A
 
+    @classmethod
+    def from_numpy(cls, A):
+        """Construct a new integer matrix from a two-dimensional NumPy array.
+
+        :param A: a NumPy array of integer type or of type ``object`` holding Python integers
+
+        >>> import numpy
+        >>> A = IntegerMatrix.from_numpy(numpy.array([[1,2,3],[4,5,6]]))
+        >>> print(A)
+        [ 1 2 3 ]
+        [ 4 5 6 ]
+
+        >>> A = IntegerMatrix.from_numpy(numpy.array([[2**100, -1]], dtype=object))
+        >>> A[0,0] == 2**100
+        True
+
+        """
+        import numpy
+        A = numpy.asarray(A)
+        if A.ndim != 2:
+            raise ValueError("Expected two-dimensional array but got %d dimensions."%A.ndim)
+        B = cls(A.shape[0], A.shape[1])
+        B.set_numpy(A)
+        return B
+
+    def set_numpy(self, A):
+        """Set this matrix from a two-dimensional NumPy array.
+
+        Arrays of signed or unsigned integers which fit into ``int64`` are converted in C without
+        going through Python integers.  Arrays of type ``object`` are converted entry by entry.
+
+        :param A: a NumPy array with shape ``(nrows, ncols)``
+
+        """
+        import numpy
+        A = numpy.asarray(A)
+        if A.shape != (self.nrows, self.ncols):
+            raise ValueError("Expected array of shape %s but got %s."%((self.nrows, self.ncols), A.shape))
+
+        cdef int i, j
+        if A.dtype.kind in "iub" and numpy.can_cast(A.dtype, numpy.int64) and sizeof(long) >= 8:
+            self._set_int64(numpy.ascontiguousarray(A, dtype=numpy.int64))
+        elif A.dtype.kind in "iuO":
+            for i in range(self.nrows):
+                for j in range(self.ncols):
+                    assign_Z_NR_mpz(self._core[0][i][j], int(A[i, j]))
+        else:
+            raise TypeError("Arrays of type '%s' are not supported."%A.dtype)
+
+    cdef int _set_int64(self, int64_t[:, ::1] A) except -1:
+        cdef int i, j
+        cdef int m = A.shape[0]
+        cdef int n = A.shape[1]
+        with nogil:
+            for i in range(m):
+                for j in range(n):
+                    self._core[0][i][j] = <long>A[i, j]
+        return 0
+
+    def to_numpy(self, out=None, dtype=None):
+        """Return this matrix as a two-dimensional NumPy array.
+
+        :param out: a preallocated array of shape ``(nrows, ncols)`` to write to or ``None``
+        :param dtype: ``numpy.int64``, ``object`` or ``None``, in which case ``numpy.int64`` is used
+            if all entries fit and ``object`` otherwise.  Ignored if ``out`` is given.
+        :returns: ``out`` or a new array
+
+        >>> import numpy
+        >>> A = IntegerMatrix.from_matrix([[1,2,3],[4,5,6]])
+        >>> A.to_numpy()
+        array([[1, 2, 3],
+               [4, 5, 6]])
+
+        >>> A[0,0] = 2**100
+        >>> A.to_numpy().dtype
+        dtype('O')
+
+        >>> A.to_numpy(dtype=numpy.int64)
+        Traceback (most recent call last):
+        ...
+        OverflowError: Matrix entries do not fit into int64.
+
+        """
+        import numpy
+
+        cdef int i, j
+        cdef int m = self.nrows
+        cdef int n = self.ncols
+
+        if out is not None:
+            if out.shape != (m, n):
+                raise ValueError("Expected array of shape %s but got %s."%((m, n), out.shape))
+            dtype = out.dtype
+        elif dtype is None:
+            dtype = numpy.int64 if self._fits_int64() else object
+        dtype = numpy.dtype(dtype)
+
+        if dtype == numpy.int64:
+            if not self._fits_int64():
+                raise OverflowError("Matrix entries do not fit into int64.")
+            if out is None:
+                out = numpy.empty((m, n), dtype=numpy.int64)
+            self._get_int64(out)
+        elif dtype == numpy.dtype(object):
+            if out is None:
+                out = numpy.empty((m, n), dtype=object)
+            for i in range(m):
+                for j in range(n):
+                    out[i, j] = mpz_get_python(self._core[0][i][j].get_data())
+        else:
+            raise TypeError("Arrays of type '%s' are not supported."%dtype)
+        return out
+
+    cdef int _fits_int64(self):
+        cdef int i, j
+        cdef int m = self._core.get_rows()
+        cdef int n = self._core.get_cols()
+        if sizeof(long) < 8:
+            return 0
+        for i in range(m):
+            for j in range(n):
+                if not mpz_fits_slong_p(self._core[0][i][j].get_data()):
+                    return 0
+        return 1
+
+    cdef int _get_int64(self, int64_t[:, :] out) except -1:
+        cdef int i, j
+        cdef int m = out.shape[0]
+        cdef int n = out.shape[1]
+        for i in range(m):
+            for j in range(n):
+                out[i, j] = mpz_get_si(self._core[0][i][j].get_data())
+        return 0
+
     def __dealloc__(self):
         """
         Delete integer matrix
@@ -490,14 +651,110 @@ cdef class IntegerMatrix:
         >>> pickle.loads(pickle.dumps(A)) == A
         True
 
+        """
+        return unpickle_IntegerMatrix, (self.nrows, self.ncols, self.to_bytes())
+
+    def to_bytes(self):
+        """Serialize this matrix into a compact binary string.
+
+        Entries are written as signed 64-bit limb counts followed by the limbs of their absolute
+        value, after a small header holding the dimensions.
+
+        >>> A = IntegerMatrix.random(10, "uniform", bits=100)
+        >>> IntegerMatrix.from_bytes(A.to_bytes()) == A
+        True
+
         """
         cdef int i, j
-        l = []
-        for i in range(self._core.get_rows()):
-            for j in range(self._core.get_cols()):
-                # mpz_get_pyintlong ensure pickles work between Sage & not-Sage
-                l.append(int(mpz_get_pyintlong(self._core[0][i][j].get_data())))
-        return unpickle_IntegerMatrix, (self.nrows, self.ncols, l)
+        cdef int m = self._core.get_rows()
+        cdef int n = self._core.get_cols()
+        cdef size_t count
+        cdef Py_ssize_t size = _BYTES_MAGIC_LEN + 16
+
+        for i in range(m):
+            for j in range(n):
+                size += 8
+                if mpz_sgn(self._core[0][i][j].get_data()):
+                    size += _LIMB * ((mpz_sizeinbase(self._core[0][i][j].get_data(), 2) + 63) // 64)
+
+        ret = PyBytes_FromStringAndSize(NULL, size)
+        cdef char *p = PyBytes_AS_STRING(ret)
+
+        memcpy(p, _BYTES_MAGIC, _BYTES_MAGIC_LEN)
+        p += _BYTES_MAGIC_LEN
+        _write_int64(p, m)
+        _write_int64(p + 8, n)
+        p += 16
+
+        for i in range(m):
+            for j in range(n):
+                count = 0
+                if mpz_sgn(self._core[0][i][j].get_data()):
+                    mpz_export(p + 8, &count, -1, _LIMB, -1, 0, self._core[0][i][j].get_data())
+                if mpz_sgn(self._core[0][i][j].get_data()) < 0:
+                    _write_int64(p, -<int64_t>count)
+                else:
+                    _write_int64(p, <int64_t>count)
+                p += 8 + _LIMB * count
+        return ret
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Construct a new matrix from the output of ``to_bytes``.
+
+        :param data: a bytes object
+
+        >>> A = IntegerMatrix.from_matrix([[1, -2], [3, 2**100]])
+        >>> B = IntegerMatrix.from_bytes(A.to_bytes())
+        >>> B[0, 1], B[1, 1] == 2**100
+        (-2, True)
+
+        """
+        cdef bytes data_ = bytes(data)
+        cdef const char *p = PyBytes_AS_STRING(data_)
+        cdef const char *end = p + PyBytes_GET_SIZE(data_)
+        cdef int64_t m, n, count
+        cdef uint64_t limbs
+        cdef int i, j
+
+        if end - p < _BYTES_MAGIC_LEN + 16 or memcmp(p, _BYTES_MAGIC, _BYTES_MAGIC_LEN) != 0:
+            raise ValueError("Data is not a serialized integer matrix.")
+        p += _BYTES_MAGIC_LEN
+        m = _read_int64(p)
+        n = _read_int64(p + 8)
+        p += 16
+        if m < 0 or n < 0 or m >= 2**31 or n >= 2**31:
+            raise ValueError("Invalid dimensions %d x %d."%(m, n))
+        # every entry takes at least 8 bytes, check before allocating
+        if n and m > (end - p) // (8*n):
+            raise ValueError("Data is truncated.")
+        if not n and m > _BYTES_MAX_EMPTY_ROWS:
+            raise ValueError("Invalid dimensions %d x %d."%(m, n))
+
+        cdef IntegerMatrix A = cls(m, n)
+        for i in range(m):
+            for j in range(n):
+                if end - p < 8:
+                    raise ValueError("Data is truncated.")
+                count = _read_int64(p)
+                p += 8
+                if count == 0:
+                    mpz_set_ui(A._core[0][i][j].get_data(), 0)
+                    continue
+                # count comes from untrusted input, avoid overflowing -count for INT64_MIN
+                if count < 0:
+                    limbs = <uint64_t>(-(count + 1)) + 1
+                else:
+                    limbs = <uint64_t>count
+                if limbs > <uint64_t>((end - p) // _LIMB):
+                    raise ValueError("Data is truncated.")
+                mpz_import(A._core[0][i][j].get_data(), limbs, -1, _LIMB, -1, 0, <void*>p)
+                if count < 0:
+                    mpz_neg(A._core[0][i][j].get_data(), A._core[0][i][j].get_data())
+                p += _LIMB * limbs
+        if p != end:
+            raise ValueError("Data has trailing bytes.")
+        return A
 
     @property
     def nrows(self):
@@ -1179,45 +1436,305 @@ cdef class IntegerMatrix:
     def multiply_left(self, v, start=0):
         """Return ``v*A'`` where ``A'`` is ``A`` reduced to ``len(v)`` rows starting at ``start``.
 
-        :param v: a tuple-like object
+        :param v: a tuple-like object of integers or integral floats
         :param start: start in row ``start``
+
+        >>> A = IntegerMatrix.from_matrix([[1,2,3],[4,5,6]])
+        >>> A.multiply_left((1, -1))
+        (-3, -3, -3)
+        >>> A.multiply_left((2.0,), start=1)
+        (8, 10, 12)
+
         """
-        r = [0]*self.ncols
-        for i in range(len(v)):
-            for j in range(self.ncols):
-                r[j] += v[i]*self[start+i, j]
-        return tuple(r)
+        return self.multiply_left_batch((v,), start)[0]
+
+    def multiply_left_batch(self, V, int start=0, as_numpy=False):
+        """Return ``v*A'`` for each ``v`` in ``V`` where ``A'`` is ``A`` reduced to ``len(v)`` rows
+        starting at ``start``.
+
+        :param V: a list of tuple-like objects of integers or integral floats or a 2-D array
+        :param start: start in row ``start``
+        :param as_numpy: if ``True`` return a NumPy array of type ``object``, otherwise a tuple of
+            tuples
+
+        >>> A = IntegerMatrix.from_matrix([[1,2,3],[4,5,6]])
+        >>> A.multiply_left_batch([(1, 0), (0, 1), (1, 1)])
+        ((1, 2, 3), (4, 5, 6), (5, 7, 9))
+
+        """
+        cdef int i, j
+        cdef int n = self._core.get_cols()
+        cdef vector[Z_NR[mpz_t]] r
+        cdef Z_NR[mpz_t] c
+        cdef list W = []
+
+        r.resize(n)
+
+        for v in V:
+            if start < 0 or start + len(v) > self._core.get_rows():
+                raise ValueError("Cannot multiply vector of length %d with rows starting at %d."%(len(v), start))
+            for j in range(n):
+                r[j] = 0
+            for i in range(len(v)):
+                vi = v[i]
+                if isinstance(vi, float):
+                    if vi != int(vi):
+                        raise ValueError("Coefficient %f is not integral."%vi)
+                    vi = int(vi)
+                elif not isinstance(vi, (int, long)):
+                    vi = int(vi)
+                assign_Z_NR_mpz(c, vi)
+                if c.sgn() == 0:
+                    continue
+                for j in range(n):
+                    r[j].addmul(c, self._core[0][start+i][j])
+            W.append(tuple([mpz_get_python(r[j].get_data()) for j in range(n)]))
+
+        if as_numpy:
+            import numpy
+            ret = numpy.empty((len(W), n), dtype=object)
+            for i in range(len(W)):
+                ret[i, :] = W[i]
+            return ret
+        return tuple(W)
+
+    def export_rows(self, unsigned char[::1] buf, int limbs, int start=0, int stop=-1):
+        """Write rows ``start`` to ``stop`` into ``buf`` in a fixed width binary format.
+
+        Each entry takes ``8*(limbs+1)`` bytes: its signed number of 64-bit limbs followed by
+        ``limbs`` limbs of its absolute value, least significant first and zero padded.  Since all
+        rows have the same size, the format allows random access to rows, see
+        ``fpylll.tools.basis_store``.
+
+        :param buf: a writable buffer of at least ``8*(limbs+1)*(stop-start)*ncols`` bytes
+        :param limbs: number of 64-bit limbs per entry
+        :param start: first row
+        :param stop: last row (exclusive) or ``-1`` for all rows
+
+        """
+        cdef int i, j
+        cdef int n = self._core.get_cols()
+        cdef size_t count
+        cdef Py_ssize_t width = 8*(<Py_ssize_t>limbs + 1)
+
+        if limbs < 0:
+            raise ValueError("Number of limbs must be ≥ 0 but got %d."%limbs)
+        if stop == -1:
+            stop = self._core.get_rows()
+        if start < 0 or start > stop or stop > self._core.get_rows():
+            raise IndexError("Rows %d to %d out of bounds."%(start, stop))
+        if buf.shape[0] < <Py_ssize_t>(stop-start)*n*width:
+            raise ValueError("Buffer of size %d is too small."%buf.shape[0])
+        if start == stop or n == 0:
+            return
+
+        # check all entries first so that nothing is written if one of them does not fit
+        for i in range(start, stop):
+            for j in range(n):
+                if mpz_sgn(self._core[0][i][j].get_data()):
+                    count = (mpz_sizeinbase(self._core[0][i][j].get_data(), 2) + 63) // 64
+                    if count > <size_t>limbs:
+                        raise OverflowError("Entry (%d, %d) needs %d limbs but only %d are available."%(i, j, count, limbs))
+
+        cdef unsigned char *p = &buf[0]
+        for i in range(start, stop):
+            for j in range(n):
+                count = 0
+                memset(p, 0, width)
+                if mpz_sgn(self._core[0][i][j].get_data()):
+                    mpz_export(p + 8, &count, -1, 8, -1, 0, self._core[0][i][j].get_data())
+                if mpz_sgn(self._core[0][i][j].get_data()) < 0:
+                    _write_int64(<char*>p, -<int64_t>count)
+                else:
+                    _write_int64(<char*>p, <int64_t>count)
+                p += width
+
+    def import_rows(self, const unsigned char[::1] buf, int limbs, int start=0, int stop=-1):
+        """Read rows ``start`` to ``stop`` from ``buf`` written by ``export_rows``.
+
+        :param buf: a buffer of at least ``8*(limbs+1)*(stop-start)*ncols`` bytes
+        :param limbs: number of 64-bit limbs per entry
+        :param start: first row
+        :param stop: last row (exclusive) or ``-1`` for all rows
+
+        >>> A = IntegerMatrix.random(10, "uniform", bits=100)
+        >>> buf = bytearray(8*3*10*10)
+        >>> A.export_rows(buf, 2)
+        >>> B = IntegerMatrix(10, 10)
+        >>> B.import_rows(buf, 2)
+        >>> A == B
+        True
+
+        """
+        cdef int i, j
+        cdef int n = self._core.get_cols()
+        cdef int64_t count
+        cdef uint64_t size
+        cdef Py_ssize_t width = 8*(<Py_ssize_t>limbs + 1)
+
+        if limbs < 0:
+            raise ValueError("Number of limbs must be ≥ 0 but got %d."%limbs)
+        if stop == -1:
+            stop = self._core.get_rows()
+        if start < 0 or start > stop or stop > self._core.get_rows():
+            raise IndexError("Rows %d to %d out of bounds."%(start, stop))
+        if buf.shape[0] < <Py_ssize_t>(stop-start)*n*width:
+            raise ValueError("Buffer of size %d is too small."%buf.shape[0])
+        if start == stop or n == 0:
+            return
+
+        cdef const unsigned char *p = &buf[0]
+        for i in range(start, stop):
+            for j in range(n):
+                count = _read_int64(<char*>p)
+                # count comes from untrusted input, avoid overflowing -count for INT64_MIN
+                if count < 0:
+                    size = <uint64_t>(-(count + 1)) + 1
+                else:
+                    size = <uint64_t>count
+                if size > <uint64_t>limbs:
+                    raise ValueError("Entry (%d, %d) is corrupted."%(i, j))
+                if count == 0:
+                    mpz_set_ui(self._core[0][i][j].get_data(), 0)
+                else:
+                    mpz_import(self._core[0][i][j].get_data(), size, -1, 8, -1, 0, <void*>(p + 8))
+                    if count < 0:
+                        mpz_neg(self._core[0][i][j].get_data(), self._core[0][i][j].get_data())
+                p += width
 
     @classmethod
-    def from_file(cls, filename):
+    def from_file(cls, filename, int chunk_size=2**20):
         """Construct new matrix from file.
 
-        :param filename: name of file to read from
+        The file is expected to be in fplll's format, i.e. ``[[1 2 3]\n[4 5 6]\n]``, but any text
+        where rows are enclosed in square brackets is accepted, e.g. the output of ``str()``.  The
+        file is read in chunks of ``chunk_size`` bytes and entries are parsed directly into the
+        matrix, so memory consumption is bounded by the size of the matrix.
+
+        :param filename: name of file to read from or a file object opened in binary mode
+        :param chunk_size: number of bytes to read at once
+
+        >>> import tempfile, os
+        >>> A = IntegerMatrix.random(10, "qary", k=5, bits=100)
+        >>> fn = tempfile.mktemp()
+        >>> A.to_file(fn)
+        >>> IntegerMatrix.from_file(fn) == A
+        True
+        >>> os.unlink(fn)
 
         """
-        A = cls(0, 0)
-        with open(filename, 'r') as fh:
-            for i, line in enumerate(fh.readlines()):
-                line = re.match("\[+([^\]]+) *\]", line)
-                if line is None:
+        if hasattr(filename, "read"):
+            return cls._from_stream(filename, chunk_size)
+        with open(filename, 'rb') as fh:
+            return cls._from_stream(fh, chunk_size)
+
+    @classmethod
+    def _from_stream(cls, fh, int chunk_size):
+        cdef IntegerMatrix A = cls(0, 0)
+        cdef Matrix[Z_NR[mpz_t]] *core = <Matrix[Z_NR[mpz_t]]*>A._core
+        cdef vector[Z_NR[mpz_t]] row
+        cdef Z_NR[mpz_t] tmp
+        cdef string token
+        cdef bytes chunk, t
+        cdef const char *p
+        cdef const char *s
+        cdef Py_ssize_t k, size
+        cdef char c
+        cdef int i, j
+        cdef int nrows = 0, ncols = -1, capacity = 0
+        cdef int depth = 0
+
+        while True:
+            chunk = fh.read(chunk_size)
+            if not chunk:
+                break
+            p = chunk
+            size = len(chunk)
+            for k in range(size):
+                c = p[k]
+
+                if (c >= b'0' and c <= b'9') or c == b'-' or c == b'+':
+                    token.push_back(c)
                     continue
-                line = line.groups()[0]
-                line = line.strip()
-                line = [e for e in line.split(" ") if e != '']
-                values = map(int, line)
-                (<IntegerMatrix>A)._core.set_rows(i+1)
-                (<IntegerMatrix>A)._core.set_cols(len(values))
-                for j, v in enumerate(values):
-                    A[i, j] = v
+
+                if token.size():
+                    # a sign is only accepted as the first character, GMP does not accept '+'
+                    s = token.c_str()
+                    if s[0] == b'+' and s[1] != b'-':
+                        s += 1
+                    if mpz_set_str(tmp.get_data(), <char*>s, 10) != 0:
+                        t = token
+                        raise ValueError("Cannot parse '%s' as an integer."%t.decode("ascii"))
+                    row.push_back(tmp)
+                    token.clear()
+
+                if c == b'[':
+                    # rows are either nested in an outer pair of brackets or not
+                    if row.size() or depth == 2:
+                        raise ValueError("Unexpected '[' in row %d."%nrows)
+                    depth += 1
+                elif c == b']':
+                    if depth == 0:
+                        raise ValueError("Unexpected ']' after row %d."%nrows)
+                    depth -= 1
+                    if row.size() == 0:
+                        continue
+                    if ncols == -1:
+                        ncols = row.size()
+                    elif <int>row.size() != ncols:
+                        raise ValueError("Row %d has %d entries but expected %d."%(nrows, row.size(), ncols))
+                    if nrows == capacity:
+                        capacity = max(16, 2*capacity)
+                        core.resize(capacity, ncols)
+                    for j in range(ncols):
+                        A._core[0][nrows][j].swap(row[j])
+                    nrows += 1
+                    row.clear()
+                elif c in b' \t\r\n,':
+                    pass
+                else:
+                    raise ValueError("Unexpected character %r."%chr(<unsigned char>c))
+
+        if token.size() or row.size() or depth:
+            raise ValueError("Unexpected end of file.")
+
+        core.resize(nrows, max(ncols, 0))
         return A
 
+    def to_file(self, filename):
+        """Write this matrix to a file in fplll's format.
+
+        The matrix is written row by row, i.e. without building the string representation of the
+        whole matrix in memory.
+
+        :param filename: name of file to write to or a file object opened in text mode
+
+        """
+        if hasattr(filename, "write"):
+            return self._to_stream(filename)
+        with open(filename, 'w') as fh:
+            return self._to_stream(fh)
+
+    def _to_stream(self, fh):
+        cdef int i, j
+        cdef int m = self._core.get_rows()
+        cdef int n = self._core.get_cols()
+        fh.write("[")
+        for i in range(m):
+            fh.write("[")
+            fh.write(" ".join([str(mpz_get_python(self._core[0][i][j].get_data())) for j in range(n)]))
+            fh.write("]\n")
+        fh.write("]\n")
+
 
 def unpickle_IntegerMatrix(nrows, ncols, l):
     """Deserialize an integer matrix.
 
     :param nrows: number of rows
     :param ncols: number of columns
-    :param l: list of entries
+    :param l: output of ``IntegerMatrix.to_bytes`` or, for pickles of older versions, list of entries
 
     """
+    if isinstance(l, bytes):
+        return IntegerMatrix.from_bytes(l)
     return IntegerMatrix.from_iterable(nrows, ncols, l)
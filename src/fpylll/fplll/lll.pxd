@@ -11,3 +11,4 @@ cdef class LLLReduction:
     cdef readonly MatGSO M
     cdef double _delta
     cdef double _eta
+    cdef int _flags
@@ -4,7 +4,7 @@ include "fpylll/config.pxi"
 
 from cysignals.signals cimport sig_on, sig_off
 
-from fpylll.gmp.mpz cimport mpz_t
+from fpylll.gmp.mpz cimport mpz_t, mpz_get_si, mpz_set_si
 from fpylll.mpfr.mpfr cimport mpfr_t
 from integer_matrix cimport IntegerMatrix
 
@@ -18,9 +18,9 @@ from fplll cimport LM_WRAPPER, LM_PROVED, LM_HEURISTIC, LM_FAST
 from fplll cimport FT_DEFAULT, FT_DOUBLE, FT_LONG_DOUBLE, FT_DD, FT_QD
 
 from fplll cimport dpe_t
-from fplll cimport Z_NR, FP_NR
+from fplll cimport Z_NR, FP_NR, ZZ_mat
 from fplll cimport lll_reduction as lll_reduction_c
-from fplll cimport RED_SUCCESS
+from fplll cimport RED_SUCCESS, RED_LLL_FAILURE
 from fplll cimport MatGSO as MatGSO_c
 from fplll cimport LLLReduction as LLLReduction_c
 from fplll cimport get_red_status_str
@@ -28,7 +28,7 @@ from fplll cimport is_lll_reduced
 from fplll cimport FloatType
 
 from fpylll.util cimport check_float_type, check_delta, check_eta, check_precision
-from fpylll.util import ReductionError
+from fpylll.util import ReductionError, auto_float_types
 from decl cimport gso_mpz_d, gso_mpz_ld, gso_mpz_dpe, gso_mpz_mpfr
 
 IF HAVE_QD:
@@ -120,6 +120,7 @@ cdef class LLLReduction:
 
         self._delta = delta
         self._eta = eta
+        self._flags = flags
 
     def __dealloc__(self):
         if self._type == gso_mpz_d:
@@ -139,9 +140,21 @@ cdef class LLLReduction:
 
     def __reduce__(self):
         """
-        Make sure attempts at pickling raise an error until proper pickling is implemented.
+        Serialize this LLL object together with its GSO object.
+
+        >>> import pickle
+        >>> from fpylll import IntegerMatrix, GSO, LLL
+        >>> A = IntegerMatrix.random(20, "qary", k=10, bits=20)
+        >>> L = LLL.Reduction(GSO.Mat(A), delta=0.9)
+        >>> L_ = pickle.loads(pickle.dumps(L))
+        >>> L_.delta == 0.9, L_.M.B == A
+        (True, True)
+        >>> L(); L_()
+        >>> L_.M.B == A
+        True
+
         """
-        raise NotImplementedError
+        return unpickle_LLLReduction, (self.M, self._delta, self._eta, self._flags)
 
     def __call__(self, int kappa_min=0, int kappa_start=0, int kappa_end=-1, int size_reduction_start=0):
         """LLL reduction.
@@ -159,45 +172,52 @@ cdef class LLLReduction:
             kappa_end = self.M.d
 
         cdef int r
-        if self._type == gso_mpz_d:
-            sig_on()
-            self._core.mpz_d.lll(kappa_min, kappa_start, kappa_end, size_reduction_start)
-            r = self._core.mpz_d.status
-            sig_off()
-        elif self._type == gso_mpz_ld:
-            IF HAVE_LONG_DOUBLE:
-                sig_on()
-                self._core.mpz_ld.lll(kappa_min, kappa_start, kappa_end, size_reduction_start)
-                r = self._core.mpz_ld.status
-                sig_off()
-            ELSE:
-                raise RuntimeError("LLLReduction object '%s' has no core."%self)
-        elif self._type == gso_mpz_dpe:
-            sig_on()
-            self._core.mpz_dpe.lll(kappa_min, kappa_start, kappa_end, size_reduction_start)
-            r = self._core.mpz_dpe.status
-            sig_off()
-        elif self._type == gso_mpz_mpfr:
-            sig_on()
-            self._core.mpz_mpfr.lll(kappa_min, kappa_start, kappa_end, size_reduction_start)
-            r = self._core.mpz_mpfr.status
-            sig_off()
-        else:
-            IF HAVE_QD:
-                if self._type == gso_mpz_dd:
+        with self.M._lock:
+            if self._type == gso_mpz_d:
+                with nogil:
                     sig_on()
-                    self._core.mpz_dd.lll(kappa_min, kappa_start, kappa_end, size_reduction_start)
-                    r = self._core.mpz_dd.status
+                    self._core.mpz_d.lll(kappa_min, kappa_start, kappa_end, size_reduction_start)
+                    r = self._core.mpz_d.status
                     sig_off()
-                elif self._type == gso_mpz_qd:
+            elif self._type == gso_mpz_ld:
+                IF HAVE_LONG_DOUBLE:
+                    with nogil:
+                        sig_on()
+                        self._core.mpz_ld.lll(kappa_min, kappa_start, kappa_end, size_reduction_start)
+                        r = self._core.mpz_ld.status
+                        sig_off()
+                ELSE:
+                    raise RuntimeError("LLLReduction object '%s' has no core."%self)
+            elif self._type == gso_mpz_dpe:
+                with nogil:
                     sig_on()
-                    self._core.mpz_qd.lll(kappa_min, kappa_start, kappa_end, size_reduction_start)
-                    r = self._core.mpz_qd.status
+                    self._core.mpz_dpe.lll(kappa_min, kappa_start, kappa_end, size_reduction_start)
+                    r = self._core.mpz_dpe.status
                     sig_off()
-                else:
+            elif self._type == gso_mpz_mpfr:
+                with nogil:
+                    sig_on()
+                    self._core.mpz_mpfr.lll(kappa_min, kappa_start, kappa_end, size_reduction_start)
+                    r = self._core.mpz_mpfr.status
+                    sig_off()
+            else:
+                IF HAVE_QD:
+                    if self._type == gso_mpz_dd:
+                        with nogil:
+                            sig_on()
+                            self._core.mpz_dd.lll(kappa_min, kappa_start, kappa_end, size_reduction_start)
+                            r = self._core.mpz_dd.status
+                            sig_off()
+                    elif self._type == gso_mpz_qd:
+                        with nogil:
+                            sig_on()
+                            self._core.mpz_qd.lll(kappa_min, kappa_start, kappa_end, size_reduction_start)
+                            r = self._core.mpz_qd.status
+                            sig_off()
+                    else:
+                        raise RuntimeError("LLLReduction object '%s' has no core."%self)
+                ELSE:
                     raise RuntimeError("LLLReduction object '%s' has no core."%self)
-            ELSE:
-                raise RuntimeError("LLLReduction object '%s' has no core."%self)
 
         if r:
             raise ReductionError( str(get_red_status_str(r)) )
@@ -346,10 +366,51 @@ cdef class LLLReduction:
         return self._eta
 
 
+def unpickle_LLLReduction(M, delta, eta, flags):
+    """
+    Deserialize an LLL object.
+    """
+    return LLLReduction(M, delta, eta, flags)
+
+
+# bases with entries of at most this many bits (minus log2 of the number of columns) are reduced
+# with machine-word integers, which leaves plenty of room for growth during the reduction
+LONG_AUTO_MAX_EXP = 30
+
+
+cdef int _lll_reduction_long(IntegerMatrix B, double delta, double eta, LLLMethod method,
+                             FloatType float_type, int precision, int flags) except -1:
+    """
+    Run LLL on a copy of ``B`` with machine-word entries and copy the result back on success.
+
+    ``Z_NR<long>`` wraps around silently and a wrapped entry cannot be told apart from a correct
+    one afterwards, so callers must make sure that ``B`` satisfies :data:`LONG_AUTO_MAX_EXP`.
+    """
+    cdef int i, j, r
+    cdef int m = B.nrows
+    cdef int n = B.ncols
+    cdef ZZ_mat[long] *A = new ZZ_mat[long](m, n)
+    try:
+        for i in range(m):
+            for j in range(n):
+                A[0](i, j).set(mpz_get_si(B._core[0][i][j].get_data()))
+        with nogil:
+            sig_on()
+            r = lll_reduction_c(A[0], delta, eta, method, float_type, precision, flags)
+            sig_off()
+        if r == RED_SUCCESS:
+            for i in range(m):
+                for j in range(n):
+                    mpz_set_si(B._core[0][i][j].get_data(), A[0](i, j).get_data())
+        return r
+    finally:
+        del A
+
+
 def lll_reduction(IntegerMatrix B, U=None,
                   double delta=LLL_DEF_DELTA, double eta=LLL_DEF_ETA,
                   method=None, float_type=None,
-                  int precision=0, int flags=LLL_DEFAULT):
+                  int precision=0, int flags=LLL_DEFAULT, int_type="mpz"):
     u"""Run LLL reduction.
 
     :param IntegerMatrix B: Integer matrix, modified in place.
@@ -357,17 +418,61 @@ def lll_reduction(IntegerMatrix B, U=None,
     :param double delta: LLL parameter `0.25 < δ ≤ 1`
     :param double eta:  LLL parameter `0 ≤ η < √δ`
     :param method: one of ``'wrapper'``, ``'proved'``, ``'heuristic'``, ``'fast'`` or ``None``.
-    :param float_type: an element of `fpylll.float_types` or ``None``
+    :param float_type: an element of `fpylll.float_types`, ``None`` or ``'auto'``
     :param precision: bit precision to use if ``float_tpe`` is ``'mpfr'``
     :param int flags: LLL flags.
+    :param int_type: ``'mpz'``, ``'long'`` or ``'auto'``, see below
 
     :returns: modified matrix ``B``
+
+    With ``int_type='long'`` or ``'auto'`` the reduction runs on a copy of ``B`` with machine-word
+    entries, which avoids GMP arithmetic.  The wrapper method is replaced by the fast method with
+    doubles in this case.  Machine words wrap around silently and overflows are not detected, so
+    they are only used if ``U`` is ``None``, ``long`` has 64 bits and entries have at most
+    :data:`LONG_AUTO_MAX_EXP` bits minus ``log2`` of the number of columns.  This bound is a
+    heuristic which leaves room for the growth of entries during the reduction, not a guarantee.
+    With ``'long'`` a ``ValueError`` is raised if these conditions are not met and a
+    ``ReductionError`` if the reduction fails.  With ``'auto'`` the original basis is reduced with
+    GMP integers instead.  Only this function supports machine words: ``IntegerMatrix`` and the
+    GSO, LLL, BKZ and enumeration objects built on it always use GMP integers::
+
+        >>> from fpylll import IntegerMatrix, LLL
+        >>> A = IntegerMatrix.random(60, "qary", k=30, bits=20)
+        >>> B = LLL.reduction(IntegerMatrix(A), int_type="auto")
+        >>> LLL.is_reduced(B)
+        True
+
+    With ``float_type='auto'`` the cheapest floating-point type expected to be sufficient is tried
+    first.  If reduction fails, the next more precise type given by
+    :func:`fpylll.util.auto_float_types` continues from the partially reduced basis.  The method
+    defaults to ``'heuristic'`` in this case::
+
+        >>> from fpylll import IntegerMatrix, LLL
+        >>> A = IntegerMatrix.random(60, "qary", k=30, bits=30)
+        >>> LLL.reduction(A, float_type="auto") # doctest: +ELLIPSIS
+        <IntegerMatrix(60, 60) at 0x...>
+        >>> LLL.is_reduced(A)
+        True
+
     """
 
     check_delta(delta)
     check_eta(eta)
     check_precision(precision)
 
+    if float_type == "auto":
+        if method is None or method == "wrapper":
+            method = "heuristic"
+        float_types = auto_float_types(B.nrows, B.get_max_exp(), precision, fast=method == "fast")
+        if not float_types:
+            raise ValueError("No floating-point type supported by method '%s' is sufficient."%method)
+        for i, (float_type, precision) in enumerate(float_types):
+            try:
+                return lll_reduction(B, U, delta, eta, method, float_type, precision, flags, int_type)
+            except ReductionError:
+                if i == len(float_types) - 1:
+                    raise
+
     cdef LLLMethod method_
     if method == "wrapper" or method is None:
         method_ = LM_WRAPPER
@@ -393,19 +498,48 @@ def lll_reduction(IntegerMatrix B, U=None,
 
     cdef int r
     cdef FloatType ft = check_float_type(float_type)
+    cdef IntegerMatrix U_
+
+    if int_type not in ("mpz", "long", "auto"):
+        raise ValueError("Integer type '%s' unknown."%int_type)
+
+    cdef int max_exp = B.get_max_exp()
+    cdef int log_cols = 0
+    while (1 << log_cols) < B.ncols:
+        log_cols += 1
+
+    # Z_NR<long> does not detect overflows, so only use it where entries and their products are far
+    # from the size of a machine word
+    cdef bint use_long = U is None and sizeof(long) >= 8 and max_exp + log_cols <= LONG_AUTO_MAX_EXP
+    if int_type == "long" and not use_long:
+        raise ValueError("Integer type 'long' requires U=None and entries of at most %d bits but "
+                         "got %d bits."%(LONG_AUTO_MAX_EXP - log_cols, max_exp))
+
+    if int_type != "mpz" and use_long:
+        if method_ == LM_WRAPPER:
+            r = _lll_reduction_long(B, delta, eta, LM_FAST, FT_DOUBLE, precision, flags)
+        else:
+            r = _lll_reduction_long(B, delta, eta, method_, ft, precision, flags)
+        if r == RED_SUCCESS:
+            return B
+        if int_type == "long":
+            raise ReductionError( str(get_red_status_str(r)) )
 
     if U is not None and isinstance(U, IntegerMatrix):
-        sig_on()
-        r = lll_reduction_c(B._core[0], (<IntegerMatrix>U)._core[0],
-                            delta, eta, method_, ft, precision, flags)
-        sig_off()
+        U_ = U
+        with nogil:
+            sig_on()
+            r = lll_reduction_c(B._core[0], U_._core[0],
+                                delta, eta, method_, ft, precision, flags)
+            sig_off()
 
     else:
-        sig_on()
-        r = lll_reduction_c(B._core[0],
-                            delta, eta, method_,
-                            ft, precision, flags)
-        sig_off()
+        with nogil:
+            sig_on()
+            r = lll_reduction_c(B._core[0],
+                                delta, eta, method_,
+                                ft, precision, flags)
+            sig_off()
 
     if r:
         raise ReductionError( str(get_red_status_str(r)) )
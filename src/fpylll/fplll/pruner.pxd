@@ -6,3 +6,4 @@ from decl cimport pruner_core_t, fplll_nr_type_t
 cdef class Pruner:
     cdef fplll_nr_type_t _type
     cdef pruner_core_t _core
+    cdef object _lock
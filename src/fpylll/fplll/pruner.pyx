@@ -23,6 +23,7 @@ include "fpylll/config.pxi"
 
 from libcpp cimport bool
 from libcpp.vector cimport vector
+import threading
 from math import log, exp
 from cysignals.signals cimport sig_on, sig_off
 
@@ -33,6 +34,7 @@ from fplll cimport FT_DOUBLE, FT_DPE, FT_MPFR, FloatType
 from fplll cimport PRUNER_METHOD_GRADIENT, PRUNER_METHOD_NM, PRUNER_METHOD_HYBRID, PRUNER_METHOD_GREEDY
 from fplll cimport PRUNER_METRIC_PROBABILITY_OF_SHORTEST, PRUNER_METRIC_EXPECTED_SOLUTIONS
 from fplll cimport FP_NR, Z_NR
+from fplll cimport PrunerMethod, PrunerMetric
 from fplll cimport MatGSO as MatGSO_c
 from fplll cimport prune as prune_c
 from fplll cimport Pruning as Pruning_c
@@ -56,6 +58,11 @@ from bkz_param cimport Pruning
 from gso cimport MatGSO
 
 cdef class Pruner:
+    GRADIENT = PRUNER_METHOD_GRADIENT
+    NM = PRUNER_METHOD_NM
+    HYBRID = PRUNER_METHOD_HYBRID
+    GREEDY = PRUNER_METHOD_GREEDY
+
     def __init__(self, double enumeration_radius, double preproc_cost, double target,
                  method="gradient", metric="probability", size_t n=0, size_t d=0,
                  float_type="double"):
@@ -64,7 +71,7 @@ cdef class Pruner:
         :param enumeration_radius: target squared enumeration radius
         :param preproc_cost:       cost of preprocessing
         :param target:             overall targeted success probability or number of solutions
-        :param method:             one of "gradient", "nm", "greedy" or "hybrid"
+        :param method:             one of "gradient", "nm", "greedy" or "hybrid" or a ``Pruner`` constant
         :param metric:             "probability" or "solutions"
         :param n:                  dimension
         :param d:                  dimension/2
@@ -89,6 +96,9 @@ cdef class Pruner:
         cdef fp_nr_t preproc_cost_
         cdef fp_nr_t target_
 
+        # serialises access to the C++ object from threads, since long running calls release the GIL
+        self._lock = threading.RLock()
+
         if preproc_cost < 1:
             raise ValueError("Preprocessing cost must be at least 1 but got %f"%preproc_cost)
         if metric == PRUNER_METRIC_PROBABILITY_OF_SHORTEST:
@@ -333,44 +343,52 @@ cdef class Pruner:
         """
         cdef vector[double] pr_
         cdef bool called = False
+        cdef bool reset_ = reset
 
         d = len(pr)
         for e in pr:
             pr_.push_back(e)
 
         # TODO: don't just return doubles
-        if self._type == nr_d:
-            sig_on()
-            self._core.d.optimize_coefficients(pr_, reset)
-            called = True
-            sig_off()
-        IF HAVE_LONG_DOUBLE:
-            if self._type == nr_ld:
-                sig_on()
-                self._core.ld.optimize_coefficients(pr_, reset)
-                called = True
-                sig_off()
-        if self._type == nr_dpe:
-            sig_on()
-            self._core.dpe.optimize_coefficients(pr_, reset)
-            called = True
-            sig_off()
-        IF HAVE_QD:
-            if self._type == nr_dd:
-                sig_on()
-                self._core.dd.optimize_coefficients(pr_, reset)
-                called = True
-                sig_off()
-            elif self._type == nr_qd:
-                sig_on()
-                self._core.qd.optimize_coefficients(pr_, reset)
-                called = True
-                sig_off()
-        if self._type == nr_mpfr:
-            sig_on()
-            self._core.mpfr.optimize_coefficients(pr_,  reset)
-            called = True
-            sig_off()
+        with self._lock:
+            if self._type == nr_d:
+                with nogil:
+                    sig_on()
+                    self._core.d.optimize_coefficients(pr_, reset_)
+                    called = True
+                    sig_off()
+            IF HAVE_LONG_DOUBLE:
+                if self._type == nr_ld:
+                    with nogil:
+                        sig_on()
+                        self._core.ld.optimize_coefficients(pr_, reset_)
+                        called = True
+                        sig_off()
+            if self._type == nr_dpe:
+                with nogil:
+                    sig_on()
+                    self._core.dpe.optimize_coefficients(pr_, reset_)
+                    called = True
+                    sig_off()
+            IF HAVE_QD:
+                if self._type == nr_dd:
+                    with nogil:
+                        sig_on()
+                        self._core.dd.optimize_coefficients(pr_, reset_)
+                        called = True
+                        sig_off()
+                elif self._type == nr_qd:
+                    with nogil:
+                        sig_on()
+                        self._core.qd.optimize_coefficients(pr_, reset_)
+                        called = True
+                        sig_off()
+            if self._type == nr_mpfr:
+                with nogil:
+                    sig_on()
+                    self._core.mpfr.optimize_coefficients(pr_, reset_)
+                    called = True
+                    sig_off()
 
         if not called:
              raise RuntimeError("Pruner object '%s' has no core."%self)
@@ -404,7 +422,7 @@ cdef class Pruner:
         cdef vector[double] pr_
         cdef vector[double] detailed_cost_
         cdef bool called = False
-        cost = 0.0
+        cdef double cost = 0.0
 
         d = len(pr)
         for e in pr:
@@ -412,38 +430,45 @@ cdef class Pruner:
             detailed_cost_.push_back(0.0)
 
         # TODO: don't just return doubles
-        if self._type == nr_d:
-            sig_on()
-            cost = self._core.d.single_enum_cost(pr_, &detailed_cost_)
-            called = True
-            sig_off()
-        IF HAVE_LONG_DOUBLE:
-            if self._type == nr_ld:
-                sig_on()
-                cost = self._core.ld.single_enum_cost(pr_, &detailed_cost_)
-                called = True
-                sig_off()
-        if self._type == nr_dpe:
-            sig_on()
-            cost = self._core.dpe.single_enum_cost(pr_, &detailed_cost_)
-            called = True
-            sig_off()
-        IF HAVE_QD:
-            if self._type == nr_dd:
-                sig_on()
-                cost = self._core.dd.single_enum_cost(pr_, &detailed_cost_)
-                called = True
-                sig_off()
-            elif self._type == nr_qd:
-                sig_on()
-                cost = self._core.qd.single_enum_cost(pr_, &detailed_cost_)
-                called = True
-                sig_off()
-        if self._type == nr_mpfr:
-            sig_on()
-            cost = self._core.mpfr.single_enum_cost(pr_, &detailed_cost_)
-            called = True
-            sig_off()
+        with self._lock:
+            if self._type == nr_d:
+                with nogil:
+                    sig_on()
+                    cost = self._core.d.single_enum_cost(pr_, &detailed_cost_)
+                    called = True
+                    sig_off()
+            IF HAVE_LONG_DOUBLE:
+                if self._type == nr_ld:
+                    with nogil:
+                        sig_on()
+                        cost = self._core.ld.single_enum_cost(pr_, &detailed_cost_)
+                        called = True
+                        sig_off()
+            if self._type == nr_dpe:
+                with nogil:
+                    sig_on()
+                    cost = self._core.dpe.single_enum_cost(pr_, &detailed_cost_)
+                    called = True
+                    sig_off()
+            IF HAVE_QD:
+                if self._type == nr_dd:
+                    with nogil:
+                        sig_on()
+                        cost = self._core.dd.single_enum_cost(pr_, &detailed_cost_)
+                        called = True
+                        sig_off()
+                elif self._type == nr_qd:
+                    with nogil:
+                        sig_on()
+                        cost = self._core.qd.single_enum_cost(pr_, &detailed_cost_)
+                        called = True
+                        sig_off()
+            if self._type == nr_mpfr:
+                with nogil:
+                    sig_on()
+                    cost = self._core.mpfr.single_enum_cost(pr_, &detailed_cost_)
+                    called = True
+                    sig_off()
 
         if not called:
              raise RuntimeError("Pruner object '%s' has no core."%self)
@@ -476,44 +501,51 @@ cdef class Pruner:
         """
         cdef vector[double] pr_
         cdef bool called = False
-        cost = 0.0
+        cdef double cost = 0.0
 
         for e in pr:
             pr_.push_back(e)
 
         # TODO: don't just return doubles
-        if self._type == nr_d:
-            sig_on()
-            cost = self._core.d.repeated_enum_cost(pr_)
-            called = True
-            sig_off()
-        IF HAVE_LONG_DOUBLE:
-            if self._type == nr_ld:
-                sig_on()
-                cost = self._core.ld.repeated_enum_cost(pr_)
-                called = True
-                sig_off()
-        if self._type == nr_dpe:
-            sig_on()
-            cost = self._core.dpe.repeated_enum_cost(pr_)
-            called = True
-            sig_off()
-        IF HAVE_QD:
-            if self._type == nr_dd:
-                sig_on()
-                cost = self._core.dd.repeated_enum_cost(pr_)
-                called = True
-                sig_off()
-            elif self._type == nr_qd:
-                sig_on()
-                cost = self._core.qd.repeated_enum_cost(pr_)
-                called = True
-                sig_off()
-        if self._type == nr_mpfr:
-            sig_on()
-            cost = self._core.mpfr.repeated_enum_cost(pr_,)
-            called = True
-            sig_off()
+        with self._lock:
+            if self._type == nr_d:
+                with nogil:
+                    sig_on()
+                    cost = self._core.d.repeated_enum_cost(pr_)
+                    called = True
+                    sig_off()
+            IF HAVE_LONG_DOUBLE:
+                if self._type == nr_ld:
+                    with nogil:
+                        sig_on()
+                        cost = self._core.ld.repeated_enum_cost(pr_)
+                        called = True
+                        sig_off()
+            if self._type == nr_dpe:
+                with nogil:
+                    sig_on()
+                    cost = self._core.dpe.repeated_enum_cost(pr_)
+                    called = True
+                    sig_off()
+            IF HAVE_QD:
+                if self._type == nr_dd:
+                    with nogil:
+                        sig_on()
+                        cost = self._core.dd.repeated_enum_cost(pr_)
+                        called = True
+                        sig_off()
+                elif self._type == nr_qd:
+                    with nogil:
+                        sig_on()
+                        cost = self._core.qd.repeated_enum_cost(pr_)
+                        called = True
+                        sig_off()
+            if self._type == nr_mpfr:
+                with nogil:
+                    sig_on()
+                    cost = self._core.mpfr.repeated_enum_cost(pr_,)
+                    called = True
+                    sig_off()
 
         if not called:
              raise RuntimeError("Pruner object '%s' has no core."%self)
@@ -539,44 +571,51 @@ cdef class Pruner:
         """
         cdef vector[double] pr_
         cdef bool called = False
-        r = 0.0
+        cdef double r = 0.0
 
         for e in pr:
             pr_.push_back(e)
 
         # TODO: don't just return doubles
-        if self._type == nr_d:
-            sig_on()
-            r = self._core.d.measure_metric(pr_)
-            called = True
-            sig_off()
-        IF HAVE_LONG_DOUBLE:
-            if self._type == nr_ld:
-                sig_on()
-                r = self._core.ld.measure_metric(pr_)
-                called = True
-                sig_off()
-        if self._type == nr_dpe:
-            sig_on()
-            r = self._core.dpe.measure_metric(pr_)
-            called = True
-            sig_off()
-        IF HAVE_QD:
-            if self._type == nr_dd:
-                sig_on()
-                r = self._core.dd.measure_metric(pr_)
-                called = True
-                sig_off()
-            elif self._type == nr_qd:
-                sig_on()
-                r = self._core.qd.measure_metric(pr_)
-                called = True
-                sig_off()
-        if self._type == nr_mpfr:
-            sig_on()
-            r = self._core.mpfr.measure_metric(pr_,)
-            called = True
-            sig_off()
+        with self._lock:
+            if self._type == nr_d:
+                with nogil:
+                    sig_on()
+                    r = self._core.d.measure_metric(pr_)
+                    called = True
+                    sig_off()
+            IF HAVE_LONG_DOUBLE:
+                if self._type == nr_ld:
+                    with nogil:
+                        sig_on()
+                        r = self._core.ld.measure_metric(pr_)
+                        called = True
+                        sig_off()
+            if self._type == nr_dpe:
+                with nogil:
+                    sig_on()
+                    r = self._core.dpe.measure_metric(pr_)
+                    called = True
+                    sig_off()
+            IF HAVE_QD:
+                if self._type == nr_dd:
+                    with nogil:
+                        sig_on()
+                        r = self._core.dd.measure_metric(pr_)
+                        called = True
+                        sig_off()
+                elif self._type == nr_qd:
+                    with nogil:
+                        sig_on()
+                        r = self._core.qd.measure_metric(pr_)
+                        called = True
+                        sig_off()
+            if self._type == nr_mpfr:
+                with nogil:
+                    sig_on()
+                    r = self._core.mpfr.measure_metric(pr_,)
+                    called = True
+                    sig_off()
 
         if not called:
              raise RuntimeError("Pruner object '%s' has no core."%self)
@@ -592,7 +631,7 @@ def prune(double enumeration_radius, double preproc_cost, double target, M,
     :param preproc_cost:       cost of preprocessing
     :param target:             overall targeted success probability or number of solutions
     :param M:                  list (of lists) with r coefficients
-    :param descent_method:     one of "gradient", "nm", "greedy" or "hybrid"
+    :param descent_method:     one of "gradient", "nm", "greedy" or "hybrid" or a ``Pruner`` constant
     :param metric:             "probability" or "solutions"
     :param float_type:         floating point type to use
 
@@ -655,52 +694,68 @@ def prune(double enumeration_radius, double preproc_cost, double target, M,
         for e in m:
             vec[i].push_back(e)
 
+    cdef Pruning pruning_ = pruning
+    cdef PrunerMethod descent_method_ = descent_method
+    cdef PrunerMetric metric_ = metric
+    cdef bool reset_ = reset
+
     if ft == FT_DOUBLE:
-        sig_on()
-        prune_c[FP_NR[double]]((<Pruning>pruning)._core, enumeration_radius, preproc_cost, target, vec, descent_method, metric, reset)
-        sig_off()
+        with nogil:
+            sig_on()
+            prune_c[FP_NR[double]](pruning_._core, enumeration_radius, preproc_cost, target, vec,
+                                   descent_method_, metric_, reset_)
+            sig_off()
         if descent_method == PRUNER_METHOD_GREEDY:
             return enumeration_radius, pruning
         return pruning
     IF HAVE_LONG_DOUBLE:
         if ft == FT_LONG_DOUBLE:
-            sig_on()
-            prune_c[FP_NR[longdouble]]((<Pruning>pruning)._core, enumeration_radius, preproc_cost, target, vec, descent_method, metric, reset)
-            sig_off()
+            with nogil:
+                sig_on()
+                prune_c[FP_NR[longdouble]](pruning_._core, enumeration_radius, preproc_cost, target, vec,
+                                           descent_method_, metric_, reset_)
+                sig_off()
             if descent_method == PRUNER_METHOD_GREEDY:
                 return enumeration_radius, pruning
             return pruning
     if ft == FT_DPE:
-        sig_on()
-        prune_c[FP_NR[dpe_t]]((<Pruning>pruning)._core, enumeration_radius, preproc_cost, target, vec, descent_method, metric, reset)
-        sig_off()
+        with nogil:
+            sig_on()
+            prune_c[FP_NR[dpe_t]](pruning_._core, enumeration_radius, preproc_cost, target, vec,
+                                  descent_method_, metric_, reset_)
+            sig_off()
         if descent_method == PRUNER_METHOD_GREEDY:
             return enumeration_radius, pruning
         return pruning
     if ft == FT_MPFR:
-        sig_on()
-        prune_c[FP_NR[mpfr_t]]((<Pruning>pruning)._core, enumeration_radius, preproc_cost, target, vec, descent_method, metric, reset)
-        sig_off()
+        with nogil:
+            sig_on()
+            prune_c[FP_NR[mpfr_t]](pruning_._core, enumeration_radius, preproc_cost, target, vec,
+                                   descent_method_, metric_, reset_)
+            sig_off()
         if descent_method == PRUNER_METHOD_GREEDY:
             return enumeration_radius, pruning
         return pruning
     IF HAVE_QD:
             if ft == FT_DD:
-                sig_on()
-                prune_c[FP_NR[dd_real]]((<Pruning>pruning)._core, enumeration_radius, preproc_cost, target, vec, descent_method, metric, reset)
-                sig_off()
+                with nogil:
+                    sig_on()
+                    prune_c[FP_NR[dd_real]](pruning_._core, enumeration_radius, preproc_cost, target, vec,
+                                            descent_method_, metric_, reset_)
+                    sig_off()
                 if descent_method == PRUNER_METHOD_GREEDY:
                     return enumeration_radius, pruning
                 return pruning
             if ft == FT_QD:
-                sig_on()
-                prune_c[FP_NR[qd_real]]((<Pruning>pruning)._core, enumeration_radius, preproc_cost, target, vec, descent_method, metric, reset)
-                sig_off()
+                with nogil:
+                    sig_on()
+                    prune_c[FP_NR[qd_real]](pruning_._core, enumeration_radius, preproc_cost, target, vec,
+                                            descent_method_, metric_, reset_)
+                    sig_off()
                 if descent_method == PRUNER_METHOD_GREEDY:
                     return enumeration_radius, pruning
                 return pruning
 
-
 def svp_probability(pr, float_type="double"):
     """Return probability of success for enumeration with given set of pruning parameters.
 
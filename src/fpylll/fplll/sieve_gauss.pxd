@@ -6,3 +6,4 @@ from fplll cimport GaussSieve as GaussSieve_c
 
 cdef class GaussSieve:
     cdef GaussSieve_c[mpz_t, FP_NR[double]]  *_core
+    cdef object _lock
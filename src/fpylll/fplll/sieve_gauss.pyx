@@ -19,6 +19,7 @@ True
 
 include "fpylll/config.pxi"
 
+import threading
 from random import randint
 from fplll cimport NumVect, Z_NR
 from fpylll.io cimport assign_Z_NR_mpz, mpz_get_python
@@ -41,6 +42,8 @@ cdef class GaussSieve:
             raise ValueError("Algorithm must be one of 2, 3 or 4, but received %d"%algorithm)
 
         self._core = new GaussSieve_c[mpz_t, FP_NR[double]](A._core[0], algorithm, verbose, seed)
+        # serialises access to the C++ object from threads, since sieving releases the GIL
+        self._lock = threading.RLock()
 
     def __dealloc__(self):
         """
@@ -59,13 +62,16 @@ cdef class GaussSieve:
         cdef Z_NR[mpz_t] target_norm_
         assign_Z_NR_mpz(target_norm_, target_norm)
 
-        sig_on()
-        self._core.sieve(target_norm_)
-        sig_off()
-
-        cdef NumVect[Z_NR[mpz_t]] r_ = self._core.return_first()
+        cdef NumVect[Z_NR[mpz_t]] r_
         cdef list r  = []
 
+        with self._lock:
+            with nogil:
+                sig_on()
+                self._core.sieve(target_norm_)
+                sig_off()
+            r_ = self._core.return_first()
+
         for i in range(r_.size()):
             r.append(mpz_get_python(r_[i].get_data()))
 
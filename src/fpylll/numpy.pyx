@@ -3,6 +3,7 @@ include "fpylll/config.pxi"
 
 
 from fpylll.fplll.gso cimport MatGSO
+from fpylll.fplll.integer_matrix cimport IntegerMatrix
 from fpylll.fplll.decl cimport gso_mpz_d, gso_mpz_ld, gso_mpz_dpe, gso_mpz_mpfr
 
 IF HAVE_QD:
@@ -25,6 +26,9 @@ def _dump_mu(ndarray[double, ndim=2, mode="c"] mu not None, MatGSO M, int kappa,
 
      :returns: Nothing
      """
+    if mu.shape[0] < block_size or mu.shape[1] != block_size:
+        raise ValueError("Array of shape %s cannot hold block of size %d."%((mu.shape[0], mu.shape[1]), block_size))
+
     if M._type == gso_mpz_d:
         return M._core.mpz_d.dump_mu_d(&mu[0,0], kappa, block_size)
     IF HAVE_LONG_DOUBLE:
@@ -42,19 +46,24 @@ def _dump_mu(ndarray[double, ndim=2, mode="c"] mu not None, MatGSO M, int kappa,
 
     raise RuntimeError("MatGSO object '%s' has no core."%M)
 
-def dump_mu(MatGSO m, int kappa, int block_size):
+def dump_mu(MatGSO m, int kappa=0, int block_size=-1, out=None):
     u"""
      Dump a block of the GSO matrix μ into a a numpy array.
 
      :param M: GSO object
      :param kappa: index of the beginning of the block
-     :param block_size: size of the considered block
+     :param block_size: size of the considered block, ``-1`` for all rows starting at ``kappa``
+     :param out: numpy array of shape ``(block_size, block_size)`` and type float64 to write to,
+         if ``None`` a new array is allocated
 
-     :returns: Nothing
+     :returns: ``out`` or a new array
      """
-    mu = ndarray(dtype='float64', shape=(block_size, block_size))
-    _dump_mu(mu, m, kappa, block_size)
-    return mu
+    if block_size == -1:
+        block_size = m.d - kappa
+    if out is None:
+        out = ndarray(dtype='float64', shape=(block_size, block_size))
+    _dump_mu(out, m, kappa, block_size)
+    return out
 
 def _dump_r(ndarray[double, ndim=1, mode="c"] r not None, MatGSO M, int kappa, int block_size):
     u"""
@@ -67,6 +76,8 @@ def _dump_r(ndarray[double, ndim=1, mode="c"] r not None, MatGSO M, int kappa, i
 
      :returns: Nothing
      """
+    if r.shape[0] < block_size:
+        raise ValueError("Array of shape %s cannot hold block of size %d."%((r.shape[0],), block_size))
 
     if M._type == gso_mpz_d:
         return M._core.mpz_d.dump_r_d(&r[0], kappa, block_size)
@@ -85,16 +96,127 @@ def _dump_r(ndarray[double, ndim=1, mode="c"] r not None, MatGSO M, int kappa, i
 
     raise RuntimeError("MatGSO object '%s' has no core."%M)
 
-def dump_r(MatGSO M, int kappa, int block_size):
+def dump_r(MatGSO M, int kappa=0, int block_size=-1, out=None):
     u"""
      Dump a block of the GSO vector r into a a numpy array.
 
      :param M: GSO object
      :param kappa: index of the beginning of the block
-     :param block_size: size of the considered block
+     :param block_size: size of the considered block, ``-1`` for all rows starting at ``kappa``
+     :param out: numpy array of shape ``(block_size,)`` and type float64 to write to, if ``None``
+         a new array is allocated
 
-     :returns: Nothing
+     :returns: ``out`` or a new array
+     """
+    if block_size == -1:
+        block_size = M.d - kappa
+    if out is None:
+        out = ndarray(dtype='float64', shape=block_size)
+    _dump_r(out, M, kappa, block_size)
+    return out
+
+def dump_B(M, out=None, dtype=None):
+    u"""
+     Dump the basis of a GSO object or an integer matrix into a numpy array.
+
+     :param M: GSO object or integer matrix
+     :param out: numpy array of shape ``(nrows, ncols)`` to write to or ``None``
+     :param dtype: ``numpy.int64``, ``object`` or ``None``, see ``IntegerMatrix.to_numpy``
+
+     :returns: ``out`` or a new array
+     """
+    if isinstance(M, MatGSO):
+        M = (<MatGSO>M).B
+    return (<IntegerMatrix?>M).to_numpy(out=out, dtype=dtype)
+
+def dump_U(MatGSO M, out=None, dtype=None):
+    u"""
+     Dump the transformation matrix of a GSO object into a numpy array.
+
+     :param M: GSO object
+     :param out: numpy array of shape ``(nrows, nrows)`` to write to or ``None``
+     :param dtype: ``numpy.int64``, ``object`` or ``None``, see ``IntegerMatrix.to_numpy``
+
+     :returns: ``out`` or a new array
+     """
+    return M.U.to_numpy(out=out, dtype=dtype)
+
+def dump_gso(MatGSO M, mu=None, r=None, B=None, U=None):
+    u"""
+     Dump μ, r, the basis and the transformation matrix of a GSO object in one call.
+
+     Pass the arrays returned by a previous call to reuse them::
+
+        >>> from fpylll import IntegerMatrix, GSO, LLL
+        >>> from fpylll.numpy import dump_gso
+        >>> A = IntegerMatrix.random(10, "qary", k=5, bits=10)
+        >>> M = GSO.Mat(A, U=IntegerMatrix.identity(10))
+        >>> _ = M.update_gso()
+        >>> mu, r, B, U = dump_gso(M)
+        >>> LLL.Reduction(M)()
+        >>> mu_, r_, B_, U_ = dump_gso(M, mu, r, B, U)
+        >>> mu_ is mu and r_ is r and B_ is B and U_ is U
+        True
+
+     :param M: GSO object
+     :param mu: numpy array of shape ``(d, d)`` and type float64 or ``None``
+     :param r: numpy array of shape ``(d,)`` and type float64 or ``None``
+     :param B: numpy array of shape ``(d, n)`` or ``None``
+     :param U: numpy array of shape ``(d, d)`` or ``None``
+
+     :returns: a tuple ``(mu, r, B, U)``, ``U`` is ``None`` if ``M`` has no transformation matrix
+
+     ..  note :: Like ``MatGSO.get_mu`` and ``MatGSO.get_r`` this function expects the GSO to be
+         up to date, i.e. call ``M.update_gso()`` first.
+     """
+    mu = dump_mu(M, 0, M.d, out=mu)
+    r = dump_r(M, 0, M.d, out=r)
+    B = dump_B(M, out=B)
+    if M.U.nrows:
+        U = dump_U(M, out=U)
+    else:
+        U = None
+    return mu, r, B, U
+
+def load_B(M, B):
+    u"""
+     Load a basis from a numpy array into a GSO object or an integer matrix.
+
+     If ``M`` is a GSO object all GSO coefficients are invalidated, i.e. ``M.update_gso()`` must be
+     called before they are accessed again.
+
+        >>> from fpylll import IntegerMatrix, GSO
+        >>> from fpylll.numpy import dump_B, load_B
+        >>> A = IntegerMatrix.random(10, "uniform", bits=10)
+        >>> M = GSO.Mat(A)
+        >>> B = dump_B(M)
+        >>> B[[0, 1]] = B[[1, 0]]
+        >>> load_B(M, B)
+        >>> _ = M.update_gso()
+        >>> A[0, 0] == B[0, 0] and abs(M.get_r(0, 0) - sum([x**2 for x in B[0]])) < 0.5
+        True
+
+     :param M: GSO object or integer matrix
+     :param B: numpy array of shape ``(nrows, ncols)``
+     """
+    if isinstance(M, MatGSO):
+        if M.int_gram_enabled:
+            raise ValueError("Loading a basis into a GSO object with integral Gram matrix is not supported.")
+        M.row_op_begin(0, M.d)
+        try:
+            M.B.set_numpy(B)
+        finally:
+            M.row_op_end(0, M.d)
+    else:
+        (<IntegerMatrix?>M).set_numpy(B)
+
+def load_U(MatGSO M, U):
+    u"""
+     Load the transformation matrix of a GSO object from a numpy array.
+
+     :param M: GSO object
+     :param U: numpy array of shape ``(nrows, nrows)``
      """
-    r = ndarray(dtype='float64', shape=block_size)
-    _dump_r(r, M, kappa, block_size)
-    return r
+    if not M.U.nrows:
+        raise ValueError("GSO object '%s' has no transformation matrix."%M)
+    M.U.set_numpy(U)
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+Memory-mapped on-disk storage for lattice bases which are too large to keep in memory.
+
+A basis store is a file holding a header followed by the rows of an integer matrix.  All entries
+use the same number of 64-bit limbs (see ``IntegerMatrix.export_rows``), so every row has the same
+size and row ranges can be read and written without touching the rest of the file.
+
+..  moduleauthor:: Martin R.  Albrecht <martinralbrecht+fpylll@googlemail.com>
+
+    >>> import tempfile, os
+    >>> from fpylll import IntegerMatrix, LLL
+    >>> from fpylll.tools.basis_store import BasisStore
+    >>> A = IntegerMatrix.random(40, "qary", k=20, bits=30)
+    >>> fn = os.path.join(tempfile.mkdtemp(), "basis.bin")
+    >>> with BasisStore.create(fn, A) as S:
+    ...     B = S.read_rows(0, 20)
+    ...     _ = LLL.reduction(B)
+    ...     S.write_rows(0, B)
+    >>> with BasisStore(fn) as S:
+    ...     S.read_rows(0, 20) == B
+    True
+
+"""
+
+from __future__ import absolute_import
+import mmap
+import os
+import struct
+
+from fpylll.fplll.integer_matrix import IntegerMatrix
+
+
+class BasisStore(object):
+    """
+    A memory-mapped, row-addressable integer matrix on disk.
+    """
+
+    magic = b"FPYLLMM1"
+    header = struct.Struct("<8sqqq")
+
+    def __init__(self, filename, readonly=False):
+        """Open an existing basis store.
+
+        :param filename: path of the file
+        :param readonly: if ``True`` the file is mapped read-only and writing raises an error
+
+        """
+        self.filename = filename
+        self.readonly = readonly
+        self._file = open(filename, "rb" if readonly else "r+b")
+        try:
+            header = self._file.read(self.header.size)
+            if len(header) != self.header.size:
+                raise ValueError("File '%s' is too short."%filename)
+            magic, self.nrows, self.ncols, self.limbs = self.header.unpack(header)
+            if magic != self.magic:
+                raise ValueError("File '%s' is not a basis store."%filename)
+            if self.nrows < 0 or self.ncols < 0 or self.limbs < 0:
+                raise ValueError("File '%s' has a corrupted header."%filename)
+            size = self.header.size + self.nrows * self.row_size
+            if os.fstat(self._file.fileno()).st_size < size:
+                raise ValueError("File '%s' is truncated."%filename)
+            if self.nrows * self.ncols:
+                access = mmap.ACCESS_READ if readonly else mmap.ACCESS_WRITE
+                self._map = mmap.mmap(self._file.fileno(), size, access=access)
+            else:
+                self._map = None
+        except Exception:
+            self._file.close()
+            raise
+
+    @classmethod
+    def create(cls, filename, A, limbs=None):
+        """Write ``A`` to a new basis store and open it.
+
+        :param filename: path of the file, overwritten if it exists
+        :param A: an ``IntegerMatrix``
+        :param limbs: number of 64-bit limbs per entry, by default just enough for the largest
+            entry of ``A``; pass a larger value if entries are expected to grow
+
+        """
+        need = (max(A.get_max_exp(), 0) + 63) // 64
+        if limbs is None:
+            limbs = need
+        elif limbs < need:
+            raise ValueError("Entries need %d limbs but only %d were requested."%(need, limbs))
+
+        S = cls.empty(filename, A.nrows, A.ncols, limbs)
+        S.write_rows(0, A)
+        return S
+
+    @classmethod
+    def empty(cls, filename, nrows, ncols, limbs):
+        """Create a new basis store filled with zeros and open it.
+
+        :param filename: path of the file, overwritten if it exists
+        :param nrows: number of rows
+        :param ncols: number of columns
+        :param limbs: number of 64-bit limbs per entry
+
+        """
+        if nrows < 0 or ncols < 0 or limbs < 0:
+            raise ValueError("Dimensions and number of limbs must be non-negative.")
+        with open(filename, "wb") as fh:
+            fh.write(cls.header.pack(cls.magic, nrows, ncols, limbs))
+            fh.truncate(cls.header.size + nrows * ncols * 8 * (limbs + 1))
+        return cls(filename)
+
+    @property
+    def row_size(self):
+        """
+        Number of bytes used by one row.
+        """
+        return self.ncols * 8 * (self.limbs + 1)
+
+    def _view(self, start, stop):
+        offset = self.header.size + start * self.row_size
+        return memoryview(self._map)[offset:offset + (stop - start) * self.row_size]
+
+    def _check_range(self, start, stop):
+        if self._file is None:
+            raise ValueError("Basis store '%s' is closed."%self.filename)
+        if start < 0 or start > stop or stop > self.nrows:
+            raise IndexError("Rows %d to %d out of bounds."%(start, stop))
+
+    def read_rows(self, start=0, stop=None):
+        """Return rows ``start`` to ``stop`` as a new ``IntegerMatrix``.
+
+        Only the requested rows are read from disk.
+
+        :param start: first row
+        :param stop: last row (exclusive), ``None`` for the number of rows
+
+        """
+        if stop is None:
+            stop = self.nrows
+        self._check_range(start, stop)
+        A = IntegerMatrix(stop - start, self.ncols)
+        if (stop - start) * self.ncols:
+            view = self._view(start, stop)
+            try:
+                A.import_rows(view, self.limbs)
+            finally:
+                view.release()
+        return A
+
+    def write_rows(self, start, A, flush=False):
+        """Overwrite rows ``start`` to ``start + A.nrows`` with the rows of ``A``.
+
+        Only the affected pages are written back to disk.
+
+        :param start: first row
+        :param A: an ``IntegerMatrix`` with ``ncols`` columns
+        :param flush: if ``True`` write the modified rows to disk before returning
+
+        """
+        if self.readonly:
+            raise ValueError("Basis store '%s' is read-only."%self.filename)
+        if A.ncols != self.ncols:
+            raise ValueError("Expected %d columns but got %d."%(self.ncols, A.ncols))
+        stop = start + A.nrows
+        self._check_range(start, stop)
+        if A.nrows * A.ncols == 0:
+            return
+        view = self._view(start, stop)
+        try:
+            A.export_rows(view, self.limbs)
+        finally:
+            view.release()
+        if flush:
+            self.flush(start, stop)
+
+    def flush(self, start=0, stop=None):
+        """Write rows ``start`` to ``stop`` back to disk.
+
+        :param start: first row
+        :param stop: last row (exclusive), ``None`` for the number of rows
+
+        """
+        if stop is None:
+            stop = self.nrows
+        self._check_range(start, stop)
+        if self._map is None or self.readonly or start == stop:
+            return
+        offset = self.header.size + start * self.row_size
+        # mmap.flush requires offsets aligned to the allocation granularity
+        aligned = offset - offset % mmap.ALLOCATIONGRANULARITY
+        self._map.flush(aligned, self.header.size + stop * self.row_size - aligned)
+
+    def to_matrix(self):
+        """
+        Return the full basis as an ``IntegerMatrix``.
+        """
+        return self.read_rows(0, self.nrows)
+
+    def __getitem__(self, key):
+        """Return row ``i`` as a tuple or entry ``(i, j)`` as an integer.
+
+        :param key: a row index or a pair of indices
+
+        """
+        if isinstance(key, tuple):
+            i, j = key
+            return self[i][j]
+        i = key
+        if i < 0:
+            i += self.nrows
+        A = self.read_rows(i, i + 1)
+        return tuple(A[0, j] for j in range(self.ncols))
+
+    def __setitem__(self, key, value):
+        """Set row ``i`` or entry ``(i, j)``.
+
+        :param key: a row index or a pair of indices
+        :param value: an iterable of integers or an integer
+
+        """
+        if isinstance(key, tuple):
+            i, j = key
+            if i < 0:
+                i += self.nrows
+            A = self.read_rows(i, i + 1)
+            A[0, j] = value
+        else:
+            i = key
+            if i < 0:
+                i += self.nrows
+            A = IntegerMatrix.from_matrix([value])
+        self.write_rows(i, A)
+
+    def __iter__(self):
+        for i in range(self.nrows):
+            yield self[i]
+
+    def __len__(self):
+        return self.nrows
+
+    def close(self):
+        """
+        Flush and close the underlying file.
+        """
+        if self._file is None:
+            return
+        if self._map is not None:
+            if not self.readonly:
+                self._map.flush()
+            self._map.close()
+            self._map = None
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return "<BasisStore(%d, %d) '%s' at %s>"%(self.nrows, self.ncols, self.filename, hex(id(self)))
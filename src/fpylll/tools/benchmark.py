@@ -1,11 +1,54 @@
 # -*- coding: utf-8 -*-
+"""
+Benchmarks for fpylll.
+
+Run all benchmarks and write the results to a JSON file::
+
+    python -m fpylll.tools.benchmark --output results.json
+
+Compare against an earlier run and exit with a non-zero status if a benchmark got slower by more
+than 10%::
+
+    python -m fpylll.tools.benchmark --baseline results.json --threshold 0.1
+
+Every repetition of a benchmark starts from ``set_random_seed(seed)`` and ``random.seed(seed)``,
+sets up its input and then times only the operation under test.  The minimum and median of the
+repetitions are reported.
+
+..  moduleauthor:: Martin R.  Albrecht <martinralbrecht+fpylll@googlemail.com>
+
+    >>> from fpylll.tools.benchmark import run, compare
+    >>> results = run(["lll-d", "enum"], repeat=2)
+    >>> list(results.keys())
+    ['lll-d', 'enum']
+    >>> compare(results, results)
+    []
+
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from collections import OrderedDict
+from fnmatch import fnmatch
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+from time import time
 
 from fpylll.fplll.gso import MatGSO
 from fpylll.fplll.integer_matrix import IntegerMatrix
-from fpylll.fplll.lll import LLLReduction
+from fpylll.fplll.lll import LLLReduction, lll_reduction
+from fpylll.fplll.bkz import BKZ, bkz_reduction
 from fpylll.fplll.enumeration import Enumeration
 from fpylll.fplll.pruner import prune
-from time import time
+from fpylll.fplll.sieve_gauss import GaussSieve
+from fpylll.config import float_types
+from fpylll.util import set_random_seed
+from fpylll.algorithms.bkz_stats import perf_counter, process_time
 
 
 def bench_enumeration(n):
@@ -22,7 +65,7 @@ def bench_enumeration(n):
     L(0, 0, n)
 
     radius = M.get_r(0, 0) * .999
-    pruning = prune(radius, 2**30, 0.9, M)
+    pruning = prune(radius, 2**30, 0.9, [M.r()])
 
     enum = Enumeration(M)
     t = time()
@@ -31,3 +74,320 @@ def bench_enumeration(n):
     cost = enum.get_nodes()
 
     return cost, t
+
+
+# name -> (setup function, dimension), see :func:`benchmark`
+benchmarks = OrderedDict()
+
+
+def benchmark(name, n):
+    """Register a benchmark.
+
+    The decorated function is called with the dimension ``n`` after the random seed was set.  It
+    prepares the input and returns a function without arguments which runs the operation under
+    test.  If that function returns a dictionary, it is included in the results of the first
+    repetition, e.g. the number of enumeration nodes.
+
+    :param name: a unique name
+    :param n: the dimension passed to the setup function
+
+    """
+    def decorator(setup):
+        if name in benchmarks:
+            raise ValueError("Benchmark '%s' already exists."%name)
+        benchmarks[name] = (setup, n)
+        return setup
+    return decorator
+
+
+def _qary(n, bits=30):
+    return IntegerMatrix.random(n, "qary", k=n//2, bits=bits)
+
+
+def _lll_reduced(n, bits=30):
+    A = _qary(n, bits)
+    lll_reduction(A)
+    return A
+
+
+def _gso(A):
+    M = MatGSO(A)
+    M.update_gso()
+    return M
+
+
+def _register_lll(float_type):
+    @benchmark("lll-%s"%float_type, 80)
+    def bench_lll(n):
+        A = _qary(n, bits=n)
+        # the default wrapper method picks its own floating-point type
+        return lambda: lll_reduction(A, method="heuristic", float_type=float_type)
+
+
+for float_type in float_types:
+    _register_lll(float_type)
+
+
+@benchmark("lll-threads", 60)
+def bench_lll_threads(n, tasks=16):
+    """
+    LLL on ``tasks`` bases on a pool of threads, which scales since LLL releases the GIL.  The
+    speedup over running the same reductions sequentially is reported.
+    """
+    from multiprocessing.pool import ThreadPool
+    from multiprocessing import cpu_count
+    workers = min(cpu_count(), 4)
+    A = [_qary(n) for _ in range(tasks)]
+
+    t_seq = perf_counter()
+    for a in A:
+        lll_reduction(IntegerMatrix(a))
+    t_seq = perf_counter() - t_seq
+
+    def run():
+        pool = ThreadPool(workers)
+        try:
+            t_par = perf_counter()
+            pool.map(lll_reduction, [IntegerMatrix(a) for a in A])
+            t_par = perf_counter() - t_par
+        finally:
+            pool.close()
+        return {"threads": workers, "speedup": t_seq/t_par}
+    return run
+
+
+@benchmark("bkz-fplll", 80)
+def bench_bkz_fplll(n):
+    A = _lll_reduced(n)
+    param = BKZ.Param(block_size=20, strategies=BKZ.DEFAULT_STRATEGY, flags=BKZ.MAX_LOOPS, max_loops=2)
+    return lambda: bkz_reduction(A, param)
+
+
+def _register_bkz(name, module, **kwds):
+    @benchmark("bkz-%s"%name, 80)
+    def bench_bkz(n):
+        from importlib import import_module
+        cls = import_module("fpylll.algorithms.%s"%module).BKZReduction
+        A = _lll_reduced(n)
+        param = BKZ.Param(block_size=20, strategies=BKZ.DEFAULT_STRATEGY,
+                          flags=BKZ.MAX_LOOPS, max_loops=2)
+        bkz = cls(A, **kwds)
+        return lambda: bkz(param)
+
+
+_register_bkz("python", "bkz")
+_register_bkz("python2", "bkz2")
+_register_bkz("pbkz", "pbkz", ncores=2, min_block_size=20)
+
+
+def _enumeration(n, pruned):
+    A = _lll_reduced(n)
+    bkz_reduction(A, BKZ.Param(block_size=20, strategies=BKZ.DEFAULT_STRATEGY))
+    M = _gso(A)
+    radius = M.get_r(0, 0) * .999
+    pruning = prune(radius, 2**30, 0.5, [M.r()]).coefficients if pruned else None
+
+    def run():
+        enum = Enumeration(M)
+        enum.enumerate(0, n, radius, 0, pruning=pruning)
+        return {"nodes": enum.get_nodes()}
+    return run
+
+
+@benchmark("enum", 40)
+def bench_enum(n):
+    return _enumeration(n, False)
+
+
+@benchmark("enum-pruned", 60)
+def bench_enum_pruned(n):
+    return _enumeration(n, True)
+
+
+def _register_prune(descent_method):
+    @benchmark("prune-%s"%descent_method, 60)
+    def bench_prune(n):
+        A = _lll_reduced(n)
+        bkz_reduction(A, BKZ.Param(block_size=20, strategies=BKZ.DEFAULT_STRATEGY))
+        M = _gso(A)
+        r = [M.get_r(i, i) for i in range(n)]
+        return lambda: prune(r[0], 2**40, 0.5, [r], descent_method=descent_method)
+
+
+for descent_method in ("gradient", "nm", "greedy", "hybrid"):
+    _register_prune(descent_method)
+
+
+@benchmark("sieve-gauss", 40)
+def bench_sieve(n):
+    A = _lll_reduced(n)
+    return lambda: GaussSieve(A, algorithm=2, seed=1)()
+
+
+@benchmark("io-bytes", 200)
+def bench_io_bytes(n):
+    A = IntegerMatrix.random(n, "uniform", bits=256)
+    return lambda: IntegerMatrix.from_bytes(A.to_bytes())
+
+
+@benchmark("io-file", 200)
+def bench_io_file(n):
+    A = IntegerMatrix.random(n, "uniform", bits=256)
+
+    def run():
+        fd, filename = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            A.to_file(filename)
+            IntegerMatrix.from_file(filename)
+        finally:
+            os.remove(filename)
+    return run
+
+
+@benchmark("io-matrix", 200)
+def bench_io_matrix(n):
+    A = IntegerMatrix.random(n, "uniform", bits=256)
+    return lambda: IntegerMatrix.from_matrix(A.to_matrix([[0]*n for _ in range(n)]))
+
+
+@benchmark("io-numpy", 200)
+def bench_io_numpy(n):
+    A = IntegerMatrix.random(n, "uniform", bits=30)
+    return lambda: IntegerMatrix.from_numpy(A.to_numpy())
+
+
+def _median(values):
+    values = sorted(values)
+    k = len(values)
+    return (values[(k-1)//2] + values[k//2])/2.
+
+
+def run(names=None, repeat=5, seed=1337, verbose=False, n=None):
+    """Run benchmarks.
+
+    :param names: a list of names or shell-style patterns, ``None`` for all benchmarks
+    :param repeat: number of repetitions of each benchmark
+    :param seed: random seed set before each repetition
+    :param verbose: print each result when it is available
+    :param n: dimension for all benchmarks, ``None`` for the dimension each was registered with
+    :returns: an ordered dictionary mapping names to results
+
+    """
+    if repeat < 1:
+        raise ValueError("Number of repetitions must be ≥ 1 but got %d"%repeat)
+
+    selected = []
+    for name in benchmarks:
+        if names is None or any(fnmatch(name, pattern) for pattern in names):
+            selected.append(name)
+    if names is not None and not selected:
+        raise ValueError("No benchmark matches %s."%", ".join(names))
+
+    results = OrderedDict()
+    for name in selected:
+        setup, n_ = benchmarks[name]
+        n_ = n_ if n is None else n
+        walltimes, cputimes, extra = [], [], None
+        try:
+            for _ in range(repeat):
+                set_random_seed(seed)
+                random.seed(seed)
+                f = setup(n_)
+                wt, ct = perf_counter(), process_time()
+                r = f()
+                ct, wt = process_time() - ct, perf_counter() - wt
+                walltimes.append(wt)
+                cputimes.append(ct)
+                if extra is None and isinstance(r, dict):
+                    extra = r
+        except ImportError as e:
+            # e.g. NumPy is not available
+            if verbose:
+                print("%-16s skipped: %s"%(name, e))
+            continue
+
+        result = OrderedDict()
+        result["n"] = n_
+        result["walltime"] = min(walltimes)
+        result["walltime median"] = _median(walltimes)
+        result["cputime"] = min(cputimes)
+        result["cputime median"] = _median(cputimes)
+        result.update(extra or {})
+        results[name] = result
+
+        if verbose:
+            print("%-16s n: %4d, walltime: %10.6fs, median: %10.6fs"%(
+                name, n_, result["walltime"], result["walltime median"]))
+    return results
+
+
+def compare(results, baseline, threshold=0.1, key="walltime"):
+    """Return benchmarks which got slower compared to ``baseline``.
+
+    Benchmarks missing from either input are ignored.
+
+    :param results: output of :func:`run`
+    :param baseline: output of an earlier call to :func:`run`
+    :param threshold: report benchmarks which are slower by more than this fraction
+    :param key: which time to compare
+    :returns: a list of tuples ``(name, old, new)``
+
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline or result["n"] != baseline[name]["n"]:
+            continue
+        old, new = baseline[name][key], result[key]
+        if new > old * (1 + threshold):
+            regressions.append((name, old, new))
+    return regressions
+
+
+def main(argv=None):
+    """
+    Command line interface, see ``python -m fpylll.tools.benchmark --help``.
+    """
+    parser = argparse.ArgumentParser(prog="python -m fpylll.tools.benchmark",
+                                     description="Run fpylll benchmarks.")
+    parser.add_argument("names", nargs="*", help="benchmarks to run, shell-style patterns (default: all)")
+    parser.add_argument("--list", action="store_true", help="list benchmarks and exit")
+    parser.add_argument("--repeat", type=int, default=5, help="repetitions per benchmark")
+    parser.add_argument("--seed", type=int, default=1337, help="random seed")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results in this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="flag benchmarks slower than the baseline by more than this fraction")
+    parser.add_argument("--quiet", action="store_true", help="only print regressions")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, (_, n) in benchmarks.items():
+            print("%-16s n: %4d"%(name, n))
+        return 0
+
+    results = run(args.names or None, repeat=args.repeat, seed=args.seed, verbose=not args.quiet)
+
+    if args.output:
+        data = OrderedDict()
+        data["python"] = platform.python_version()
+        data["platform"] = platform.platform()
+        data["seed"] = args.seed
+        data["repeat"] = args.repeat
+        data["results"] = results
+        with open(args.output, "w") as fh:
+            json.dump(data, fh, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)["results"]
+        regressions = compare(results, baseline, threshold=args.threshold)
+        for name, old, new in regressions:
+            print("REGRESSION %-16s %10.6fs -> %10.6fs (%+.1f%%)"%(name, old, new, 100*(new/old - 1)))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
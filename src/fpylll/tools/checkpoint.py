@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Checkpoint and resume long BKZ runs.
+
+A :class:`Checkpoint` is passed to :class:`fpylll.BKZ.Reduction` or to the BKZ classes in
+:mod:`fpylll.algorithms` when calling them.  After every ``tours`` tours, or once at least
+``seconds`` seconds passed since the last checkpoint, the state of the run is written to disk: the
+GSO object with its basis and transformation matrices, the BKZ parameters, the index of the next
+tour, the state of the auto-abort heuristic, the CPU time spent so far, the state of Python's
+random number generator and, for the Python implementations, the trace of all completed tours.
+The ``resume`` class methods restart from such a file without running the initial LLL reduction.
+
+fplll's own random number generator cannot be read back, so whenever a checkpoint is written it
+is reseeded with a seed drawn from Python's random number generator and that seed is stored.
+Hence, a resumed run continues exactly as the original run did after the checkpoint.
+
+Files are written to a temporary file first which is then renamed, so a checkpoint is never left
+half written.
+
+..  moduleauthor:: Martin R.  Albrecht <martinralbrecht+fpylll@googlemail.com>
+
+    >>> import tempfile, os
+    >>> from fpylll import IntegerMatrix, BKZ, set_random_seed
+    >>> from fpylll.algorithms.bkz2 import BKZReduction
+    >>> from fpylll.tools.checkpoint import Checkpoint
+    >>> fn = os.path.join(tempfile.mkdtemp(), "bkz.ckpt")
+    >>> set_random_seed(1337)
+    >>> A = IntegerMatrix.random(40, "qary", k=20, bits=20)
+    >>> bkz = BKZReduction(A)
+    >>> _ = bkz(BKZ.Param(10, flags=BKZ.MAX_LOOPS, max_loops=2), checkpoint=Checkpoint(fn))
+    >>> bkz, _ = BKZReduction.resume(fn, params=BKZ.Param(10, flags=BKZ.MAX_LOOPS, max_loops=4))
+    >>> [child.label for child in bkz.trace.children]
+    ['lll', ('tour', 0), ('tour', 1), ('tour', 2), ('tour', 3)]
+
+"""
+
+from __future__ import absolute_import
+import os
+import pickle
+import random
+import time
+
+from fpylll.util import set_random_seed
+
+try:
+    # unlike os.rename, overwrites an existing file on Windows as well
+    replace = os.replace
+except AttributeError:
+    replace = os.rename
+
+# bump when the layout of checkpoints changes
+VERSION = 1
+
+
+class AutoAbort(object):
+    """
+    Abort BKZ when the slope of the basis does not improve any longer.
+
+    This class behaves like :class:`fpylll.BKZ.AutoAbort` but its state can be saved and restored.
+    """
+    def __init__(self, M, num_rows, start_row=0, state=None):
+        """Create a new auto abort object.
+
+        :param M: GSO object
+        :param num_rows: number of rows
+        :param start_row: start at this row
+        :param state: output of :attr:`state` to continue from
+
+        """
+        self.M = M
+        self.num_rows = num_rows
+        self.start_row = start_row
+        if state is None:
+            state = (float("inf"), -1)
+        self.old_slope, self.no_dec = state
+
+    @property
+    def state(self):
+        """
+        A pair ``(old_slope, no_dec)`` to pass to the constructor.
+        """
+        return self.old_slope, self.no_dec
+
+    def test_abort(self, scale=1.0, max_no_dec=5):
+        """
+        Test if new slope fails to be smaller than `scale * old_slope` for `max_no_dec` iterations.
+
+        :param scale: target decrease
+        :param max_no_dec: number of rounds allowed to be stuck
+        """
+        new_slope = -self.M.get_current_slope(self.start_row, self.num_rows)
+        if self.no_dec == -1 or new_slope < scale * self.old_slope:
+            self.no_dec = 0
+        else:
+            self.no_dec += 1
+        self.old_slope = min(self.old_slope, new_slope)
+        return self.aborted(max_no_dec)
+
+    def aborted(self, max_no_dec=5):
+        """
+        Return the result of the last call to :meth:`test_abort` without testing again.
+
+        :param max_no_dec: number of rounds allowed to be stuck
+        """
+        return self.no_dec >= max_no_dec
+
+
+class Checkpoint(object):
+    """
+    Decide when to write checkpoints and write them.
+    """
+    def __init__(self, filename, tours=1, seconds=None):
+        """Create a new checkpoint policy.
+
+        :param filename: checkpoints are written to this file, overwriting earlier ones
+        :param tours: write a checkpoint every ``tours`` tours, ``None`` to disable
+        :param seconds: write a checkpoint when at least this many seconds of wall time passed
+            since the last one, ``None`` to disable
+
+        """
+        if tours is not None and tours < 1:
+            raise ValueError("Number of tours must be ≥ 1 but got %d"%tours)
+        self.filename = filename
+        self.tours = tours
+        self.seconds = seconds
+        self.last = time.time()
+
+    def due(self, tour):
+        """Return ``True`` if a checkpoint should be written after ``tour`` tours were completed.
+
+        :param tour: number of completed tours
+
+        """
+        if self.tours is not None and tour % self.tours == 0:
+            return True
+        if self.seconds is not None and time.time() - self.last >= self.seconds:
+            return True
+        return False
+
+    def save(self, state):
+        """Atomically write ``state`` to :attr:`filename`.
+
+        :param state: a dictionary, see :func:`load`
+
+        """
+        state = dict(state)
+        state["version"] = VERSION
+        state["checkpoint"] = (self.tours, self.seconds)
+        seed = random.randint(0, 2**31 - 1)
+        set_random_seed(seed)
+        state["random"] = random.getstate()
+        state["seed"] = seed
+
+        tmp = self.filename + ".tmp"
+        with open(tmp, "wb") as fh:
+            pickle.dump(state, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            fh.flush()
+            os.fsync(fh.fileno())
+        replace(tmp, self.filename)
+        self.last = time.time()
+
+    def __repr__(self):
+        return "<Checkpoint '%s' at %s>"%(self.filename, hex(id(self)))
+
+
+def load(filename):
+    """Read a checkpoint and restore the state of the random number generators.
+
+    The returned dictionary has the keys
+
+    - ``M``: the GSO object, its Gram-Schmidt coefficients still need to be computed,
+    - ``params``: the BKZ parameters,
+    - ``tour``: the index of the next tour,
+    - ``auto_abort``: the state of :class:`AutoAbort`,
+    - ``cputime``: the CPU time spent before the checkpoint,
+    - ``checkpoint``: the pair ``(tours, seconds)`` of the :class:`Checkpoint` which wrote it,
+
+    and implementation specific entries such as ``trace`` or ``lll``.
+
+    :param filename: a file written by :meth:`Checkpoint.save`
+
+    """
+    with open(filename, "rb") as fh:
+        state = pickle.load(fh)
+    if state.get("version") != VERSION:
+        raise ValueError("Checkpoint '%s' has version %s but expected %d."%(filename,
+                                                                            state.get("version"),
+                                                                            VERSION))
+    random.setstate(state["random"])
+    set_random_seed(state["seed"])
+    return state
+
+
+def checkpoint_for(filename, state, checkpoint=None):
+    """Return the checkpoint policy to use when resuming from ``state``.
+
+    :param filename: the file ``state`` was read from
+    :param state: output of :func:`load`
+    :param checkpoint: ``None`` to keep writing to ``filename`` with the same policy, ``False`` to
+        disable checkpointing or a :class:`Checkpoint`
+
+    """
+    if checkpoint is None:
+        tours, seconds = state["checkpoint"]
+        return Checkpoint(filename, tours=tours, seconds=seconds)
+    if checkpoint is False:
+        return None
+    return checkpoint
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+Cache pruning coefficients keyed by the shape of the basis.
+
+Optimising pruning coefficients with :func:`fpylll.prune` is expensive, yet consecutive calls in
+a BKZ tour often see almost the same Gram-Schmidt profile.  :class:`PruningCache` quantises the
+profile and returns previously computed coefficients on a hit.  On a miss the optimiser is
+started from the coefficients of the nearest cached profile instead of from scratch.
+
+..  moduleauthor:: Martin R.  Albrecht <martinralbrecht+fpylll@googlemail.com>
+
+    >>> from fpylll import IntegerMatrix, GSO, LLL, set_random_seed
+    >>> from fpylll.tools.pruning_cache import PruningCache
+    >>> set_random_seed(1337)
+    >>> A = IntegerMatrix.random(30, "qary", bits=20, k=15)
+    >>> M = GSO.Mat(A)
+    >>> LLL.Reduction(M)()
+    >>> cache = PruningCache()
+    >>> pr0 = cache.prune(M.get_r(0, 0), 2**20, 0.5, M.r())
+    >>> pr1 = cache.prune(M.get_r(0, 0), 2**20, 0.5, M.r())
+    >>> pr0.coefficients == pr1.coefficients
+    True
+    >>> cache.hits, cache.misses
+    (1, 1)
+
+"""
+
+from __future__ import absolute_import
+from collections import OrderedDict
+from math import log
+import json
+import os
+
+from fpylll.fplll.bkz_param import Pruning
+from fpylll.fplll.pruner import prune, Pruner
+from fpylll.tools.checkpoint import replace
+
+
+_DESCENT_METHODS = {Pruner.GRADIENT: "gradient", Pruner.NM: "nm",
+                    Pruner.HYBRID: "hybrid", Pruner.GREEDY: "greedy"}
+
+
+def _descent_method_name(descent_method):
+    """
+    Return the name of ``descent_method``, which is either a name or one of the ``Pruner`` constants.
+    """
+    if descent_method in _DESCENT_METHODS:
+        return _DESCENT_METHODS[descent_method]
+    if descent_method in _DESCENT_METHODS.values():
+        return descent_method
+    raise ValueError("Descent method '%s' not supported."%descent_method)
+
+
+class PruningCache(object):
+    """
+    An LRU cache around :func:`fpylll.prune` with optional on-disk backing.
+    """
+
+    def __init__(self, maxsize=1024, filename=None, resolution=0.05, warm_start=1.0):
+        """Create a new cache.
+
+        :param maxsize: maximum number of entries, least recently used entries are evicted first
+        :param filename: if not ``None`` load entries from this file if it exists, :func:`save`
+            writes to it
+        :param resolution: quantisation step for the profile ``log2(r_i/radius)`` and for
+            ``log2(preproc_cost)``
+        :param warm_start: on a miss, start the optimiser from the nearest cached coefficients if
+            the profiles differ by at most this much in ``log2``, in every coordinate; ``0`` to
+            always start from scratch
+
+        """
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1 but got %d"%maxsize)
+        if resolution <= 0:
+            raise ValueError("Resolution must be > 0 but got %f"%resolution)
+
+        self.maxsize = maxsize
+        self.filename = filename
+        self.resolution = resolution
+        self.warm_start = warm_start
+
+        self.hits = 0
+        self.misses = 0
+        self.warm_starts = 0
+
+        self._entries = OrderedDict()
+
+        if filename is not None and os.path.exists(filename):
+            self.load(filename)
+
+    def _quantize(self, x):
+        return int(round(x/self.resolution))
+
+    def _key(self, enumeration_radius, preproc_cost, target, M, descent_method, metric, float_type):
+        """
+        Return a pair ``(class, profile)`` where ``class`` collects all discrete parameters.
+        """
+        try:
+            M[0][0]
+        except (AttributeError, TypeError):
+            M = [M]
+
+        d = len(M[0])
+        profile = []
+        for i in range(d):
+            r = sum([log(m[i]/enumeration_radius, 2) for m in M])/len(M)
+            profile.append(self._quantize(r))
+
+        cls = (d, repr(float(target)), self._quantize(log(preproc_cost, 2)),
+               str(descent_method), str(metric), str(float_type))
+        return cls, tuple(profile)
+
+    def _nearest(self, cls, profile):
+        best, best_dist = None, None
+        for (cls_, profile_), (_, pruning) in self._entries.items():
+            if cls_ != cls:
+                continue
+            dist = max([abs(a - b) for a, b in zip(profile, profile_)] or [0])
+            if best_dist is None or dist < best_dist:
+                best, best_dist = pruning, dist
+        if best is None or best_dist*self.resolution > self.warm_start:
+            return None
+        return best
+
+    def _insert(self, key, scale, pruning):
+        self._entries.pop(key, None)
+        self._entries[key] = scale, pruning
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def prune(self, enumeration_radius, preproc_cost, target, M,
+              descent_method="gradient", metric="probability", float_type="double"):
+        """Return pruning parameters, see :func:`fpylll.prune` for the meaning of the parameters.
+
+        The returned object is a fresh copy and may be modified by the caller.  As for
+        :func:`fpylll.prune`, ``descent_method="greedy"`` returns a pair ``(radius, pruning)``.
+        The cache stores the ratio of the returned radius to ``enumeration_radius``, which it
+        applies on a hit.
+
+        """
+        descent_method = _descent_method_name(descent_method)
+        key = self._key(enumeration_radius, preproc_cost, target, M, descent_method, metric, float_type)
+
+        if key in self._entries:
+            self.hits += 1
+            scale, pruning = self._entries.pop(key)
+            self._entries[key] = scale, pruning
+            return self._result(descent_method, scale*enumeration_radius, pruning)
+
+        self.misses += 1
+        start = None
+        if self.warm_start > 0:
+            start = self._nearest(*key)
+        if start is not None:
+            self.warm_starts += 1
+            start = Pruning(*start.__reduce__()[1])
+
+        pruning = prune(enumeration_radius, preproc_cost, target, M,
+                        descent_method=descent_method, metric=metric, float_type=float_type,
+                        pruning=start)
+        scale = 1.0
+        if descent_method == "greedy":
+            radius, pruning = pruning
+            scale = radius/enumeration_radius
+        self._insert(key, scale, pruning)
+        return self._result(descent_method, scale*enumeration_radius, pruning)
+
+    @staticmethod
+    def _result(descent_method, radius, pruning):
+        pruning = Pruning(*pruning.__reduce__()[1])
+        if descent_method == "greedy":
+            return radius, pruning
+        return pruning
+
+    def clear(self):
+        """
+        Remove all entries and reset counters.
+        """
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.warm_starts = 0
+
+    def save(self, filename=None):
+        """Write all entries to ``filename``.
+
+        :param filename: target file, ``None`` for the file passed to the constructor
+
+        """
+        if filename is None:
+            filename = self.filename
+        if filename is None:
+            raise ValueError("No filename given.")
+
+        entries = []
+        for (cls, profile), (scale, pruning) in self._entries.items():
+            entries.append([list(cls), list(profile), list(pruning.__reduce__()[1]), scale])
+        data = {"resolution": self.resolution, "entries": entries}
+
+        tmp = filename + ".tmp"
+        with open(tmp, "w") as fh:
+            json.dump(data, fh)
+        replace(tmp, filename)
+
+    def load(self, filename):
+        """Add entries from ``filename`` written by :func:`save`.
+
+        Entries written with a different resolution are ignored.
+
+        :param filename: source file
+
+        """
+        with open(filename) as fh:
+            data = json.load(fh)
+        if data["resolution"] != self.resolution:
+            return
+        for cls, profile, pruning, scale in data["entries"]:
+            self._insert((tuple(cls), tuple(profile)), scale, Pruning(*pruning))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return "<PruningCache(%d/%d) hits: %d, misses: %d at %s>"%(
+            len(self), self.maxsize, self.hits, self.misses, hex(id(self)))
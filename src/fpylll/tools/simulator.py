@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Predict the Gram-Schmidt profile of a basis after BKZ without running BKZ.
+
+The deterministic simulation follows Chen and Nguyen [CN11]_: each SVP call is assumed to find a
+vector of length the Gaussian heuristic of its block, and the last 45 Gram-Schmidt norms follow
+the average shape of HKZ-reduced bases.  The probabilistic simulation additionally models the
+length of the shortest vector in a block as a random variable, and lets an SVP call succeed only
+with the success probability of the pruning parameters in the strategies of the ``BKZ.Param``
+object, repeated until ``min_success_probability`` is reached as in
+:mod:`fpylll.algorithms.bkz2`.
+
+Profiles are handled as NumPy arrays of natural logarithms of the Gram-Schmidt norms (not their
+squares).  Several profiles can be simulated at once by passing a two-dimensional array with one
+profile per row, e.g. to average over many runs of the probabilistic simulation.
+
+.. [CN11] Chen, Y. and Nguyen, P. Q.  BKZ 2.0: Better Lattice Security Estimates.  ASIACRYPT 2011.
+
+..  moduleauthor:: Martin R.  Albrecht <martinralbrecht+fpylll@googlemail.com>
+
+    >>> from fpylll import IntegerMatrix, GSO, LLL, BKZ, set_random_seed
+    >>> from fpylll.tools.simulator import simulate
+    >>> set_random_seed(1337)
+    >>> A = LLL.reduction(IntegerMatrix.random(100, "qary", k=50, bits=30))
+    >>> M = GSO.Mat(A)
+    >>> _ = M.update_gso()
+    >>> r, tours = simulate(M, BKZ.Param(block_size=40, flags=BKZ.MAX_LOOPS, max_loops=4))
+    >>> tours
+    4
+    >>> r[0] < M.get_r(0, 0)
+    True
+
+"""
+
+from __future__ import absolute_import
+from math import ceil, log
+
+import numpy
+
+from fpylll.fplll.bkz import BKZ
+from fpylll.fplll.gso import MatGSO
+from fpylll.util import ball_log_vol
+
+# average log Gram-Schmidt norms of HKZ-reduced bases in dimension 45, see [CN11]_, which gives
+# them in base 2; converted to natural logarithms below
+rk = numpy.array((
+    0.789527997160000, 0.780003183804613, 0.750872218594458, 0.706520454592593, 0.696345241018901,
+    0.660533841808400, 0.626274718790505, 0.581480717333169, 0.553171463433503, 0.520811087419712,
+    0.487994338534253, 0.459541470573431, 0.414638319529319, 0.392811729940846, 0.339090376264829,
+    0.306561491936042, 0.276041187709516, 0.236698863270441, 0.196186341673080, 0.161214212092249,
+    0.110895134828114, 0.0678261623920553, 0.0272807162335610, -0.0234609979600137, -0.0320527224746912,
+    -0.0940331032784437, -0.129109087817554, -0.176965384290173, -0.209405754915959, -0.265867993276493,
+    -0.299031324494802, -0.349338597048432, -0.380428160303508, -0.427399405474537, -0.474944677694975,
+    -0.530140672818150, -0.561625221138784, -0.612008793872032, -0.669011014635905, -0.713766731570930,
+    -0.754041787011810, -0.808609696192079, -0.859933249032210, -0.884479963601658, -0.886666930030433,
+))*log(2)
+
+
+def log_profile(r):
+    """Return the log Gram-Schmidt norms of ``r`` as a NumPy array.
+
+    :param r: a GSO object or squared Gram-Schmidt norms as returned by ``MatGSO.r()``
+
+    """
+    if isinstance(r, MatGSO):
+        r.update_gso()
+        r = r.r()
+    return numpy.log(numpy.array(r, dtype=numpy.float64))/2
+
+
+def _constants(block_size):
+    """
+    Return ``c`` with ``c[β-1]`` the log of the first Gram-Schmidt norm of a block of dimension
+    ``β`` minus its log root determinant.
+    """
+    c = [rk[-j] - rk[-j:].sum()/j for j in range(1, 46)]
+    c += [-ball_log_vol(beta)/beta for beta in range(46, block_size + 1)]
+    return numpy.array(c)
+
+
+def _success_probabilities(param, block_size):
+    """
+    Return for each block size up to ``block_size`` the radius factors and the success
+    probabilities of its pruning parameters after repetition.
+    """
+    tables = [None]
+    for beta in range(1, block_size + 1):
+        pruning = param.strategies[beta].pruning_parameters if beta < len(param.strategies) else ()
+        factors, probabilities = [], []
+        for pr in pruning:
+            p = pr.expectation
+            if 0 < p < 1 and param.min_success_probability > p:
+                trials = ceil(log(1 - param.min_success_probability)/log(1 - p))
+                p = 1 - (1 - p)**trials
+            factors.append(pr.radius_factor)
+            probabilities.append(p)
+        if not factors:
+            factors, probabilities = [1.0], [1.0]
+        tables.append((numpy.array(factors), numpy.array(probabilities)))
+    return tables
+
+
+def simulate_log(profile, param, tours=None, prob=False, seed=None):
+    """Simulate BKZ on the log profile ``profile``.
+
+    :param profile: log Gram-Schmidt norms, one profile or one profile per row
+    :param param: BKZ parameters, ``block_size`` and ``max_loops`` with ``BKZ.MAX_LOOPS`` are
+        used, as well as ``strategies`` and ``min_success_probability`` if ``prob`` is ``True``
+    :param tours: number of tours, overrides ``param``; by default tours are run until no
+        profile changes and at most as many as the dimension
+    :param prob: use the probabilistic simulation
+    :param seed: seed for the probabilistic simulation
+    :returns: the simulated log profile(s) with the shape of ``profile`` and the number of tours
+
+    """
+    profile = numpy.array(profile, dtype=numpy.float64)
+    if profile.ndim not in (1, 2):
+        raise ValueError("Profiles must be one or two-dimensional but got %d dimensions."%profile.ndim)
+    l1 = numpy.atleast_2d(profile).copy()
+    m, d = l1.shape
+
+    if tours is None:
+        tours = param.max_loops if param.flags & BKZ.MAX_LOOPS else d
+
+    block_size = min(param.block_size, d)
+    c = _constants(max(block_size, 45))
+    tail = min(45, block_size)
+    rk_ = rk[-tail:] - rk[-tail:].sum()/tail
+
+    if prob:
+        rng = numpy.random.RandomState(seed)
+        tables = _success_probabilities(param, block_size)
+
+    i = 0
+    for i in range(tours):
+        l2 = l1.copy()
+        prefix = numpy.zeros((m, d + 1))
+        numpy.cumsum(l1, axis=1, out=prefix[:, 1:])
+        unchanged = numpy.ones(m, dtype=bool)
+        s2 = numpy.zeros(m)
+
+        for k in range(d - tail):
+            beta = min(block_size, d - k)
+            lma = (prefix[:, k + beta] - s2)/beta + c[beta-1]
+            if prob:
+                # like Strategy.get_pruning, pruning coefficients are chosen by the ratio of the
+                # current first norm to the Gaussian heuristic
+                factors, probabilities = tables[beta]
+                ratio = numpy.exp(2*(l1[:, k] - lma))
+                j = numpy.abs(factors[None, :] - ratio[:, None]).argmin(axis=1)
+                # the shortest vector is shorter than t·GH with probability 1-exp(-t^β)
+                lma += numpy.log(rng.standard_exponential(m))/beta
+                success = rng.random_sample(m) < probabilities[j]
+                update = ~unchanged | (success & (lma < l1[:, k]))
+            else:
+                update = ~unchanged | (lma < l1[:, k])
+            l2[update, k] = lma[update]
+            unchanged &= ~update
+            s2 += l2[:, k]
+
+        # if the last block is the whole basis it is always HKZ reduced
+        changed = ~unchanged | (d == tail)
+        if tail:
+            log_vol = prefix[:, d] - s2
+            l2[changed, d-tail:] = (log_vol[changed]/tail)[:, None] + rk_[None, :]
+        changed &= (l1 != l2).any(axis=1)
+        if not changed.any():
+            break
+        l1[changed] = l2[changed]
+
+    if profile.ndim == 1:
+        l1 = l1[0]
+    return l1, i + 1
+
+
+def simulate(r, param, tours=None, prob=False, seed=None):
+    """Simulate BKZ on the squared Gram-Schmidt norms ``r``.
+
+    :param r: a GSO object, squared Gram-Schmidt norms or an array of those, one per row
+    :param param: BKZ parameters, see :func:`simulate_log`
+    :param tours: number of tours, see :func:`simulate_log`
+    :param prob: use the probabilistic simulation
+    :param seed: seed for the probabilistic simulation
+    :returns: the simulated squared Gram-Schmidt norms, as a list for a single profile, and the
+        number of tours
+
+    """
+    profile, tours = simulate_log(log_profile(r), param, tours=tours, prob=prob, seed=seed)
+    r = numpy.exp(2*profile)
+    if r.ndim == 1:
+        r = r.tolist()
+    return r, tours
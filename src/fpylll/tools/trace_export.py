@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+Stream BKZ traces to disk and load them back.
+
+A :class:`TraceWriter` is passed to :class:`fpylll.algorithms.bkz_stats.BKZTreeTracer` or
+:class:`fpylll.algorithms.bkz_stats.FastTreeTracer`.  Whenever a tour completes, one record is
+appended to a JSON-lines file.  A record holds the tour's CPU and wall time, ``r_0``, the slope of
+the basis and the number of enumeration nodes, and by default the full subtree of the tour.
+Records of many runs can be scanned with :func:`load_records` without building any trees, turned
+into columns with :func:`to_columns` or :func:`save_npz`, and :func:`load_traces` rebuilds the
+:class:`fpylll.algorithms.bkz_stats.Node` trees.
+
+..  moduleauthor:: Martin R.  Albrecht <martinralbrecht+fpylll@googlemail.com>
+
+    >>> import tempfile, os
+    >>> from functools import partial
+    >>> from fpylll import IntegerMatrix, BKZ
+    >>> from fpylll.algorithms.bkz2 import BKZReduction
+    >>> from fpylll.algorithms.bkz_stats import BKZTreeTracer
+    >>> from fpylll.tools.trace_export import TraceWriter, load_records, load_traces
+    >>> fn = os.path.join(tempfile.mkdtemp(), "trace.jsonl")
+    >>> A = IntegerMatrix.random(40, "qary", k=20, bits=20)
+    >>> bkz = BKZReduction(A)
+    >>> with TraceWriter(fn) as writer:
+    ...     _ = bkz(BKZ.Param(10, flags=BKZ.MAX_LOOPS, max_loops=2),
+    ...             tracer=partial(BKZTreeTracer, writer=writer))
+    >>> [record["tour"] for record in load_records(fn)]
+    [0, 1]
+    >>> trace, = load_traces(fn).values()
+    >>> float(trace.get("tour")[1]["r_0"]) == float(bkz.trace.get("tour")[1]["r_0"])
+    True
+
+"""
+
+from __future__ import absolute_import
+from collections import OrderedDict
+import json
+import uuid
+
+from fpylll.algorithms.bkz_stats import Node, Statistic
+
+columns = ("run", "tour", "cputime", "walltime", "r_0", "slope", "enum")
+
+
+def _label_to_json(label):
+    if isinstance(label, tuple):
+        return [_label_to_json(x) for x in label]
+    return label
+
+
+def _label_from_json(label):
+    if isinstance(label, list):
+        return tuple(_label_from_json(x) for x in label)
+    return label
+
+
+def node_to_dict(node):
+    """Return a JSON-serialisable representation of the tree ``node``.
+
+    Statistics are stored as lists ``[repr, min, max, sum, sqr, count]``.
+
+    :param node: a :class:`fpylll.algorithms.bkz_stats.Node`
+
+    """
+    data = OrderedDict()
+    for k, v in node.data.items():
+        if isinstance(v, Statistic):
+            data[k] = [v._repr, v._min, v._max, v._sum, v._sqr, v._ctr]
+        else:
+            data[k] = v
+    return OrderedDict([("label", _label_to_json(node.label)),
+                        ("data", data),
+                        ("children", [node_to_dict(child) for child in node.children])])
+
+
+def node_from_dict(d):
+    """Rebuild a tree from the output of :func:`node_to_dict`.
+
+    :param d: a dictionary
+
+    """
+    node = Node(_label_from_json(d["label"]))
+    for k, v in d["data"].items():
+        if isinstance(v, list):
+            stat = Statistic(v[3], repr=v[0], count=False)
+            stat._min, stat._max, stat._sum, stat._sqr, stat._ctr = v[1:]
+            node.data[k] = stat
+        else:
+            node.data[k] = v
+    for child in d["children"]:
+        node.add_child(node_from_dict(child))
+    return node
+
+
+class TraceWriter(object):
+    """
+    Append one JSON record per completed BKZ tour to a file.
+    """
+
+    def __init__(self, filename, full=True):
+        """Open ``filename`` for appending.
+
+        :param filename: path of the JSON-lines file
+        :param full: if ``True`` also store the subtree of each tour, which :func:`load_traces`
+            needs to rebuild complete trees
+
+        """
+        self.filename = filename
+        self.full = full
+        self.run = None
+        self._file = open(filename, "a")
+
+    def new_run(self, run=None):
+        """Start a new run, all following records are tagged with ``run``.
+
+        Tracers call this when they are created.
+
+        :param run: an identifier, ``None`` for a random one
+
+        """
+        self.run = run if run is not None else uuid.uuid4().hex
+        return self.run
+
+    def write(self, node):
+        """Append a record for the tour ``node`` and flush it to disk.
+
+        :param node: a :class:`fpylll.algorithms.bkz_stats.Node` labelled ``("tour", i)`` with
+            the data recorded by :class:`fpylll.algorithms.bkz_stats.BKZTreeTracer`
+
+        """
+        if self._file is None:
+            raise ValueError("Trace writer for '%s' is closed."%self.filename)
+        if self.run is None:
+            self.new_run()
+
+        record = OrderedDict()
+        record["run"] = self.run
+        record["tour"] = node.label[1]
+        record["cputime"] = float(node["cputime"])
+        record["walltime"] = float(node["walltime"])
+        record["r_0"] = float(node["r_0"])
+        record["slope"] = float(node["/"])
+        record["enum"] = float(node.sum("#enum"))
+        if self.full:
+            record["trace"] = node_to_dict(node)
+
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def close(self):
+        """
+        Close the underlying file.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return "<TraceWriter '%s' at %s>"%(self.filename, hex(id(self)))
+
+
+def load_records(filename, run=None):
+    """Iterate over the records in ``filename`` one at a time.
+
+    :param filename: a file written by :class:`TraceWriter`
+    :param run: only return records of this run, ``None`` for all
+
+    """
+    with open(filename) as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line, object_pairs_hook=OrderedDict)
+            if run is None or record["run"] == run:
+                yield record
+
+
+def load_traces(filename, root_label="bkz"):
+    """Rebuild one tree per run from the records in ``filename``.
+
+    Tours of records written with ``full=False`` only carry the summary data.
+
+    :param filename: a file written by :class:`TraceWriter`
+    :param root_label: label of the root nodes
+    :returns: an ordered dictionary mapping runs to trees
+
+    """
+    traces = OrderedDict()
+    for record in load_records(filename):
+        root = traces.setdefault(record["run"], Node(root_label))
+        if "trace" in record:
+            root.add_child(node_from_dict(record["trace"]))
+        else:
+            tour = root.add_child(Node(("tour", record["tour"])))
+            tour.data["cputime"] = Statistic(record["cputime"], repr="sum")
+            tour.data["walltime"] = Statistic(record["walltime"], repr="sum")
+            tour.data["r_0"] = Statistic(record["r_0"], repr="min")
+            tour.data["/"] = Statistic(record["slope"], repr="min")
+            tour.data["#enum"] = Statistic(record["enum"], repr="sum")
+    return traces
+
+
+def to_columns(records):
+    """Return the summary data of ``records`` as a dictionary of lists, one per column.
+
+    :param records: an iterable of records, e.g. the output of :func:`load_records`
+
+    """
+    cols = OrderedDict((c, []) for c in columns)
+    for record in records:
+        for c in columns:
+            cols[c].append(record[c])
+    return cols
+
+
+def save_npz(filename, records):
+    """Write the summary data of ``records`` to a NumPy ``.npz`` file with one array per column.
+
+    :param filename: target file
+    :param records: an iterable of records, e.g. the output of :func:`load_records`
+
+    """
+    import numpy
+
+    cols = to_columns(records)
+    arrays = OrderedDict()
+    for c, v in cols.items():
+        if c == "run":
+            arrays[c] = numpy.array(v, dtype=str)
+        elif c == "tour":
+            arrays[c] = numpy.array(v, dtype=numpy.int64)
+        else:
+            arrays[c] = numpy.array(v, dtype=numpy.float64)
+    numpy.savez_compressed(filename, **arrays)
+
+
+def load_npz(filename):
+    """Return the columns written by :func:`save_npz` as a dictionary of NumPy arrays.
+
+    :param filename: a file written by :func:`save_npz`
+
+    """
+    import numpy
+
+    with numpy.load(filename) as data:
+        return OrderedDict((c, data[c]) for c in columns)
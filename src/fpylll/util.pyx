@@ -46,13 +46,13 @@ cdef FloatType check_float_type(object float_type):
     raise ValueError("Float type '%s' unknown." % float_type)
 
 cdef int check_descent_method(object descent_method) except -1:
-    if descent_method == "gradient":
+    if descent_method == "gradient" or descent_method == PRUNER_METHOD_GRADIENT:
         return PRUNER_METHOD_GRADIENT
-    elif descent_method == "nm":
+    elif descent_method == "nm" or descent_method == PRUNER_METHOD_NM:
         return PRUNER_METHOD_NM
-    elif descent_method == "hybrid":
+    elif descent_method == "hybrid" or descent_method == PRUNER_METHOD_HYBRID:
         return PRUNER_METHOD_HYBRID
-    elif descent_method == "greedy":
+    elif descent_method == "greedy" or descent_method == PRUNER_METHOD_GREEDY:
         return PRUNER_METHOD_GREEDY
     else:
         raise ValueError("Descent method '%s' not supported."%descent_method)
@@ -199,6 +199,63 @@ def precision(prec):
     return PrecisionContext(prec)
 
 
+# floating-point types in order of cost with their precision and largest binary exponent
+IF HAVE_LONG_DOUBLE:
+    _float_type_limits = [("double", 53, 1021), ("long double", 64, 16381), ("dpe", 53, 2**30)]
+ELSE:
+    _float_type_limits = [("double", 53, 1021), ("dpe", 53, 2**30)]
+IF HAVE_QD:
+    _float_type_limits += [("dd", 106, 1021), ("qd", 212, 1021)]
+_float_type_limits += [("mpfr", None, 2**30)]
+
+
+def auto_float_types(int nrows, int max_exp, int precision=0, fast=False):
+    """
+    Return the floating-point types to try for reducing a basis, cheapest first.
+
+    The first entry is the cheapest type whose precision and exponent range are expected to be
+    sufficient for a basis with ``nrows`` rows and entries of at most ``max_exp`` bits, following
+    the heuristic that LLL needs about ``nrows/3 + 10`` bits of precision.  Each following entry
+    has more precision, ending with MPFR.
+
+    :param nrows: number of rows
+    :param max_exp: maximum number of bits of an entry, e.g. ``B.get_max_exp()``
+    :param precision: minimum precision for MPFR
+    :param fast: only return types supported by LLL's ``"fast"`` method, i.e. no DPE or MPFR
+    :returns: a list of pairs ``(float_type, precision)`` where ``precision`` is ``0`` except
+        for MPFR
+
+    >>> from fpylll.util import auto_float_types
+    >>> auto_float_types(40, 30)[0]
+    ('double', 0)
+    >>> auto_float_types(40, 30)[-1][0]
+    'mpfr'
+    >>> auto_float_types(40, 2000)[0][0] in ('long double', 'dpe')
+    True
+    >>> auto_float_types(2000, 30)
+    [('mpfr', 676)]
+
+    """
+    cdef int bits = nrows//3 + 10
+    cdef int expo = 2*max(max_exp, 0) + int(log(nrows + 1, 2)) + 1
+
+    types = []
+    cdef int last = 0
+    for float_type, prec, emax in _float_type_limits:
+        if emax < expo:
+            continue
+        if prec is None:
+            if fast:
+                continue
+            types.append((float_type, max(precision, bits, 2*last, 53)))
+        elif (types and prec > last) or (not types and prec >= bits):
+            if fast and float_type == "dpe":
+                continue
+            types.append((float_type, 0))
+            last = prec
+    return types
+
+
 def adjust_radius_to_gh_bound(double dist, int dist_expo, int block_size, double root_det, double gh_factor):
     """
     Use Gaussian Heuristic to reduce bound on the length of the shortest vector.
@@ -225,7 +282,124 @@ def ball_log_vol(n):
     return (n/2.) * log(pi) - lgamma(n/2. + 1)
 
 def gaussian_heuristic(r):
-    n = len(list(r))
-    log_vol = sum([log(x) for x in r])
+    """
+    Return the squared length of the shortest vector predicted by the Gaussian heuristic for a
+    lattice with squared Gram-Schmidt norms ``r``.
+
+    :param r: an iterable of squared Gram-Schmidt norms, read once
+
+    >>> from fpylll.util import gaussian_heuristic
+    >>> round(gaussian_heuristic([1.0]*10), 6)
+    0.829252
+
+    """
+    cdef int n = 0
+    cdef double log_vol = 0.0
+    for x in r:
+        log_vol += log(x)
+        n += 1
     log_gh =  1./n * (log_vol - 2 * ball_log_vol(n))
     return exp(log_gh)
+
+
+def prefix_log_r(r):
+    """
+    Return prefix sums ``s`` of ``log(r)`` with ``s[i] = log(r[0]) + … + log(r[i-1])``.
+
+    The output can be passed to :func:`sliding_log_det`, :func:`sliding_root_det` and
+    :func:`sliding_gaussian_heuristic` with ``prefix=True`` to share the work between them.
+
+    :param r: squared Gram-Schmidt norms, e.g. ``M.r()`` or a NumPy array
+    :returns: a NumPy array of length ``len(r)+1``
+
+    >>> from fpylll.util import prefix_log_r
+    >>> prefix_log_r([1.0, 2.0, 4.0])  # doctest: +ELLIPSIS
+    array([0.  ..., 0.69314718, 2.07944154])
+
+    """
+    import numpy
+    r = numpy.asarray(r, dtype=numpy.float64)
+    s = numpy.zeros(len(r) + 1)
+    numpy.cumsum(numpy.log(r), out=s[1:])
+    return s
+
+
+def _sliding_windows(r, block_size, prefix):
+    import numpy
+    if block_size < 1:
+        raise ValueError("Block size must be ≥ 1 but got %d"%block_size)
+    s = numpy.asarray(r, dtype=numpy.float64) if prefix else prefix_log_r(r)
+    n = len(s) - 1
+    start = numpy.arange(n)
+    stop = numpy.minimum(start + block_size, n)
+    return s[stop] - s[start], stop - start
+
+
+def sliding_log_det(r, block_size, prefix=False):
+    """
+    Return the logarithms of the (squared) determinants of the blocks starting at every index.
+
+    The block starting at ``κ`` has dimension ``min(block_size, n-κ)``, as in a BKZ tour, so entry
+    ``κ`` is ``log(r[κ]) + … + log(r[κ+β-1])``.
+
+    :param r: squared Gram-Schmidt norms or, if ``prefix`` is ``True``, the output of
+        :func:`prefix_log_r`
+    :param block_size: block size ``β``
+    :param prefix: ``r`` holds prefix sums of ``log(r)``
+    :returns: a NumPy array of length ``n``
+
+    >>> from fpylll.util import sliding_log_det
+    >>> sliding_log_det([1.0, 2.0, 4.0], 2)
+    array([0.69314718, 2.07944154, 1.38629436])
+
+    """
+    log_det, _ = _sliding_windows(r, block_size, prefix)
+    return log_det
+
+
+def sliding_root_det(r, block_size, prefix=False):
+    """
+    Return the root determinants of the blocks starting at every index, i.e. entry ``κ`` agrees
+    with ``M.get_root_det(κ, min(κ+block_size, n))``.
+
+    :param r: squared Gram-Schmidt norms or, if ``prefix`` is ``True``, the output of
+        :func:`prefix_log_r`
+    :param block_size: block size ``β``
+    :param prefix: ``r`` holds prefix sums of ``log(r)``
+    :returns: a NumPy array of length ``n``
+
+    >>> from fpylll.util import sliding_root_det
+    >>> sliding_root_det([1.0, 4.0, 16.0], 2)
+    array([ 2.,  8., 16.])
+
+    """
+    import numpy
+    log_det, dim = _sliding_windows(r, block_size, prefix)
+    return numpy.exp(log_det/dim)
+
+
+def sliding_gaussian_heuristic(r, block_size, prefix=False):
+    """
+    Return the Gaussian heuristic of the blocks starting at every index, i.e. entry ``κ`` agrees
+    with ``gaussian_heuristic(r[κ:κ+block_size])``.
+
+    Multiply by ``gh_factor`` and take the minimum with the current radii to get the radii
+    :func:`adjust_radius_to_gh_bound` would produce for a whole tour.
+
+    :param r: squared Gram-Schmidt norms or, if ``prefix`` is ``True``, the output of
+        :func:`prefix_log_r`
+    :param block_size: block size ``β``
+    :param prefix: ``r`` holds prefix sums of ``log(r)``
+    :returns: a NumPy array of length ``n``
+
+    >>> from fpylll.util import sliding_gaussian_heuristic, gaussian_heuristic
+    >>> r = [2.0**-i for i in range(20)]
+    >>> gh = sliding_gaussian_heuristic(r, 10)
+    >>> abs(gh[3] - gaussian_heuristic(r[3:13])) < 1e-12
+    True
+
+    """
+    import numpy
+    log_det, dim = _sliding_windows(r, block_size, prefix)
+    ball = numpy.array([0.0] + [ball_log_vol(d) for d in range(1, min(block_size, len(dim)) + 1)])
+    return numpy.exp((log_det - 2*ball[dim])/dim)
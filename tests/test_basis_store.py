@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+from fpylll import IntegerMatrix, LLL
+from fpylll.tools.basis_store import BasisStore
+
+dimensions = ((0, 0), (1, 1), (2, 2), (3, 3), (10, 10), (10, 20), (20, 10))
+
+
+def make_integer_matrix(m, n):
+    A = IntegerMatrix(m, n)
+    A.randomize("uniform", bits=m+n)
+    if m and n:
+        A[0, 0] = -A[0, 0]
+    return A
+
+
+def test_basis_store(tmpdir):
+    for m, n in dimensions:
+        A = make_integer_matrix(m, n)
+        fn = str(tmpdir.join("basis-%d-%d.bin"%(m, n)))
+        with BasisStore.create(fn, A) as S:
+            assert (S.nrows, S.ncols) == (m, n)
+            assert S.to_matrix() == A
+            for start in range(m):
+                B = S.read_rows(start, min(start+3, m))
+                for i in range(B.nrows):
+                    for j in range(n):
+                        assert B[i, j] == A[start+i, j]
+        assert os.path.getsize(fn) == BasisStore.header.size + m*S.row_size
+
+        with BasisStore(fn, readonly=True) as S:
+            assert S.to_matrix() == A
+
+
+def test_basis_store_write(tmpdir):
+    A = IntegerMatrix.random(30, "qary", k=15, bits=30)
+    fn = str(tmpdir.join("basis.bin"))
+    with BasisStore.create(fn, A) as S:
+        B = S.read_rows(5, 20)
+        LLL.reduction(B)
+        S.write_rows(5, B, flush=True)
+        S[0, 0] = -1
+        S[1] = range(30)
+
+    with BasisStore(fn) as S:
+        assert S.read_rows(5, 20) == B
+        assert S[0, 0] == -1
+        assert S[1] == tuple(range(30))
+        assert S.read_rows(20) == A.submatrix(20, 0, 30, 30)
+
+
+def test_basis_store_errors(tmpdir):
+    A = IntegerMatrix.random(10, "uniform", bits=10)
+    fn = str(tmpdir.join("basis.bin"))
+    with BasisStore.create(fn, A) as S:
+        for start, stop in ((-1, 2), (3, 2), (0, 11)):
+            try:
+                S.read_rows(start, stop)
+                assert False
+            except IndexError:
+                pass
+
+        with open(fn, "rb") as fh:
+            data = fh.read()
+        B = IntegerMatrix(3, 10)
+        B.randomize("uniform", bits=10)
+        B[2, 9] = 2**200
+        try:
+            S.write_rows(0, B, flush=True)
+            assert False
+        except OverflowError:
+            pass
+        assert S.to_matrix() == A
+
+        try:
+            S.write_rows(0, IntegerMatrix(1, 9))
+            assert False
+        except ValueError:
+            pass
+
+    with open(fn, "rb") as fh:
+        assert fh.read() == data
+
+    with BasisStore(fn, readonly=True) as S:
+        try:
+            S.write_rows(0, A)
+            assert False
+        except ValueError:
+            pass
+
+    with open(fn, "r+b") as fh:
+        fh.write(b"garbage!")
+    try:
+        BasisStore(fn)
+        assert False
+    except ValueError:
+        pass
+
+
+def test_basis_store_corrupted(tmpdir):
+    import struct
+    A = IntegerMatrix.random(10, "uniform", bits=10)
+    fn = str(tmpdir.join("basis.bin"))
+    with BasisStore.create(fn, A):
+        pass
+
+    for count in (-2**63, 2**63 - 1, -2, 2):
+        with open(fn, "r+b") as fh:
+            fh.seek(BasisStore.header.size)
+            fh.write(struct.pack("<q", count))
+        with BasisStore(fn, readonly=True) as S:
+            try:
+                S.read_rows(0, 1)
+                assert False
+            except ValueError:
+                pass
+
+
+def test_export_rows_limbs():
+    A = IntegerMatrix.random(3, "uniform", bits=10)
+    buf = bytearray(8*2*3*3)
+    for limbs in (-1, -2):
+        for f in (A.export_rows, A.import_rows):
+            try:
+                f(buf, limbs)
+                assert False
+            except ValueError:
+                pass
+    assert buf == bytearray(len(buf))
+
+    # 8*(limbs+1) does not fit into an int
+    for f in (A.export_rows, A.import_rows):
+        try:
+            f(buf, 2**28)
+            assert False
+        except ValueError:
+            pass
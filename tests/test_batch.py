@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+from fpylll import IntegerMatrix, LLL, BKZ
+from fpylll import set_random_seed
+from fpylll.batch import reduce_many, dumps, loads
+from copy import copy
+
+dimensions = (0, 1, 2, 10, 30)
+
+
+def make_integer_matrix(n):
+    A = IntegerMatrix.random(n, "uniform", bits=30)
+    return A
+
+
+def test_batch_serialization():
+    for n in dimensions:
+        A = make_integer_matrix(n)
+        assert loads(dumps(A)) == A
+
+    A = IntegerMatrix.from_matrix([[-1, 0], [2**100, -2**100]])
+    assert loads(dumps(A)) == A
+
+
+def test_batch_lll():
+    set_random_seed(1337)
+    A = [make_integer_matrix(n) for n in dimensions]
+    for workers in (1, 2):
+        R = sorted(reduce_many(A, workers=workers))
+        assert [r.index for r in R] == list(range(len(A)))
+        for r, a in zip(R, A):
+            assert r.A == LLL.reduction(copy(a))
+
+
+def test_batch_bkz_deterministic():
+    set_random_seed(1337)
+    A = [IntegerMatrix.random(30, "qary", k=15, bits=20) for _ in range(4)]
+    params = [BKZ.Param(block_size) for block_size in (5, 10, 15, 20)]
+    R1 = list(reduce_many(A, params, workers=1, seed=42))
+    R2 = list(reduce_many(A, params, workers=2, seed=42, ordered=True))
+    for r1, r2 in zip(R1, R2):
+        assert r1.index == r2.index
+        assert r1.seed == r2.seed == 42 + r1.index
+        assert r1.A == r2.A
+        assert r1.cputime >= 0 and r1.walltime >= 0
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from fpylll.config import float_types
+from fpylll.tools.benchmark import benchmarks, compare, main, run
+
+
+def test_benchmark_run():
+    results = run(["io-bytes", "enum"], repeat=2)
+    assert list(results.keys()) == ["io-bytes", "enum"]
+    assert results["enum"]["nodes"] > 0
+    assert results["io-bytes"]["walltime"] <= results["io-bytes"]["walltime median"]
+
+    slow = dict((name, dict(result, walltime=0.5*result["walltime"])) for name, result in results.items())
+    assert compare(results, results) == []
+    assert [name for name, _, _ in compare(results, slow)] == ["io-bytes", "enum"]
+
+
+def test_benchmark_lll():
+    for float_type in float_types:
+        results = run(["lll-%s"%float_type], repeat=1)
+        assert list(results.keys()) == ["lll-%s"%float_type]
+        assert results["lll-%s"%float_type]["walltime"] > 0
+
+
+def test_benchmark_lll_threads():
+    results = run(["lll-threads"], repeat=1, n=30)
+    assert results["lll-threads"]["threads"] >= 1
+    assert results["lll-threads"]["speedup"] > 0
+
+
+def test_benchmark_all():
+    # every benchmark runs, in a small dimension
+    results = run(repeat=1, n=30)
+    assert "enum-pruned" in results
+    for name in benchmarks:
+        if name in results:
+            assert results[name]["n"] == 30
+        else:
+            # only benchmarks with missing optional dependencies are skipped
+            assert name == "io-numpy"
+
+
+def test_benchmark_main(tmpdir):
+    assert "lll-d" in benchmarks
+    fn = str(tmpdir.join("results.json"))
+    assert main(["io-bytes", "--repeat", "1", "--quiet", "--output", fn]) == 0
+    with open(fn) as fh:
+        data = json.load(fh)
+    assert list(data["results"].keys()) == ["io-bytes"]
+
+    data["results"]["io-bytes"]["walltime"] = 0.0
+    with open(fn, "w") as fh:
+        json.dump(data, fh)
+    assert main(["io-bytes", "--repeat", "1", "--quiet", "--baseline", fn]) == 1
@@ -40,3 +40,59 @@ def test_bkz_bkz():
             b00.append(B[0, 0])
         for i in range(1, len(b00)):
             assert b00[0] == b00[i]
+
+
+def test_bkz_auto():
+    for m, n in dimensions:
+        if m < 2 or n < 2:
+            continue
+        A = make_integer_matrix(m, n)
+        B = copy(A)
+        BKZ.reduction(B, BKZ.Param(block_size=min(m, 20)), float_type="auto")
+        assert LLL.is_reduced(B)
+
+
+def test_bkz_callback():
+    A = make_integer_matrix(50, 50)
+    M = GSO.Mat(A)
+    lll_obj = LLL.Reduction(M)
+    param = BKZ.Param(block_size=10, strategies=BKZ.DEFAULT_STRATEGY)
+    bkz = BKZ.Reduction(M, lll_obj, param)
+
+    infos = []
+
+    def callback(bkz, info):
+        infos.append(info)
+        if info["tour"] == 0:
+            return BKZ.Param(block_size=20, strategies=BKZ.DEFAULT_STRATEGY)
+        return "stop"
+
+    bkz(callback=callback)
+    # new parameters are used even if the first tour was clean
+    assert len(infos) == 2
+    assert [info["tour"] for info in infos] == [0, 1]
+    assert [info["block_size"] for info in infos] == [10, 20]
+    assert len(infos[0]["r"]) == 50
+    assert infos[-1]["r"][0] == M.get_r(0, 0)
+    assert LLL.is_reduced(A)
+
+
+def test_bkz_callback_clean():
+    A = make_integer_matrix(50, 50)
+    M = GSO.Mat(A)
+    lll_obj = LLL.Reduction(M)
+    BKZ.Reduction(M, lll_obj, BKZ.Param(block_size=10, strategies=BKZ.DEFAULT_STRATEGY))()
+
+    # the basis is BKZ-10 reduced, so the first tour is clean and the callback raises β
+    infos = []
+
+    def callback(bkz, info):
+        infos.append(info)
+        if info["block_size"] == 10:
+            return BKZ.Param(block_size=20, strategies=BKZ.DEFAULT_STRATEGY, flags=BKZ.MAX_LOOPS,
+                             max_loops=3)
+
+    BKZ.Reduction(M, lll_obj, BKZ.Param(block_size=10, strategies=BKZ.DEFAULT_STRATEGY))(callback=callback)
+    assert infos[0]["clean"]
+    assert [info["block_size"] for info in infos[1:]] == [20]*(len(infos)-1)
+    assert 2 <= len(infos) <= 3
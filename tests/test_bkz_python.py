@@ -3,13 +3,19 @@
 
 Test if Python BKZ classes can be instantiated and run.
 """
+import random
 from copy import copy
+from functools import partial
 
-from fpylll import IntegerMatrix
+from fpylll import IntegerMatrix, GSO, LLL
 from fpylll.algorithms.simple_bkz import BKZReduction as SimpleBKZ
 from fpylll.algorithms.simple_dbkz import DBKZReduction as SimpleDualBKZ
 from fpylll.algorithms.bkz import BKZReduction as BKZ
 from fpylll.algorithms.bkz2 import BKZReduction as BKZ2
+from fpylll.algorithms.pbkz import BKZReduction as ParallelBKZ
+from fpylll.algorithms.block_parallel import BKZReduction as BlockParallelBKZ
+from fpylll.algorithms.slide import SlideReduction
+from fpylll.algorithms.bkz_stats import FastTreeTracer
 from fpylll import BKZ as fplll_bkz
 from fpylll.util import set_random_seed
 
@@ -46,3 +52,136 @@ def test_bkz_call(block_size=10):
             A = make_integer_matrix(n)
             B = copy(A)
             cls(B)(params=params)
+
+
+def test_pbkz_call(block_size=10):
+    params = fplll_bkz.Param(block_size=block_size, flags=fplll_bkz.GH_BND|fplll_bkz.MAX_LOOPS, max_loops=2)
+    for n in dimensions:
+        set_random_seed(n)
+        A = make_integer_matrix(n)
+        bkz = ParallelBKZ(copy(A), ncores=2, min_block_size=block_size)
+        bkz(params=params)
+        assert bkz.pool is None
+
+        # workers use the float type of the parent
+        M = GSO.Mat(copy(A), float_type="dpe")
+        bkz = ParallelBKZ(LLL.Reduction(M), ncores=2, min_block_size=block_size)
+        bkz(params=params)
+        assert LLL.is_reduced(M.B)
+
+
+def test_pbkz_sync():
+    from fpylll.algorithms.pbkz import SVPPool
+    A = make_integer_matrix(dimensions[0])
+    pool = SVPPool(A, 1)
+    try:
+        assert pool.sync(A) is None
+        A[3, 0] += 1
+        A[5, 1] -= 1
+        lo, hi, limbs, rows = pool.sync(A)
+        assert (lo, hi) == (3, 6)
+        B = IntegerMatrix(3, A.ncols)
+        B.import_rows(rows, limbs)
+        assert B == A.submatrix(3, 0, 6, A.ncols)
+        assert pool.sync(A) is None
+
+        # entries which need more limbs than the initial basis
+        A[7, 2] = 2**200
+        lo, hi, limbs, _ = pool.sync(A)
+        assert (lo, hi) == (7, 8) and limbs == 4
+        assert pool.sync(A) is None
+    finally:
+        pool.close()
+
+
+def test_bkz_trace_enumeration_stats(block_size=10):
+    params = fplll_bkz.Param(block_size=block_size, flags=fplll_bkz.GH_BND)
+    set_random_seed(1)
+    A = make_integer_matrix(dimensions[0])
+    bkz = BKZ2(A)
+    bkz(params=params)
+    assert bkz.trace.sum("#updates") > 0
+    assert bkz.trace.sum("enum core") > 0
+
+
+def test_bkz_fast_tracer(block_size=10):
+    params = fplll_bkz.Param(block_size=block_size, flags=fplll_bkz.GH_BND|fplll_bkz.MAX_LOOPS, max_loops=2)
+    set_random_seed(1)
+    A = make_integer_matrix(dimensions[0])
+
+    bkz = BKZ2(copy(A))
+    set_random_seed(2)
+    random.seed(2)
+    bkz(params=params)
+    bkz_fast = BKZ2(copy(A))
+    set_random_seed(2)
+    random.seed(2)
+    bkz_fast(params=params, tracer=FastTreeTracer)
+    assert bkz_fast.A == bkz.A
+    assert bkz_fast.trace.sum("#enum") == bkz.trace.sum("#enum")
+    assert bkz_fast.trace.get("tour")[0]["r_0"].min == bkz.trace.get("tour")[0]["r_0"].min
+
+    bkz_sampled = BKZ2(copy(A))
+    set_random_seed(2)
+    random.seed(2)
+    bkz_sampled(params=params, tracer=partial(FastTreeTracer, sample=4))
+    assert 0 < bkz_sampled.trace.sum("#enum") < bkz.trace.sum("#enum")
+
+    bkz_none = BKZ2(copy(A))
+    set_random_seed(2)
+    random.seed(2)
+    bkz_none(params=params, tracer=False)
+    assert bkz_none.trace is None
+    assert bkz_none.A == bkz.A
+
+
+def test_block_parallel_call(block_size=10):
+    params = fplll_bkz.Param(block_size=block_size, strategies=fplll_bkz.DEFAULT_STRATEGY,
+                             flags=fplll_bkz.MAX_LOOPS, max_loops=3)
+    for ncores in (1, 2):
+        for n in dimensions:
+            set_random_seed(n)
+            A = make_integer_matrix(n)
+            U = IntegerMatrix.identity(n)
+            B = copy(A)
+            bkz = BlockParallelBKZ(GSO.Mat(B, U=U), ncores=ncores, window=2*block_size)
+            bkz(params=params)
+            assert bkz.pool is None
+            assert LLL.is_reduced(B)
+            # the transformation matrix tracks all window transforms
+            assert U*A == B
+
+
+def test_projected_block():
+    from math import log, sqrt
+    from fpylll.algorithms.block_parallel import projected_block
+    n = dimensions[0]
+    A = LLL.reduction(make_integer_matrix(n))
+    M = GSO.Mat(A)
+    M.update_gso()
+    for kappa, block_size in ((0, 10), (5, 20), (n-3, 3)):
+        B = projected_block(M, kappa, block_size, bits=20)
+        assert (B.nrows, B.ncols) == (block_size, block_size)
+        r = [sqrt(M.get_r(kappa+i, kappa+i)) for i in range(block_size)]
+        scale = 2.0**(20 - int(log(min(r), 2)))
+        for i in range(block_size):
+            assert all(B[i, j] == 0 for j in range(i+1, block_size))
+            assert abs(B[i, i] - scale*r[i]) <= 1
+            for j in range(i):
+                assert abs(B[i, j] - scale*M.get_mu(kappa+i, kappa+j)*r[j]) <= 1
+
+
+def test_slide_call(block_size=10):
+    params = fplll_bkz.Param(block_size=block_size, strategies=fplll_bkz.DEFAULT_STRATEGY,
+                             flags=fplll_bkz.MAX_LOOPS, max_loops=4)
+    for ncores in (1, 2):
+        for n in dimensions:
+            set_random_seed(n)
+            random.seed(n)
+            A = make_integer_matrix(n)
+            slide = SlideReduction(copy(A), ncores=ncores)
+            slide(params=params)
+            assert slide.pool is None
+            assert LLL.is_reduced(slide.A)
+            assert slide.trace.sum("#enum") > 0
+            assert slide.trace.get("tour")[0].find("enumeration", True) is not None
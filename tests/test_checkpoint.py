@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+import random
+from copy import copy
+
+from fpylll import BKZ, GSO, IntegerMatrix, LLL
+from fpylll.algorithms.bkz import BKZReduction as BKZ1
+from fpylll.algorithms.bkz2 import BKZReduction as BKZ2
+from fpylll.algorithms.block_parallel import BKZReduction as BlockParallel
+from fpylll.algorithms.slide import SlideReduction
+from fpylll.tools.checkpoint import AutoAbort, Checkpoint, load
+from fpylll.util import set_random_seed
+
+
+def make_integer_matrix(n=40):
+    return IntegerMatrix.random(n, "qary", k=n//2, bits=20)
+
+
+def test_auto_abort():
+    set_random_seed(1)
+    A = LLL.reduction(make_integer_matrix())
+    M = GSO.Mat(A)
+    M.update_gso()
+    a0, a1 = BKZ.AutoAbort(M, A.nrows), AutoAbort(M, A.nrows)
+    for _ in range(8):
+        assert a0.test_abort(max_no_dec=3) == a1.test_abort(max_no_dec=3)
+
+    a2 = AutoAbort(M, A.nrows, state=a1.state)
+    assert a2.test_abort(max_no_dec=3) == a1.test_abort(max_no_dec=3)
+
+
+def test_checkpoint_python(tmpdir):
+    for cls in (BKZ1, BKZ2):
+        set_random_seed(1)
+        random.seed(1)
+        fn = str(tmpdir.join("%s.ckpt"%cls.__module__))
+
+        bkz = cls(make_integer_matrix())
+        bkz(BKZ.Param(10, flags=BKZ.MAX_LOOPS, max_loops=2), checkpoint=Checkpoint(fn, tours=1))
+        tour = load(fn)["tour"]
+        assert tour in (1, 2)
+
+        bkz, _ = cls.resume(fn, params=BKZ.Param(10, flags=BKZ.MAX_LOOPS, max_loops=4))
+        tours = [child.label for child in bkz.trace.children if child.label[0] == "tour"]
+        # the resumed run runs at least one more tour and keeps the earlier ones
+        assert len(tours) > tour
+        assert tours == [("tour", i) for i in range(len(tours))]
+        assert load(fn)["tour"] == len(tours)
+        assert LLL.is_reduced(bkz.A)
+
+        # resuming a finished run with its own parameters runs no further tour
+        tour = load(fn)["tour"]
+        bkz, _ = cls.resume(fn)
+        tours = [child.label for child in bkz.trace.children if child.label[0] == "tour"]
+        assert len(tours) == tour == load(fn)["tour"]
+
+
+def test_checkpoint_clean(tmpdir):
+    set_random_seed(1)
+    fn = str(tmpdir.join("clean.ckpt"))
+
+    bkz = BKZ1(make_integer_matrix())
+    clean = bkz(BKZ.Param(10), checkpoint=fn)
+    state = load(fn)
+    assert clean and state["tour_clean"]
+
+    bkz, clean = BKZ1.resume(fn, params=BKZ.Param(10, flags=BKZ.MAX_LOOPS, max_loops=100))
+    assert clean and load(fn)["tour"] == state["tour"]
+
+
+def test_checkpoint_block_parallel(tmpdir):
+    set_random_seed(1)
+    fn = str(tmpdir.join("block_parallel.ckpt"))
+
+    bkz = BlockParallel(make_integer_matrix(), ncores=1)
+    bkz(BKZ.Param(10, flags=BKZ.MAX_LOOPS, max_loops=2), checkpoint=Checkpoint(fn, tours=1))
+    state = load(fn)
+    assert (state["offset"], state["clean"]) == (bkz.offset, bkz._clean)
+
+    bkz, _ = BlockParallel.resume(fn, params=BKZ.Param(10, flags=BKZ.MAX_LOOPS, max_loops=4), ncores=1)
+    tours = [child.label for child in bkz.trace.children if child.label[0] == "tour"]
+    # the windows keep moving by half a window per tour across the interruption
+    assert bkz.offset == 10*len(tours)
+
+
+def test_checkpoint_slide(tmpdir):
+    set_random_seed(1)
+    fn = str(tmpdir.join("slide.ckpt"))
+
+    slide = SlideReduction(make_integer_matrix(), ncores=1)
+    slide(BKZ.Param(10), checkpoint=fn)
+    state = load(fn)
+    assert state["potential"] is not None and state["potential"] == slide.potential
+
+    # the run finished with a clean tour, so resuming it restores the potential but runs no tour
+    slide, clean = SlideReduction.resume(fn, ncores=1)
+    tours = [child.label for child in slide.trace.children if child.label[0] == "tour"]
+    assert clean and len(tours) == state["tour"]
+    assert slide.potential == state["potential"]
+
+
+def test_checkpoint_fplll(tmpdir):
+    set_random_seed(1)
+    fn = str(tmpdir.join("bkz.ckpt"))
+
+    A = make_integer_matrix()
+    M = GSO.Mat(copy(A))
+    bkz = BKZ.Reduction(M, LLL.Reduction(M), BKZ.Param(10, flags=BKZ.MAX_LOOPS, max_loops=1))
+    bkz(checkpoint=fn)
+    assert load(fn)["tour"] == 1
+    assert load(fn)["M"].B == M.B
+
+    bkz, _ = BKZ.Reduction.resume(fn, BKZ.Param(10, flags=BKZ.MAX_LOOPS, max_loops=3))
+    assert load(fn)["tour"] <= 3
+    assert LLL.is_reduced(bkz.M.B)
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from fpylll import GSO, IntegerMatrix, LLL
+from fpylll.util import get_precision, precision
 from fpylll.config import float_types
 from copy import copy
 
@@ -100,3 +101,98 @@ def test_gso_io():
             v_ = IntegerMatrix.from_iterable(1, m, w) * A
             v_ = list(v_[0])
             assert v == v_
+
+
+def exact_from_canonical(A, v):
+    """
+    Coordinates of ``v`` wrt the Gram-Schmidt basis of ``A`` computed over the rationals.
+    """
+    from fractions import Fraction
+    B = [[Fraction(x) for x in A[i]] for i in range(A.nrows)]
+    Bs = []
+    for b in B:
+        for bs in Bs:
+            mu = sum([x*y for x, y in zip(b, bs)])/sum([x*x for x in bs])
+            b = [x - mu*y for x, y in zip(b, bs)]
+        Bs.append(b)
+    return [sum([x*y for x, y in zip(v, bs)])/sum([x*x for x in bs]) for bs in Bs]
+
+
+def test_gso_batch():
+    for m, n in dimensions:
+        if m <= 2 or n <= 2 or m > 10:
+            continue
+
+        A = make_integer_matrix(m, n)
+        V = [list(A[i]) for i in range(3)]
+        LLL.reduction(A)
+        C = [[i - j for j in range(m)] for i in range(3)]
+
+        for float_type in float_types:
+            M = GSO.Mat(copy(A), float_type=float_type)
+            M.update_gso()
+            W = M.from_canonical_batch(V)
+            for v, w in zip(V, W):
+                for x, y in zip(w, exact_from_canonical(A, v)):
+                    assert abs(x - y) <= 1e-6 * max(abs(y), 1)
+            U = M.to_canonical_batch(W)
+            for u, v in zip(U, V):
+                assert [int(round(ui)) for ui in u] == v
+
+            # lattice vectors are their own closest vectors
+            X = [list(A.multiply_left(c)) for c in C]
+            assert M.babai_batch(X) == tuple([tuple(c) for c in C])
+            assert M.babai_batch(M.from_canonical_batch(X), gso=True) == tuple([tuple(c) for c in C])
+
+
+def test_gso_batch_large_entries():
+    # entries do not fit into doubles, only exact products with the basis recover v
+    A = IntegerMatrix.from_matrix([[2**60 + 1, 2**60], [2**60, -2**60 - 1]])
+    v = (1, -1)
+    for float_type in float_types:
+        M = GSO.Mat(copy(A), float_type=float_type)
+        M.update_gso()
+        for x, y in zip(M.from_canonical(v), exact_from_canonical(A, v)):
+            assert abs(x - y) <= 1e-6 * abs(y)
+        assert M.babai(A.multiply_left((3, -2))) == (3, -2)
+
+    M = GSO.Mat(copy(A))
+    M.update_gso()
+    assert M.babai((0.5, 1.5), gso=True) == (0, 2)
+    assert M.babai((0.25, 1.0, 7.5), dimension=2, gso=True) == (0, 1, 7.5)
+
+
+def test_gso_batch_bounds():
+    A = make_integer_matrix(10, 10)
+    M = GSO.Mat(A)
+    M.update_gso()
+    v = tuple(A[0])
+    for start, dimension in ((-1, -1), (11, -1), (0, 11), (5, 6), (2, -2)):
+        for f in (lambda: M.from_canonical_batch([v], start, dimension),
+                  lambda: M.babai_batch([v], start, dimension)):
+            try:
+                f()
+                assert False
+            except ValueError:
+                pass
+    for start in (-1, 11):
+        try:
+            M.to_canonical_batch([v], start)
+            assert False
+        except ValueError:
+            pass
+
+
+def test_gso_auto_precision():
+    # too many rows for any hardware type
+    A = IntegerMatrix.identity(700)
+    with precision(53):
+        try:
+            GSO.Mat(A, float_type="auto")
+            assert False
+        except ValueError:
+            pass
+    with precision(300):
+        M = GSO.Mat(A, float_type="auto")
+        assert M.float_type == "mpfr"
+        assert get_precision() == 300
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+from fpylll import IntegerMatrix
+
+dimensions = ((0, 0), (1, 1), (2, 2), (3, 3), (10, 10), (10, 20), (20, 10))
+
+
+def make_integer_matrix(m, n):
+    A = IntegerMatrix(m, n)
+    A.randomize("uniform", bits=m+n)
+    return A
+
+
+def test_multiply_left():
+    for m, n in dimensions:
+        A = make_integer_matrix(m, n)
+        for start in range(min(m, 3)):
+            v = list(range(1, m-start+1))
+            w = A.multiply_left(v, start=start)
+            assert len(w) == n
+            for j in range(n):
+                assert w[j] == sum([v[i]*A[start+i, j] for i in range(len(v))])
+
+            V = [v, [-x for x in v], [float(x) for x in v]]
+            W = A.multiply_left_batch(V, start=start)
+            assert W == (w, tuple([-x for x in w]), w)
+
+
+def test_multiply_left_errors():
+    A = make_integer_matrix(3, 3)
+    try:
+        A.multiply_left((1, 2, 3, 4))
+        assert False
+    except ValueError:
+        pass
+    try:
+        A.multiply_left((0.5,))
+        assert False
+    except ValueError:
+        pass
+
+
+def test_to_bytes():
+    for m, n in dimensions:
+        A = make_integer_matrix(m, n)
+        if m and n:
+            A[0, 0] = -2**200
+            A[m-1, n-1] = 0
+        assert IntegerMatrix.from_bytes(A.to_bytes()) == A
+    A = IntegerMatrix(5, 0)
+    assert IntegerMatrix.from_bytes(A.to_bytes()) == A
+
+
+def test_from_bytes_errors():
+    import struct
+    data = make_integer_matrix(3, 3).to_bytes()
+    magic = data[:data.index(struct.pack("<qq", 3, 3))]
+    crafted = (magic + struct.pack("<qqq", 2**31, 1, 0),
+               magic + struct.pack("<qqq", 2**20, 2**20, 0),
+               magic + struct.pack("<qq", 2**31-1, 0),
+               magic + struct.pack("<qqqq", 1, 1, -2**63, 0),
+               magic + struct.pack("<qqqq", 1, 1, 2**62, 0))
+    for bad in (b"", data[:-1], data + b"\0", b"x" + data[1:]) + crafted:
+        try:
+            IntegerMatrix.from_bytes(bad)
+            assert False
+        except ValueError:
+            pass
+
+
+def test_pickle():
+    import pickle
+    for m, n in dimensions:
+        A = make_integer_matrix(m, n)
+        assert pickle.loads(pickle.dumps(A)) == A
+
+
+def test_file_io(tmpdir):
+    import io
+    for m, n in dimensions:
+        if m == 0 or n == 0:
+            continue
+        A = make_integer_matrix(m, n)
+        A[0, 0] = -2**200
+        fn = str(tmpdir.join("A-%d-%d.txt" % (m, n)))
+        A.to_file(fn)
+        for chunk_size in (1, 7, 2**20):
+            assert IntegerMatrix.from_file(fn, chunk_size=chunk_size) == A
+
+    B = IntegerMatrix.from_file(io.BytesIO(b"[ 1 -2 3 ]\n[ 4 5 +6 ]\n"))
+    assert B == IntegerMatrix.from_matrix([[1, -2, 3], [4, 5, 6]])
+
+    for bad in (b"[[1 2][3]]", b"[[1 x]]", b"[[1 2-3]]", b"[[1+2]]", b"[[+-3]]", b"[[++3]]", b"[[+]]",
+                b"[[1 2]\n[3 4 \n", b"[[1 2]\n[3 4]", b"[[1 [2 3]]", b"[[[1]]]", b"[1 2]]", b"[1 2] 3"):
+        try:
+            IntegerMatrix.from_file(io.BytesIO(bad))
+            assert False
+        except ValueError:
+            pass
@@ -2,6 +2,7 @@
 
 from fpylll import GSO, IntegerMatrix, LLL
 from fpylll.config import float_types
+from fpylll.util import auto_float_types, get_precision
 from copy import copy
 
 dimensions = ((0, 0), (1, 1), (2, 2), (3, 3), (10, 10), (50, 50), (60, 60),)
@@ -36,3 +37,87 @@ def test_lll_lll():
             b00.append(B[0, 0])
         for i in range(1, len(b00)):
             assert b00[0] == b00[i]
+
+
+def test_lll_pickle():
+    import pickle
+    for m, n in dimensions:
+        A = make_integer_matrix(m, n)
+        for float_type in float_types:
+            M = GSO.Mat(copy(A), float_type=float_type)
+            lll = LLL.Reduction(M)
+            lll_ = pickle.loads(pickle.dumps(lll))
+            assert lll_.M.float_type == M.float_type
+            assert lll_.delta == lll.delta and lll_.eta == lll.eta
+            lll()
+            lll_()
+            assert lll_.M.B == M.B
+
+
+def test_lll_auto():
+    for m, n in dimensions:
+        A = make_integer_matrix(m, n)
+        B = copy(A)
+        LLL.reduction(B, float_type="auto")
+        assert LLL.is_reduced(B)
+        float_type, _ = auto_float_types(m, B.get_max_exp())[0]
+        assert GSO.Mat(B, float_type="auto").float_type == float_type
+
+    # entries too large for the exponent range of doubles
+    A = make_integer_matrix(10, 10)
+    for i in range(10):
+        A[i, i] = 2**1200
+    M = GSO.Mat(copy(A), float_type="auto")
+    assert M.float_type != "double"
+    B = copy(A)
+    LLL.reduction(B, float_type="auto")
+    assert LLL.is_reduced(B)
+
+
+def test_auto_float_types():
+    for m, n in dimensions:
+        types = auto_float_types(m, m+n)
+        assert types[-1][0] == "mpfr"
+        precisions = [get_precision(float_type) for float_type, _ in types[:-1]]
+        assert precisions == sorted(set(precisions))
+    assert "mpfr" not in dict(auto_float_types(10, 10, fast=True))
+
+
+def test_lll_int_type():
+    for m, n in dimensions:
+        A = make_integer_matrix(m, n)
+        for int_type in ("mpz", "auto"):
+            B = LLL.reduction(copy(A), int_type=int_type)
+            assert LLL.is_reduced(B)
+
+    # too large for machine words, "auto" falls back to GMP integers and "long" raises
+    A = IntegerMatrix.random(20, "uniform", bits=200)
+    B = LLL.reduction(copy(A), int_type="auto")
+    assert LLL.is_reduced(B)
+    for U in (None, IntegerMatrix.identity(20)):
+        try:
+            LLL.reduction(copy(A), U=U, int_type="long")
+            assert False
+        except ValueError:
+            pass
+
+    try:
+        LLL.reduction(IntegerMatrix.random(20, "uniform", bits=10), U=IntegerMatrix.identity(20),
+                      int_type="long")
+        assert False
+    except ValueError:
+        pass
+
+    # machine words must agree with GMP integers
+    for n in (10, 40, 60):
+        A = IntegerMatrix.random(n, "qary", k=n//2, bits=20)
+        for method in ("heuristic", "proved"):
+            B = LLL.reduction(copy(A), method=method, float_type="double", int_type="long")
+            assert B == LLL.reduction(copy(A), method=method, float_type="double")
+        assert LLL.is_reduced(LLL.reduction(copy(A), int_type="long"))
+
+    try:
+        LLL.reduction(copy(A), int_type="int")
+        assert False
+    except ValueError:
+        pass
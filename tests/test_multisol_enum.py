@@ -71,3 +71,133 @@ def test_multisol():
         sol = tuple((sol*A)[0])
         dist = sum([x**2 for x in sol])
         assert dist==48
+
+
+def test_multisol_callback():
+    A = make_integer_matrix()
+    m = GSO.Mat(A)
+    lll_obj = LLL.Reduction(m)
+    lll_obj()
+
+    solutions = []
+    count = Enumeration(m).enumerate_callback(0, 27, 48.5, 0, lambda v, d: solutions.append((v, d)))
+    assert count == len(solutions) == 126 / 2
+    for sol, dist in solutions:
+        assert abs(dist - 48) < 0.5
+        sol = IntegerMatrix.from_iterable(1, A.nrows, map(lambda x: int(round(x)), sol))
+        sol = tuple((sol*A)[0])
+        assert sum([x**2 for x in sol]) == 48
+
+    # early stop
+    count = Enumeration(m).enumerate_callback(0, 27, 80.5, 0, lambda v, d: None, nr_solutions=10)
+    assert count == 10
+
+    # the radius is never increased
+    dists = []
+    Enumeration(m).enumerate_callback(0, 27, 80.5, 0, lambda v, d: dists.append(d),
+                                      update_radius=lambda d, r: min(d, 2*r))
+    for i in range(1, len(dists)):
+        assert dists[i] <= dists[i-1]
+
+
+def test_multisol_iter():
+    A = make_integer_matrix()
+    m = GSO.Mat(A)
+    lll_obj = LLL.Reduction(m)
+    lll_obj()
+
+    solutions = list(Enumeration(m).enumerate_iter(0, 27, 80.5, 0, buffer_size=16))
+    assert len(solutions) == 5286 / 2
+
+    it = Enumeration(m).enumerate_iter(0, 27, 80.5, 0, buffer_size=16)
+    for i, (sol, dist) in enumerate(it):
+        assert dist <= 80.5
+        if i == 100:
+            break
+    it.close()
+
+    # using the GSO object while the enumeration holds it raises instead of hanging
+    it = Enumeration(m).enumerate_iter(0, 27, 80.5, 0, buffer_size=16)
+    next(it)
+    try:
+        m.update_gso()
+        assert False
+    except RuntimeError:
+        pass
+    it.close()
+    m.update_gso()
+
+    def callback(v, d):
+        m.update_gso()
+
+    try:
+        Enumeration(m).enumerate_callback(0, 27, 80.5, 0, callback)
+        assert False
+    except RuntimeError:
+        pass
+
+
+def test_multisol_other_thread():
+    import threading
+    A = make_integer_matrix()
+    m = GSO.Mat(A)
+    lll_obj = LLL.Reduction(m)
+    lll_obj()
+
+    # a third thread using the GSO object waits for the enumeration instead of raising
+    state = {"done": False, "error": None}
+
+    def run():
+        try:
+            m.update_gso()
+        except BaseException as e:
+            state["error"] = e
+        state["done"] = True
+
+    it = Enumeration(m).enumerate_iter(0, 27, 80.5, 0, buffer_size=16)
+    next(it)
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join(0.5)
+    assert not state["done"]
+    it.close()
+    thread.join()
+    assert state["done"] and state["error"] is None
+
+    state = {"done": False, "error": None}
+    started = []
+
+    def callback(v, d):
+        if not started:
+            started.append(threading.Thread(target=run))
+            started[0].start()
+            started[0].join(0.5)
+            assert not state["done"]
+
+    Enumeration(m).enumerate_callback(0, 27, 48.5, 0, callback)
+    started[0].join()
+    assert state["done"] and state["error"] is None
+
+
+def test_enumeration_stats():
+    A = make_integer_matrix()
+    m = GSO.Mat(A)
+    lll_obj = LLL.Reduction(m)
+    lll_obj()
+
+    enum_obj = Enumeration(m, nr_solutions=200)
+    solutions = enum_obj.enumerate(0, 27, 48.5, 0)
+    stats = enum_obj.stats
+    assert stats.nodes == enum_obj.get_nodes()
+    assert stats.solutions == len(solutions)
+    assert stats.updates >= len(solutions)
+    assert 0 <= stats.core_time <= stats.total_time
+    assert stats.nodes_per_second > 0
+
+    enum_obj = Enumeration(m, nr_solutions=1)
+    enum_obj.enumerate(0, 27, 100., 0)
+    assert enum_obj.stats.radius_reductions >= 1
+
+    enum_obj = Enumeration(m, collect_stats=False)
+    enum_obj.enumerate(0, 27, 100., 0)
+    assert enum_obj.stats is None
@@ -36,3 +36,62 @@ def test_dump_r(nrows=10):
 
     for i in range(nrows):
         assert abs(M.get_r(i, i) - r[i]) < 0.001
+
+
+def test_integer_matrix_numpy(nrows=10):
+    if not have_numpy:
+        return
+    import numpy
+
+    A = IntegerMatrix.random(nrows, "uniform", bits=30)
+    B = A.to_numpy()
+    assert B.dtype == numpy.int64
+    for i in range(nrows):
+        for j in range(nrows):
+            assert A[i, j] == B[i, j]
+    assert IntegerMatrix.from_numpy(B) == A
+
+    out = numpy.zeros((nrows, nrows), dtype=numpy.int64)
+    assert A.to_numpy(out=out) is out
+    assert (out == B).all()
+
+    A = IntegerMatrix.random(nrows, "uniform", bits=100)
+    B = A.to_numpy()
+    assert B.dtype == object
+    assert IntegerMatrix.from_numpy(B) == A
+
+    try:
+        A.to_numpy(dtype=numpy.int64)
+        assert False
+    except OverflowError:
+        pass
+
+
+def test_dump_gso(nrows=10):
+    if not have_numpy:
+        return
+    from fpylll import LLL
+    from fpylll.numpy import dump_gso, load_B
+
+    A = IntegerMatrix.random(nrows, "qary", k=nrows//2, bits=20)
+    M = GSO.Mat(A, U=IntegerMatrix.identity(nrows))
+    M.update_gso()
+    mu, r, B, U = dump_gso(M)
+    LLL.Reduction(M)()
+    mu_, r_, B_, U_ = dump_gso(M, mu, r, B, U)
+    assert mu_ is mu and r_ is r and B_ is B and U_ is U
+
+    for i in range(nrows):
+        assert abs(M.get_r(i, i) - r[i]) < 0.001
+        for j in range(i):
+            assert abs(M.get_mu(i, j) - mu[i, j]) < 0.001
+        for j in range(nrows):
+            assert A[i, j] == B[i, j]
+            assert M.U[i, j] == U[i, j]
+
+    B[[0, 1]] = B[[1, 0]]
+    load_B(M, B)
+    M.update_gso()
+    for j in range(nrows):
+        assert A[0, j] == B[0, j]
+    assert abs(M.get_r(0, 0) - sum([x**2 for x in B[0]])) < 0.5
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+from fpylll import GSO, IntegerMatrix, LLL, Enumeration, EnumerationError
+from fpylll.algorithms.parallel_enumeration import ParallelEnumeration, _copy_gso
+from fpylll.fplll.enumeration import EvaluatorStrategy
+from fpylll.util import precision, set_random_seed
+
+dimensions = (20, 30, 40)
+
+
+def make_integer_matrix(n):
+    A = IntegerMatrix.random(n, "qary", k=n//2, bits=20)
+    LLL.reduction(A)
+    return A
+
+
+def test_parallel_enumeration():
+    for n in dimensions:
+        set_random_seed(n)
+        M = GSO.Mat(make_integer_matrix(n))
+        M.update_gso()
+        radius = M.get_r(0, 0)
+        _, dist = Enumeration(M).enumerate(0, n, radius, 0)[0]
+
+        for split_level in (None, 0, 1, 3):
+            enum_obj = ParallelEnumeration(M, workers=3)
+            solution, dist_ = enum_obj.enumerate(0, n, radius, 0, split_level=split_level)[0]
+            assert abs(dist - dist_) < 1e-6 * dist
+            assert enum_obj.get_nodes() > 0
+            v = M.B.multiply_left([int(round(x)) for x in solution])
+            assert sum([x**2 for x in v]) == int(round(dist_))
+
+
+def test_parallel_enumeration_copy_gso():
+    A = make_integer_matrix(20)
+    for float_type, flags in (("double", GSO.DEFAULT), ("dpe", GSO.INT_GRAM), ("double", GSO.ROW_EXPO)):
+        M = GSO.Mat(IntegerMatrix(A), float_type=float_type, flags=flags)
+        M.update_gso()
+        N = _copy_gso(M)
+        assert N.B == M.B and N.B is not M.B
+        assert (N.float_type, N.int_gram_enabled, N.row_expo_enabled) == \
+            (float_type, M.int_gram_enabled, M.row_expo_enabled)
+        assert N.get_r(0, 0) == M.get_r(0, 0)
+
+    with precision(100):
+        M = GSO.Mat(IntegerMatrix(A), float_type="mpfr")
+        M.update_gso()
+    N = _copy_gso(M, 100)
+    assert N.float_type == "mpfr" and N.B == M.B
+
+
+def test_parallel_enumeration_subtree():
+    n = 30
+    set_random_seed(1337)
+    M = GSO.Mat(make_integer_matrix(n))
+    M.update_gso()
+    radius = M.get_r(0, 0)
+    subtrees = ParallelEnumeration(M, workers=2).subtrees(0, n, radius, 0, split_level=2)
+    assert subtrees[0] == [0.0, 0.0]
+    for subtree in subtrees:
+        try:
+            solutions = Enumeration(M).enumerate(0, n, radius, 0, subtree=subtree)
+        except EnumerationError:
+            continue
+        for solution, _ in solutions:
+            assert list(solution[-2:]) == subtree
+
+
+def test_parallel_enumeration_subtrees_complete():
+    n = 30
+    set_random_seed(1337)
+    M = GSO.Mat(make_integer_matrix(n))
+    M.update_gso()
+    radius = M.get_r(0, 0)
+    level = n//3
+
+    # at most 64 prefixes are enumerated at first
+    enum_obj = ParallelEnumeration(M, workers=1, jobs_per_worker=1)
+    subtrees = enum_obj.subtrees(0, n, radius, 0, split_level=level)
+    enum_obj = Enumeration(M, nr_solutions=10**6, strategy=EvaluatorStrategy.BEST_N_SOLUTIONS)
+    solutions = enum_obj.enumerate(n - level, n, radius, 0)
+    assert len(solutions) > 64
+    assert len(subtrees) == len(solutions) + 1
+
+
+def test_parallel_enumeration_pruning():
+    n = 40
+    set_random_seed(1337)
+    M = GSO.Mat(make_integer_matrix(n))
+    M.update_gso()
+    radius = 1.5*M.get_r(0, 0)
+    pruning = [1.0]*(n//2) + [1.0 - 0.5*i/n for i in range(n - n//2)]
+
+    enum_obj = Enumeration(M, nr_solutions=10)
+    solutions = enum_obj.enumerate(0, n, radius, 0, pruning=pruning)
+    for split_level in (2, 5):
+        enum_obj = ParallelEnumeration(M, nr_solutions=10, workers=2)
+        solutions_ = enum_obj.enumerate(0, n, radius, 0, pruning=pruning, split_level=split_level)
+        assert len(solutions_) == len(solutions)
+        for (_, dist), (_, dist_) in zip(solutions, solutions_):
+            assert abs(dist - dist_) < 1e-6 * dist
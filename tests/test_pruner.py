@@ -2,7 +2,10 @@
 
 from fpylll import Enumeration, GSO, IntegerMatrix, LLL, prune
 from fpylll.util import gaussian_heuristic
-from time import clock
+try:
+    from time import process_time as clock
+except ImportError:
+    from time import clock
 
 dim_oh = ((40, 2**22), (41, 2**22), (50, 2**24), (51, 2**24))
 
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+from fpylll import GSO, IntegerMatrix, LLL, Pruner
+from fpylll.tools.pruning_cache import PruningCache
+
+
+def prepare(n):
+    A = IntegerMatrix.random(n, "qary", bits=n//2, k=n//2)
+    M = GSO.Mat(A)
+    L = LLL.Reduction(M)
+    L()
+    return M
+
+
+def test_pruning_cache(tmpdir):
+    M = prepare(30)
+    r = [M.get_r(i, i) for i in range(30)]
+
+    cache = PruningCache(maxsize=2)
+    pr0 = cache.prune(r[0], 2**20, 0.5, r)
+    pr1 = cache.prune(r[0], 2**20, 0.5, r)
+    assert pr0.coefficients == pr1.coefficients
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # scaling the basis does not change the profile relative to the radius
+    cache.prune(4*r[0], 2**20, 0.5, [4*x for x in r])
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    # a nearby profile is a miss but warm starts from the cached entry
+    r_ = [x*(1.1 if i % 2 else 1.0) for i, x in enumerate(r)]
+    cache.prune(r[0], 2**20, 0.5, r_)
+    assert (cache.hits, cache.misses, cache.warm_starts) == (2, 2, 1)
+
+    cache.prune(r[0], 2**20, 0.6, r)
+    assert len(cache) == 2
+    pr3 = cache.prune(r[0], 2**20, 0.5, r)
+    assert cache.misses == 4
+
+    fn = str(tmpdir.join("pruning.json"))
+    cache.save(fn)
+    cache2 = PruningCache(maxsize=2, filename=fn)
+    assert len(cache2) == 2
+    pr2 = cache2.prune(r[0], 2**20, 0.5, r)
+    assert cache2.hits == 1
+    assert pr2.coefficients == pr3.coefficients
+
+
+def test_pruning_cache_greedy(tmpdir):
+    M = prepare(30)
+    r = [M.get_r(i, i) for i in range(30)]
+
+    cache = PruningCache()
+    radius0, pr0 = cache.prune(r[0], 2**20, 0.5, r, descent_method="greedy")
+    radius1, pr1 = cache.prune(r[0], 2**20, 0.5, r, descent_method="greedy")
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert radius0 == radius1
+    assert pr0.coefficients == pr1.coefficients
+
+    # the radius scales with the basis
+    radius2, _ = cache.prune(4*r[0], 2**20, 0.5, [4*x for x in r], descent_method="greedy")
+    assert cache.hits == 2
+    assert abs(radius2 - 4*radius0) <= 1e-9*radius2
+
+    # constants and names share entries
+    radius4, pr4 = cache.prune(r[0], 2**20, 0.5, r, descent_method=Pruner.GREEDY)
+    assert (cache.hits, len(cache)) == (3, 1)
+    assert radius4 == radius0
+    assert pr4.coefficients == pr0.coefficients
+
+    fn = str(tmpdir.join("pruning.json"))
+    cache.save(fn)
+    cache2 = PruningCache(filename=fn)
+    radius3, pr3 = cache2.prune(r[0], 2**20, 0.5, r, descent_method="greedy")
+    assert cache2.hits == 1
+    assert radius3 == radius0
+    assert pr3.coefficients == pr0.coefficients
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+from math import log
+
+from fpylll import BKZ, GSO, IntegerMatrix, LLL
+from fpylll.util import set_random_seed, gaussian_heuristic
+
+try:
+    import numpy
+    from fpylll.tools.simulator import simulate, simulate_log, log_profile, _constants
+    have_numpy = True
+except ImportError:
+    have_numpy = False
+
+
+def prepare(n):
+    set_random_seed(n)
+    A = LLL.reduction(IntegerMatrix.random(n, "qary", k=n//2, bits=30))
+    M = GSO.Mat(A)
+    M.update_gso()
+    return M
+
+
+def test_simulate():
+    if not have_numpy:
+        return
+    M = prepare(80)
+    r = M.r()
+
+    r_, tours = simulate(M, BKZ.Param(block_size=20, flags=BKZ.MAX_LOOPS, max_loops=2))
+    assert tours == 2
+    assert len(r_) == len(r)
+    assert r_[0] < r[0]
+    assert abs(sum(log(x) for x in r_) - sum(log(x) for x in r)) < 1e-6
+
+    r20, _ = simulate(r, BKZ.Param(block_size=20))
+    r40, _ = simulate(r, BKZ.Param(block_size=40))
+    assert r40[0] < r20[0]
+
+
+def test_simulate_prob():
+    if not have_numpy:
+        return
+    M = prepare(80)
+    profile = numpy.array([log_profile(M)]*8)
+    param = BKZ.Param(block_size=50, strategies=BKZ.DEFAULT_STRATEGY, flags=BKZ.MAX_LOOPS, max_loops=4)
+
+    l0, _ = simulate_log(profile, param, prob=True, seed=1)
+    l1, _ = simulate_log(profile, param, prob=True, seed=1)
+    assert l0.shape == profile.shape
+    assert (l0 == l1).all()
+    assert numpy.allclose(l0.sum(axis=1), profile.sum(axis=1))
+    assert (l0[:, 0] <= profile[:, 0]).all()
+    assert l0[:, 0].mean() < profile[:, 0].mean()
+
+
+def test_simulate_constants():
+    if not have_numpy:
+        return
+    c = _constants(60)
+    # the HKZ table and the Gaussian heuristic agree where the simulation switches between them
+    assert abs(c[45] - c[44]) < 0.01
+    for beta in (46, 50, 60):
+        assert abs(c[beta-1] - log(gaussian_heuristic([1.0]*beta))/2) < 1e-9
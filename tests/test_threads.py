@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+from fpylll import IntegerMatrix, GSO, LLL, Enumeration, GaussSieve, prune
+from fpylll import set_random_seed
+from multiprocessing.pool import ThreadPool
+from copy import copy
+
+dimensions = (30, 40)
+workers = 4
+
+
+def make_integer_matrix(n):
+    A = IntegerMatrix.random(n, "qary", k=n//2, bits=30)
+    return A
+
+
+def test_threads_lll():
+    for n in dimensions:
+        set_random_seed(n)
+        A = [make_integer_matrix(n) for _ in range(2*workers)]
+        B = [LLL.reduction(copy(a)) for a in A]
+        C = ThreadPool(workers).map(LLL.reduction, [copy(a) for a in A])
+        for b, c in zip(B, C):
+            assert b == c
+
+
+def test_threads_shared_gso():
+    set_random_seed(1337)
+    A = make_integer_matrix(40)
+    M = GSO.Mat(A)
+    L = LLL.Reduction(M)
+    E = Enumeration(M)
+
+    L()
+    M.update_gso()
+    # accessors do not take the lock, so do not call them while other threads run LLL
+    radius = M.get_r(0, 0)
+
+    def f(i):
+        L()
+        M.update_gso()
+        return E.enumerate(0, M.d, radius, 0)[0][1]
+
+    r = ThreadPool(workers).map(f, range(2*workers))
+    assert len(set(r)) == 1
+
+
+def test_threads_row_ops():
+    set_random_seed(1337)
+    A = make_integer_matrix(30)
+    M = GSO.Mat(A)
+    L = LLL.Reduction(M)
+    L()
+    B = copy(A)
+
+    def f(i):
+        for _ in range(20):
+            if i % 2:
+                L()
+            else:
+                with M.row_ops(i % M.d, i % M.d + 1):
+                    M.row_addmul(i % M.d, 29, 3)
+                    M.row_addmul(i % M.d, 29, -3)
+
+    ThreadPool(workers).map(f, range(2*workers))
+    assert A == B
+
+
+def test_threads_enum_prune_sieve():
+    set_random_seed(1337)
+    A = [LLL.reduction(make_integer_matrix(30)) for _ in range(workers)]
+
+    def f(a):
+        M = GSO.Mat(a)
+        M.update_gso()
+        pr = prune(M.get_r(0, 0), 2**20, 0.5, [M.r()])
+        E = Enumeration(M)
+        E.enumerate(0, M.d, M.get_r(0, 0), 0, pruning=pr.coefficients)
+        return GaussSieve(a, 2, seed=1)()
+
+    ThreadPool(workers).map(f, A)
+
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+from copy import copy
+from functools import partial
+
+from fpylll import BKZ, IntegerMatrix
+from fpylll.algorithms.bkz2 import BKZReduction
+from fpylll.algorithms.bkz_stats import BKZTreeTracer, FastTreeTracer
+from fpylll.tools.trace_export import TraceWriter, load_records, load_traces, to_columns, save_npz, load_npz
+from fpylll.util import set_random_seed
+
+try:
+    import numpy  # noqa
+    have_numpy = True
+except ImportError:
+    have_numpy = False
+
+
+def test_trace_export(tmpdir):
+    set_random_seed(1)
+    A = IntegerMatrix.random(40, "qary", k=20, bits=20)
+    params = BKZ.Param(block_size=10, flags=BKZ.MAX_LOOPS, max_loops=2)
+    fn = str(tmpdir.join("trace.jsonl"))
+
+    runs = []
+    with TraceWriter(fn) as writer:
+        for tracer in (BKZTreeTracer, FastTreeTracer):
+            bkz = BKZReduction(copy(A))
+            bkz(params, tracer=partial(tracer, writer=writer))
+            runs.append((writer.run, bkz.trace))
+
+    records = list(load_records(fn))
+    assert len(records) == 4
+    assert [record["tour"] for record in load_records(fn, run=runs[1][0])] == [0, 1]
+
+    traces = load_traces(fn)
+    assert list(traces.keys()) == [run for run, _ in runs]
+    for run, trace in runs:
+        for i in range(2):
+            tour, tour_ = trace.get("tour")[i], traces[run].get("tour")[i]
+            for k in ("cputime", "walltime", "r_0", "/"):
+                assert float(tour[k]) == float(tour_[k])
+            assert tour.sum("#enum") == tour_.sum("#enum")
+            assert len(tour.children) == len(tour_.children)
+
+    with TraceWriter(fn, full=False) as writer:
+        BKZReduction(copy(A))(params, tracer=partial(BKZTreeTracer, writer=writer))
+        run = writer.run
+    trace = load_traces(fn)[run]
+    assert trace.get("tour")[0].children == []
+    assert float(trace.get("tour")[1]["r_0"]) > 0
+
+    cols = to_columns(load_records(fn))
+    assert len(cols["run"]) == 6
+
+    if not have_numpy:
+        return
+    npz = str(tmpdir.join("trace.npz"))
+    save_npz(npz, load_records(fn))
+    cols_ = load_npz(npz)
+    assert list(cols_["tour"]) == cols["tour"]
+    assert list(cols_["r_0"]) == cols["r_0"]
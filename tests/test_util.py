@@ -2,6 +2,7 @@
 
 from fpylll import IntegerMatrix, GSO
 from fpylll.util import adjust_radius_to_gh_bound, set_random_seed, gaussian_heuristic
+from fpylll.util import prefix_log_r, sliding_log_det, sliding_root_det, sliding_gaussian_heuristic
 from fpylll.numpy import dump_r
 
 dimensions = [20, 21, 40, 41, 60, 61, 80, 81, 100, 101, 200, 201, 300, 301, 400, 401]
@@ -31,3 +32,23 @@ def test_gh():
         r = dump_r(M, 0, n)
         gh2 = gaussian_heuristic(r)
         assert abs(gh1/gh2 -1) < 0.01
+
+
+def test_sliding_gh():
+    n, block_size = 60, 20
+    set_random_seed(n)
+    M = GSO.Mat(make_integer_matrix(n))
+    M.update_gso()
+    r = M.r()
+    s = prefix_log_r(r)
+
+    gh = sliding_gaussian_heuristic(s, block_size, prefix=True)
+    root_det = sliding_root_det(s, block_size, prefix=True)
+    log_det = sliding_log_det(r, block_size)
+    assert len(gh) == len(root_det) == len(log_det) == n
+
+    for kappa in range(n):
+        stop = min(kappa + block_size, n)
+        assert abs(gh[kappa]/gaussian_heuristic(r[kappa:stop]) - 1) < 1e-9
+        assert abs(root_det[kappa]/M.get_root_det(kappa, stop) - 1) < 1e-9
+        assert abs(log_det[kappa] - M.get_log_det(kappa, stop)) < 1e-6